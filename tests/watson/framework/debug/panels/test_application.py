@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from watson.events import types
-from watson.framework import applications, views
+from watson.framework import applications, local, views
 from watson.framework.debug.panels import Application
 from watson.routing import routes
 
@@ -41,6 +41,17 @@ class TestApplication(object):
         self.panel.route_match_listener(event)
         assert self.panel.route_match is rm
 
+    def test_route_match_is_request_local(self):
+        rm = routes.RouteMatch('test', {})
+        token = local.current_context.set({})
+        try:
+            self.panel.route_match_listener(
+                types.Event('name', params={'context': {'route_match': rm}}))
+            assert self.panel.route_match is rm
+        finally:
+            local.current_context.reset(token)
+        assert self.panel.route_match is None
+
     def test_render_listener(self):
         vm = views.Model()
         params = {
@@ -2,6 +2,8 @@
 from watson.events import types
 from watson.framework.debug import toolbar
 from watson.framework import views, applications
+from watson.framework.pipeline import Profile
+from watson.framework.responses import StreamingResponse
 from watson.http import messages
 
 
@@ -25,3 +27,50 @@ class TestToolbar(object):
         event = types.Event('render', params=params)
         response = tb.render(event)
         assert '<!-- Injected Watson Debug Toolbar -->' in response.body
+
+    def test_disabled_by_profile(self):
+        app = applications.Http()
+        tb = toolbar.Toolbar(
+            {
+                'panels': {
+                    'tests.watson.framework.debug.support.Panel': {'enabled': True}
+                }
+            },
+            app, app.container.get('jinja2_renderer'))
+        params = {
+            'context': {
+                'request': messages.Request.from_environ({}),
+                'response': messages.Response(200, body='<html><body></body></html>'),
+                'profile': Profile.from_options({'toolbar': False})
+            },
+            'view_model': views.Model(format='html')
+        }
+        assert tb.render(types.Event('render', params=params)) is None
+        assert params['context']['response'].body == '<html><body></body></html>'
+
+    def test_render_stream(self):
+        app = applications.Http()
+        tb = toolbar.Toolbar(
+            {
+                'panels': {
+                    'tests.watson.framework.debug.support.Panel': {'enabled': True}
+                }
+            },
+            app, app.container.get('jinja2_renderer'))
+        response = StreamingResponse(
+            200, stream=iter(['<html><bo', 'dy>', 'content</bo', 'dy>', '</html>']))
+        params = {
+            'context': {
+                'request': messages.Request.from_environ({}),
+                'response': response
+            },
+            'view_model': views.Model(format='html')
+        }
+        event = types.Event('render', params=params)
+        tb.render(event)
+        chunks = list(response.stream)
+        body = ''.join(chunks)
+        assert body.startswith('<html><body>content')
+        assert '<!-- Injected Watson Debug Toolbar -->' in body
+        assert body.endswith('</body></html>')
+        assert chunks[-1] == '</html>'
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 # Support functions, classes
+import asyncio
+import threading
+import time
 from wsgiref import util
 from watson.console import command
 from watson.console.decorators import cmd
 from watson.http.messages import Response
-from watson.framework import controllers
+from watson.framework import applications, controllers, local
+from watson.framework.caching import coalesce
+from watson.framework.conditional import conditional
 from watson.framework.views import Model
 from watson.framework.views.decorators import view
 
@@ -20,6 +25,30 @@ def sample_environ(**kwargs):
     return environ
 
 
+def create_feature_application(section, settings, routes, **config):
+    """Create an application with a feature (a section of the config, such as
+    ratelimit or cors) enabled, unless the settings state otherwise.
+    """
+    settings.setdefault('enabled', True)
+    config.update({'routes': routes, section: settings})
+    return applications.Http(config)
+
+
+def make_request(application, path='/', **kwargs):
+    """Make a request to an application.
+
+    Returns:
+        tuple: The (status, headers) the response was started with, and the
+               body of the response.
+    """
+    statuses = []
+    body = application(
+        sample_environ(PATH_INFO=path, **kwargs),
+        lambda status, headers, exc_info=None: statuses.append(
+            (status, dict(headers))))
+    return statuses[0], b''.join(body)
+
+
 class SampleClass(object):
     name = 'value'
 
@@ -59,6 +88,10 @@ class SampleActionController(controllers.Action):
     def view_model_template_action(self, **kwargs):
         return Model(data='test', template='404')
 
+    def stream_action(self, **kwargs):
+        yield 'streamed '
+        yield b'response'
+
 renderer_args = {
     'mapping': {
         SampleClass: {
@@ -116,6 +149,186 @@ class TestController(controllers.Rest):
         return 'Posted Hello World!'
 
 
+class RequestScopedController(controllers.Rest):
+    __scope__ = controllers.REQUEST_SCOPE
+
+    def GET(self, **kwargs):
+        return str(id(self))
+
+
+class PooledController(controllers.Rest):
+    __scope__ = controllers.POOLED_SCOPE
+    __pool_size__ = 1
+    resets = 0
+
+    def GET(self, **kwargs):
+        return str(id(self))
+
+    def POST(self, **kwargs):
+        yield 'path='
+        yield self.request.url.path
+
+    def reset(self):
+        super(PooledController, self).reset()
+        self.resets += 1
+
+
+class StatelessController(controllers.Rest):
+    __scope__ = controllers.SINGLETON_SCOPE
+
+    def GET(self, **kwargs):
+        return self.request.url.path
+
+    def POST(self, **kwargs):
+        yield 'path='
+        yield self.request.url.path
+
+
+class CountingController(controllers.Rest):
+    calls = 0
+
+    def GET(self, **kwargs):
+        CountingController.calls += 1
+        return 'Call {0}'.format(CountingController.calls)
+
+    def POST(self, **kwargs):
+        return self.GET()
+
+
+class ConditionalController(controllers.Rest):
+    calls = 0
+
+    def version(self, **kwargs):
+        return 'v1'
+
+    def modified(self, **kwargs):
+        return 1500000000
+
+    @conditional(etag=version, last_modified='modified')
+    def GET(self, **kwargs):
+        ConditionalController.calls += 1
+        return 'Hello World!'
+
+    def POST(self, **kwargs):
+        return 'Posted'
+
+
+class ProfiledController(controllers.Rest):
+
+    def GET(self, **kwargs):
+        return {'session': self.request.session is not None}
+
+    def POST(self, **kwargs):
+        raise Exception('Exception related to the code')
+
+    def PUT(self, **kwargs):
+        self.response.body = 'Unrendered'
+        return {'ignored': True}
+
+
+class CoalescedController(controllers.Rest):
+    calls = 0
+    started = threading.Event()
+    proceed = threading.Event()
+
+    @coalesce
+    def GET(self, **kwargs):
+        CoalescedController.calls += 1
+        CoalescedController.started.set()
+        CoalescedController.proceed.wait(5)
+        return 'Call {0}'.format(CoalescedController.calls)
+
+    @classmethod
+    def reset(cls):
+        cls.calls = 0
+        cls.started.clear()
+        cls.proceed.clear()
+
+
+class DeadlineController(controllers.Rest):
+
+    def GET(self, **kwargs):
+        deadline = self.deadline
+        return {'remaining': deadline.remaining if deadline else None}
+
+    def POST(self, **kwargs):
+        time.sleep(0.05)
+        return {'slow': True}
+
+
+class SessionController(controllers.Rest):
+
+    def GET(self, **kwargs):
+        return {'session': self.request.session_loaded}
+
+    def POST(self, **kwargs):
+        self.request.session['name'] = self.request.post['name']
+        return {'session': self.request.session_loaded}
+
+    def PUT(self, **kwargs):
+        return {'name': self.request.session.get('name')}
+
+
+class GatherController(controllers.Rest):
+
+    def GET(self, **kwargs):
+        return {'results': self.gather(lambda: 1, lambda: 2)}
+
+    def POST(self, **kwargs):
+        return {'results': self.gather(lambda: 1 / 0)}
+
+
+class CachedController(controllers.Rest):
+
+    calls = []
+
+    @local.request_cached
+    def lookup(self, name):
+        self.calls.append(name)
+        return name.upper()
+
+    def GET(self, **kwargs):
+        self.request_cache['first'] = self.lookup('user')
+        return {'content': [self.lookup('user'), self.lookup('other')]}
+
+
+class AsyncCoalescedController(controllers.Rest):
+
+    calls = 0
+
+    @coalesce
+    async def GET(self, **kwargs):
+        AsyncCoalescedController.calls += 1
+        await asyncio.sleep(0.1)
+        return 'Async coalesced'
+
+
+class EchoController(controllers.Rest):
+
+    def GET(self, **kwargs):
+        before = self.request.get['n']
+        time.sleep(0.05)
+        return {'before': before, 'after': self.request.get['n']}
+
+    async def POST(self, **kwargs):
+        before = self.request.get['n']
+        await asyncio.sleep(0.05)
+        self.response.headers.add('X-N', before)
+        return {'before': before, 'after': self.request.get['n']}
+
+
+class AsyncController(controllers.Rest):
+
+    async def GET(self, **kwargs):
+        return 'Async Hello World!'
+
+    async def POST(self, **kwargs):
+        return self.request.post['name']
+
+    async def DELETE(self, **kwargs):
+        raise TypeError('Exception related to the code')
+
+
 class SampleNonStringCommand(command.Base):
     name = 'nonstring'
 
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import time
+from watson.framework import admission, applications
+from tests.watson.framework.support import (create_feature_application,
+                                            make_request)
+from tests.watson.framework.test_applications import asgi_call, asgi_scope
+
+
+ROUTES = {
+    'home': {
+        'path': '/',
+        'options': {
+            'controller': 'tests.watson.framework.support.TestController'
+        },
+        'defaults': {'format': 'json'}
+    },
+    'limited': {
+        'path': '/limited',
+        'options': {
+            'controller': 'tests.watson.framework.support.TestController',
+            'concurrency': 1
+        },
+        'defaults': {'format': 'json'}
+    }
+}
+
+
+def create_application(**settings):
+    return create_feature_application('admission', settings, ROUTES)
+
+
+def request(application, path='/', **kwargs):
+    return make_request(application, path, **kwargs)
+
+
+class TestLimiter(object):
+
+    def test_acquire_release(self):
+        limiter = admission.Limiter(2)
+        assert limiter.acquire()
+        assert limiter.acquire()
+        assert not limiter.acquire()
+        assert limiter.in_flight == 2
+        assert repr(limiter) == '<watson.framework.admission.Limiter in_flight:2 limit:2>'
+        limiter.release()
+        assert limiter.in_flight == 1
+        assert limiter.acquire()
+
+    def test_queue_timeout(self):
+        limiter = admission.Limiter(1, timeout=0.05)
+        assert limiter.acquire()
+        start = time.time()
+        assert not limiter.acquire()
+        assert time.time() - start >= 0.05
+        assert not limiter.acquire(blocking=False)
+
+
+class TestRequestStart(object):
+
+    def test_units(self):
+        assert admission.request_start('t=1500000000.5') == 1500000000.5
+        assert admission.request_start('1500000000500') == 1500000000.5
+        assert admission.request_start('t=1500000000500000') == 1500000000.5
+
+    def test_invalid(self):
+        assert admission.request_start(None) is None
+        assert admission.request_start('t=abc') is None
+
+
+class TestAdmissionControl(object):
+
+    def test_disabled(self):
+        application = applications.Http()
+        assert application.admission is None
+
+    def test_admitted(self):
+        application = create_application(limit=2)
+        (status, headers), body = request(application)
+        assert status == '200 OK'
+        assert body == b'{"content": "Hello World!"}'
+        assert application.admission.limiter.in_flight == 0
+
+    def test_global_limit(self):
+        application = create_application(limit=1, retry_after=5)
+        router = application.container.get('router')
+        router.match = None  # the request must not be routed
+        application.admission.limiter.acquire()
+        (status, headers), body = request(application)
+        assert status == '503 Service Unavailable'
+        assert headers['Retry-After'] == '5'
+        assert headers['Content-Type'] == 'text/plain; charset=utf-8'
+        assert body == b'Service Unavailable'
+        assert application.admission.limiter.in_flight == 1
+
+    def test_route_limit(self):
+        application = create_application()
+        (status, headers), body = request(application, path='/limited')
+        assert status == '200 OK'
+        limiter = application.admission.routes['limited']
+        assert limiter.in_flight == 0
+        limiter.acquire()
+        (status, headers), body = request(application, path='/limited')
+        assert status.startswith('503')
+        assert headers['Retry-After'] == '1'
+        assert body == b'Service Unavailable'
+        (status, headers), body = request(application)
+        assert status == '200 OK'
+        assert application.admission.routes['home'] is None
+
+    def test_max_queue_time(self):
+        application = create_application(max_queue_time=1)
+        queued = 't={0:.3f}'.format(time.time() - 5)
+        (status, headers), body = request(
+            application, HTTP_X_REQUEST_START=queued)
+        assert status.startswith('503')
+        fresh = 't={0:.3f}'.format(time.time())
+        (status, headers), body = request(
+            application, HTTP_X_REQUEST_START=fresh)
+        assert status == '200 OK'
+
+    def test_exception_releases(self):
+        application = create_application(limit=1)
+        (status, headers), body = request(application, path='/missing')
+        assert status.startswith('404')
+        assert application.admission.limiter.in_flight == 0
+
+    def test_asgi(self):
+        application = applications.Asgi({
+            'routes': {
+                'home': {
+                    'path': '/',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.AsyncController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            },
+            'admission': {'enabled': True, 'limit': 1}
+        })
+        sent = asgi_call(application, asgi_scope())
+        assert sent[0]['status'] == 200
+        application.admission.limiter.acquire()
+        sent = asgi_call(application, asgi_scope())
+        assert sent[0]['status'] == 503
+        assert [b'retry-after', b'1'] in sent[0]['headers']
+        assert sent[1]['body'] == b'Service Unavailable'
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
-from pytest import raises
+import asyncio
+import json
+import sys
+import tracemalloc
+from pytest import mark, raises, skip
 from watson.di.container import IocContainer
-from watson.framework import applications, config, exceptions
+from watson.framework import applications, config, events, exceptions
 from watson.common.datastructures import module_to_dict
 from watson.http.messages import Request
 from tests.watson.framework.support import sample_environ, start_response, SampleNonStringCommand
@@ -75,6 +79,109 @@ class TestHttpApplication(object):
         response = application(environ, start_response)
         assert response == [b'{"name": "value"}']
 
+    def test_streamed_response(self):
+        application = applications.Http({
+            'routes': {
+                'home': {
+                    'path': '/',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.SampleActionController',
+                    },
+                    'defaults': {
+                        'action': 'stream'
+                    },
+                }
+            }
+        })
+        response = application(sample_environ(PATH_INFO='/'), start_response)
+        assert list(response) == [b'streamed ', b'response']
+
+    def test_head_request(self):
+        application = applications.Http({
+            'routes': {
+                'home': {
+                    'path': '/',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.TestController'
+                    }
+                },
+                'stream': {
+                    'path': '/stream',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.SampleActionController',
+                    },
+                    'defaults': {
+                        'action': 'stream'
+                    },
+                }
+            }
+        })
+        started = []
+
+        def capture(status, headers, exc_info=None):
+            started.append((status, dict(headers)))
+        # the template of GET does not exist, but HEAD never renders it
+        response = application(
+            sample_environ(PATH_INFO='/', REQUEST_METHOD='HEAD'), capture)
+        assert b''.join(response) == b''
+        status, headers = started.pop()
+        assert status.startswith('200')
+        assert headers['Content-Type'] == 'text/html'
+        response = application(
+            sample_environ(PATH_INFO='/stream', REQUEST_METHOD='HEAD'),
+            capture)
+        assert b''.join(response) == b''
+        response = application(
+            sample_environ(PATH_INFO='/', REQUEST_METHOD='OPTIONS'), capture)
+        status, headers = started.pop()
+        assert headers['Allow'] == 'GET, HEAD, OPTIONS, POST'
+        response = application(
+            sample_environ(PATH_INFO='/', REQUEST_METHOD='DELETE'), capture)
+        assert b''.join(response) == b'Method Not Allowed'
+        status, headers = started.pop()
+        assert status.startswith('405')
+
+    def test_post_response(self):
+        application = applications.Http({
+            'routes': {
+                'home': {
+                    'path': '/',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.SampleActionController',
+                    },
+                    'defaults': {
+                        'action': 'stream'
+                    },
+                }
+            }
+        })
+        triggered = []
+        application.dispatcher.add(
+            events.POST_RESPONSE,
+            lambda event: triggered.append(
+                (event.params['context']['response'],
+                 application.context is event.params['context'])))
+        body = application(sample_environ(PATH_INFO='/'), start_response)
+        assert list(body) == [b'streamed ', b'response']
+        assert not triggered
+        body.close()
+        body.close()
+        assert len(triggered) == 1
+        response, is_current_context = triggered[0]
+        assert response.status_code == 200
+        assert is_current_context
+        assert application.context is None
+
+    def test_post_response_exception(self):
+        application = applications.Http()
+
+        def listener(event):
+            raise Exception('Cleanup failed')
+        application.dispatcher.add(events.POST_RESPONSE, listener)
+        body = application(sample_environ(PATH_INFO='/'), start_response)
+        body.close()
+        assert '<h1>Not Found</h1>' in body[0].decode('utf-8')
+
     def test_raise_exception_event_not_found(self):
         application = applications.Http()
         response = application(sample_environ(PATH_INFO='/'), start_response)
@@ -138,6 +245,227 @@ class TestHttpApplication(object):
         assert '<h1>Internal Server Error</h1>' in response.body
 
 
+class TestAllocations(object):
+
+    # The peak memory (in bytes) allocated while handling a request that
+    # returns a scalar rendered as json, once the caches of the pipeline have
+    # been populated. Raise with care.
+    budget = 4096
+
+    # coverage allocates on each line executed, so this is deselected from
+    # the coverage run and executed separately via -m allocations --no-cov
+    @mark.allocations
+    @mark.skipif(not hasattr(tracemalloc, 'reset_peak'),
+                 reason='tracemalloc.reset_peak requires Python 3.9')
+    def test_request_budget(self):
+        if sys.gettrace() is not None:
+            # debuggers also allocate on each line executed
+            skip('the budget cannot be measured while tracing')
+        application = applications.Http({
+            'routes': {
+                'home': {
+                    'path': '/',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.TestController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            },
+            'session': {'class': 'watson.http.sessions.Memory'}
+        })
+
+        def request(environ):
+            body = application(environ, start_response)
+            b''.join(body)
+            body.close()
+
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(60):
+                environ = sample_environ(PATH_INFO='/')
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                request(environ)
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+        # the first requests populate the caches of the pipeline
+        assert max(peaks[30:]) < self.budget, peaks
+
+
+def asgi_scope(**kwargs):
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/',
+        'query_string': b'',
+        'headers': [(b'accept', b'application/json')],
+        'server': ('127.0.0.1', 8000),
+        'client': ('127.0.0.1', 50000)
+    }
+    scope.update(kwargs)
+    return scope
+
+
+def asgi_call(application, scope, body=b''):
+    messages = [{'type': 'http.request', 'body': body}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+    asyncio.run(application(scope, receive, send))
+    return sent
+
+
+class TestAsgiApplication(object):
+
+    def create_application(self, **config):
+        config.setdefault('routes', {
+            'home': {
+                'path': '/',
+                'options': {
+                    'controller': 'tests.watson.framework.support.AsyncController'
+                },
+                'defaults': {
+                    'format': 'json'
+                }
+            }
+        })
+        return applications.Asgi(config)
+
+    def test_async_action(self):
+        sent = asgi_call(self.create_application(), asgi_scope())
+        assert sent[0]['type'] == 'http.response.start'
+        assert sent[0]['status'] == 200
+        assert [b'content-type', b'application/json'] in sent[0]['headers']
+        assert sent[1]['body'] == b'{"content": "Async Hello World!"}'
+
+    def test_concurrent_requests(self):
+        application = self.create_application(routes={
+            'echo': {
+                'path': '/',
+                'accepts': ('POST',),
+                'options': {
+                    'controller': 'tests.watson.framework.support.EchoController'
+                },
+                'defaults': {'format': 'json'}
+            }
+        })
+
+        async def call(n):
+            sent = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                sent.append(message)
+            scope = asgi_scope(method='POST',
+                               query_string='n={0}'.format(n).encode())
+            await application(scope, receive, send)
+            return sent
+
+        async def run():
+            return await asyncio.gather(call(1), call(2))
+        for n, sent in enumerate(asyncio.run(run()), start=1):
+            assert json.loads(sent[1]['body'].decode()) == {
+                'before': str(n), 'after': str(n)}
+            assert [b'x-n', str(n).encode()] in sent[0]['headers']
+
+    def test_request_body(self):
+        scope = asgi_scope(
+            method='POST',
+            headers=[(b'content-type', b'application/x-www-form-urlencoded')])
+        sent = asgi_call(self.create_application(), scope, b'name=watson')
+        assert sent[1]['body'] == b'{"content": "watson"}'
+
+    def test_sync_action(self):
+        app = self.create_application(routes={
+            'home': {
+                'path': '/',
+                'options': {
+                    'controller': 'tests.watson.framework.support.TestController'
+                },
+                'defaults': {'format': 'json'}
+            }
+        })
+        sent = asgi_call(app, asgi_scope())
+        assert sent[1]['body'] == b'{"content": "Hello World!"}'
+
+    def test_async_action_exception(self):
+        sent = asgi_call(self.create_application(),
+                         asgi_scope(method='DELETE'))
+        assert sent[0]['status'] == 500
+
+    def test_streamed_response(self):
+        app = self.create_application(routes={
+            'home': {
+                'path': '/',
+                'options': {
+                    'controller': 'tests.watson.framework.support.SampleActionController'
+                },
+                'defaults': {'action': 'stream'}
+            }
+        })
+        sent = asgi_call(app, asgi_scope())
+        assert [message['body'] for message in sent[1:]] == [
+            b'streamed ', b'response', b'']
+        assert sent[1]['more_body']
+        assert not sent[-1].get('more_body')
+
+    def test_not_found(self):
+        sent = asgi_call(self.create_application(),
+                         asgi_scope(path='/missing', headers=[]))
+        assert sent[0]['status'] == 404
+        assert b'<h1>Not Found</h1>' in sent[1]['body']
+
+    def test_awaitable_listener(self):
+        app = self.create_application()
+        completed = []
+
+        async def listener(event):
+            await asyncio.sleep(0)
+            completed.append(event.name)
+        app.dispatcher.add(events.COMPLETE, listener)
+        asgi_call(app, asgi_scope())
+        assert completed == [events.COMPLETE]
+
+    def test_post_response(self):
+        application = self.create_application()
+        statuses = []
+
+        async def listener(event):
+            statuses.append(event.params['context']['response'].status_code)
+        application.dispatcher.add(events.POST_RESPONSE, listener)
+        asgi_call(application, asgi_scope())
+        assert statuses == [200]
+
+    def test_lifespan(self):
+        messages = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+        asyncio.run(self.create_application()(
+            {'type': 'lifespan'}, receive, send))
+        assert sent == ['lifespan.startup.complete',
+                        'lifespan.shutdown.complete']
+
+    def test_unsupported_scope(self):
+        with raises(ValueError):
+            asgi_call(self.create_application(), {'type': 'websocket'})
+
+
 class TestConsoleApplication(object):
 
     def test_create(self):
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+import json
+from io import BytesIO
+from watson.framework import applications
+from watson.framework.batch import controllers
+from tests.watson.framework.support import (create_feature_application,
+                                            make_request, sample_environ)
+
+
+ROUTES = {
+    'home': {
+        'path': '/',
+        'accepts': ('GET', 'POST'),
+        'options': {
+            'controller': 'tests.watson.framework.support.TestController'
+        },
+        'defaults': {'format': 'json'}
+    },
+    'session': {
+        'path': '/session',
+        'accepts': ('GET', 'POST', 'PUT'),
+        'options': {
+            'controller': 'tests.watson.framework.support.SessionController'
+        },
+        'defaults': {'format': 'json'}
+    },
+    'limited': {
+        'path': '/limited',
+        'options': {
+            'controller': 'tests.watson.framework.support.TestController',
+            'concurrency': 1
+        },
+        'defaults': {'format': 'json'}
+    }
+}
+
+
+def create_application(admission=None, **settings):
+    return create_feature_application(
+        'batch', settings, ROUTES,
+        session={'class': 'watson.http.sessions.Memory'},
+        admission=admission or {'enabled': False})
+
+
+def batch(application, specs, **kwargs):
+    body = (specs if isinstance(specs, str) else json.dumps(specs)).encode()
+    (status, headers), body = make_request(
+        application, '/batch', REQUEST_METHOD='POST',
+        CONTENT_LENGTH=str(len(body)),
+        **dict({'CONTENT_TYPE': 'application/json',
+                'wsgi.input': BytesIO(body)}, **kwargs))
+    return status, headers, body.decode('utf-8')
+
+
+class TestEnvironFromSpec(object):
+
+    def test_environ(self):
+        environ = sample_environ(HTTP_ACCEPT_ENCODING='gzip',
+                                 HTTP_COOKIE='a=b', QUERY_STRING='batch=1')
+        sub_environ = controllers.environ_from_spec(environ, {
+            'method': 'put',
+            'path': '/posts?page=2',
+            'headers': {'X-Requested-With': 'XMLHttpRequest'},
+            'body': {'title': 'Hello'}
+        })
+        assert sub_environ['REQUEST_METHOD'] == 'PUT'
+        assert sub_environ['PATH_INFO'] == '/posts'
+        assert sub_environ['QUERY_STRING'] == 'page=2'
+        assert sub_environ['HTTP_COOKIE'] == 'a=b'
+        assert sub_environ['HTTP_X_REQUESTED_WITH'] == 'XMLHttpRequest'
+        assert sub_environ['CONTENT_TYPE'] == 'application/json'
+        assert sub_environ['wsgi.input'].read() == b'{"title": "Hello"}'
+        assert 'HTTP_ACCEPT_ENCODING' not in sub_environ
+
+    def test_defaults(self):
+        sub_environ = controllers.environ_from_spec(
+            sample_environ(), {'path': '/'})
+        assert sub_environ['REQUEST_METHOD'] == 'GET'
+        assert sub_environ['CONTENT_LENGTH'] == '0'
+
+
+class TestBatch(object):
+
+    def test_disabled_by_default(self):
+        application = applications.Http()
+        assert 'watson.framework.batch' not in application.container.get(
+            'router')
+
+    def test_batch(self):
+        application = create_application()
+        status, headers, body = batch(application, [
+            {'path': '/'},
+            {'method': 'POST', 'path': '/'},
+            {'path': '/missing'}
+        ])
+        assert status == '200 OK'
+        assert dict(headers)['Content-Type'] == 'application/json'
+        results = json.loads(body)
+        assert [result['status'] for result in results] == [200, 200, 404]
+        assert json.loads(results[0]['body']) == {'content': 'Hello World!'}
+        assert json.loads(results[1]['body']) == {
+            'content': 'Posted Hello World!'}
+        assert results[0]['headers']['Content-Type'] == 'application/json'
+
+    def test_shared_session(self):
+        application = create_application()
+        status, headers, body = batch(application, [
+            {'method': 'POST', 'path': '/session', 'body': 'name=watson',
+             'headers': {
+                 'Content-Type': 'application/x-www-form-urlencoded'}},
+            {'method': 'PUT', 'path': '/session'}
+        ])
+        results = json.loads(body)
+        assert json.loads(results[1]['body']) == {'name': 'watson'}
+        assert 'Set-Cookie' not in results[0]['headers']
+        assert dict(headers)['Set-Cookie'].startswith('watson.session=')
+
+    def test_parallel(self):
+        application = create_application(workers=2)
+        status, headers, body = batch(application, [
+            {'path': '/'}, {'method': 'POST', 'path': '/'}, {'path': '/'}
+        ])
+        results = json.loads(body)
+        assert [json.loads(result['body'])['content'] for result in results] == [
+            'Hello World!', 'Posted Hello World!', 'Hello World!']
+
+    def test_invalid(self):
+        application = create_application(max_requests=2)
+        for specs in ('not json', {'path': '/'}, [{'method': 'GET'}],
+                      [{'path': '/'}] * 3):
+            status, headers, body = batch(application, specs)
+            assert status.startswith('400')
+        assert body == 'A batch request can contain at most 2 requests'
+
+    def test_content_type(self):
+        application = create_application()
+        for content_type in ('text/plain', 'application/x-www-form-urlencoded',
+                             'multipart/form-data; boundary=x', ''):
+            status, headers, body = batch(
+                application, [{'method': 'DELETE', 'path': '/'}],
+                CONTENT_TYPE=content_type)
+            assert status.startswith('400')
+            assert body == 'Batch requests must be sent as application/json'
+        status, headers, body = batch(
+            application, [{'path': '/'}],
+            CONTENT_TYPE='application/json; charset=utf-8')
+        assert status == '200 OK'
+
+    def test_nested(self):
+        application = create_application()
+        status, headers, body = batch(application, [
+            {'method': 'POST', 'path': '/batch', 'body': []}
+        ])
+        assert json.loads(body)[0]['status'] == 400
+
+    def test_releases_route_admission(self):
+        application = create_application(admission={'enabled': True})
+        for _ in range(2):
+            status, headers, body = batch(application, [{'path': '/limited'}])
+            assert json.loads(body)[0]['status'] == 200
+        assert application.admission.routes['limited'].in_flight == 0
+        assert application.admission.limiter is None or (
+            application.admission.limiter.in_flight == 0)
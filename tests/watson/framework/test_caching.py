@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import fcntl
+import gzip
+import os
+import threading
+import time
+from watson.framework import applications, events
+from watson.framework.caching import coalescing
+from tests.watson.framework.support import (sample_environ, start_response,
+                                            AsyncCoalescedController,
+                                            CoalescedController,
+                                            CountingController)
+
+
+def create_application(cache=True, **response_config):
+    return applications.Http({
+        'routes': {
+            'cached': {
+                'path': '/cached',
+                'accepts': ('GET', 'HEAD', 'POST'),
+                'options': {
+                    'controller': 'tests.watson.framework.support.CountingController',
+                    'cache': cache
+                },
+                'defaults': {'format': 'json'}
+            },
+            'uncached': {
+                'path': '/uncached',
+                'options': {
+                    'controller': 'tests.watson.framework.support.CountingController'
+                },
+                'defaults': {'format': 'json'}
+            }
+        },
+        'cache': {
+            'response': dict({'enabled': True}, **response_config)
+        }
+    })
+
+
+def request(application, path='/cached', start_response=start_response,
+            **kwargs):
+    environ = sample_environ(PATH_INFO=path, **kwargs)
+    body = application(environ, start_response)
+    # closed by the WSGI server once the response has been sent
+    body.close()
+    return body
+
+
+def age_cached_responses(storage, seconds):
+    for key, (cached, expires) in storage._cache.items():
+        if isinstance(cached, dict):
+            cached['created'] -= seconds
+            return key
+
+
+class TestResponseCache(object):
+
+    def setup(self):
+        CountingController.calls = 0
+
+    def test_disabled_by_default(self):
+        application = applications.Http()
+        assert len(application.dispatcher.events[events.ROUTE_MATCH]) == 1
+        application = create_application()
+        assert len(application.dispatcher.events[events.ROUTE_MATCH]) == 2
+
+    def test_cached_response(self):
+        application = create_application()
+        assert request(application) == [b'{"content": "Call 1"}']
+        assert request(application) == [b'{"content": "Call 1"}']
+        assert CountingController.calls == 1
+
+    def test_uncached_route(self):
+        application = create_application()
+        request(application, '/uncached')
+        assert request(application, '/uncached') == [b'{"content": "Call 2"}']
+
+    def test_key_varies(self):
+        application = create_application()
+        request(application)
+        request(application, QUERY_STRING='page=2')
+        request(application, HTTP_ACCEPT='text/html')
+        request(application, HTTP_ACCEPT='text/html')
+        assert CountingController.calls == 3
+
+    def test_post_is_not_cached(self):
+        application = create_application()
+        request(application, REQUEST_METHOD='POST')
+        request(application, REQUEST_METHOD='POST')
+        assert CountingController.calls == 2
+
+    def test_head_served_from_cache(self):
+        application = create_application()
+        request(application)
+        headers = {}
+        assert request(
+            application, REQUEST_METHOD='HEAD',
+            start_response=lambda status, response_headers: headers.update(
+                response_headers)) == [b'']
+        assert headers['Content-Length'] == str(len(b'{"content": "Call 1"}'))
+        assert headers['Content-Type'] == 'application/json'
+        assert CountingController.calls == 1
+        assert request(application) == [b'{"content": "Call 1"}']
+
+    def test_cached_not_modified(self):
+        application = create_application()
+        headers = {}
+        request(application,
+                start_response=lambda status, response_headers: headers.update(
+                    response_headers))
+        assert request(application, HTTP_IF_NONE_MATCH=headers['Etag']) == [
+            b'']
+        assert CountingController.calls == 1
+
+    def test_compressed_response(self):
+        application = create_application()
+        application.config['compression'].update(enabled=True, minimum_size=0)
+        compressed = request(application, HTTP_ACCEPT_ENCODING='gzip')
+        assert request(application, HTTP_ACCEPT_ENCODING='gzip') == compressed
+        assert gzip.decompress(compressed[0]) == b'{"content": "Call 1"}'
+        assert request(application) == [b'{"content": "Call 2"}']
+        assert CountingController.calls == 2
+
+    def test_invalidate(self):
+        application = create_application()
+        response_cache = application.container.get('response_cache')
+        request(application)
+        response_cache.invalidate('cached')
+        assert request(application) == [b'{"content": "Call 2"}']
+        response_cache.invalidate()
+        assert request(application) == [b'{"content": "Call 3"}']
+        assert request(application) == [b'{"content": "Call 3"}']
+
+    def test_route_settings(self):
+        response_cache = create_application().container.get('response_cache')
+
+        class Route(object):
+            def __init__(self, name, cache):
+                self.name, self.options = name, {'cache': cache}
+        assert response_cache.settings(Route('a', 60)) == {
+            'timeout': 60, 'stale': 0, 'vary': ('Accept',)}
+        assert response_cache.settings(
+            Route('b', {'stale': 10, 'vary': ['Cookie']})) == {
+            'timeout': 300, 'stale': 10, 'vary': ('Cookie',)}
+        assert response_cache.settings(Route('c', False)) is None
+
+    def test_stale_while_revalidate(self):
+        application = create_application(cache={'timeout': 10, 'stale': 30})
+        storage = application.container.get('response_cache').storage
+        request(application)
+        key = age_cached_responses(storage, 20)
+        # another request is already regenerating the response
+        storage.set('{0}:regenerate'.format(key), True, 30)
+        assert request(application) == [b'{"content": "Call 1"}']
+        del storage['{0}:regenerate'.format(key)]
+        assert request(application) == [b'{"content": "Call 2"}']
+        assert request(application) == [b'{"content": "Call 2"}']
+
+    def test_expired_beyond_stale(self):
+        application = create_application(cache={'timeout': 10, 'stale': 5})
+        storage = application.container.get('response_cache').storage
+        request(application)
+        age_cached_responses(storage, 20)
+        assert request(application) == [b'{"content": "Call 2"}']
+
+
+def create_coalescing_application(**coalesce_config):
+    return applications.Http({
+        'routes': {
+            'coalesced': {
+                'path': '/coalesced',
+                'options': {
+                    'controller': 'tests.watson.framework.support.CoalescedController'
+                },
+                'defaults': {'format': 'json'}
+            },
+            'counted': {
+                'path': '/counted',
+                'accepts': ('GET', 'POST'),
+                'options': {
+                    'controller': 'tests.watson.framework.support.CountingController',
+                    'coalesce': True
+                },
+                'defaults': {'format': 'json'}
+            }
+        },
+        'cache': {
+            'coalesce': dict({'enabled': True}, **coalesce_config)
+        }
+    })
+
+
+def concurrent_requests(application, count, path='/coalesced'):
+    bodies = [None] * count
+
+    def make_request(index):
+        bodies[index] = request(application, path)
+    threads = [threading.Thread(target=make_request, args=(index,))
+               for index in range(count)]
+    for thread in threads:
+        thread.start()
+        CoalescedController.started.wait(5)
+    # allow the waiting requests to join the in-flight request
+    time.sleep(0.1)
+    CoalescedController.proceed.set()
+    for thread in threads:
+        thread.join(5)
+    return bodies
+
+
+class TestRequestCoalescer(object):
+
+    def setup(self):
+        CoalescedController.reset()
+        CountingController.calls = 0
+
+    def test_coalesced(self):
+        application = create_coalescing_application()
+        bodies = concurrent_requests(application, 4)
+        assert bodies == [[b'{"content": "Call 1"}']] * 4
+        assert CoalescedController.calls == 1
+        assert not application.container.get('request_coalescer').flights
+
+    def test_sequential_requests_not_coalesced(self):
+        application = create_coalescing_application()
+        request(application, '/counted')
+        request(application, '/counted')
+        assert CountingController.calls == 2
+
+    def test_disabled(self):
+        application = create_coalescing_application(enabled=False)
+        CoalescedController.proceed.set()
+        concurrent_requests(application, 2)
+        assert CoalescedController.calls == 2
+
+    def test_unshareable_response(self):
+        application = create_coalescing_application()
+        coalescer = application.container.get('request_coalescer')
+        flight = coalescing.Flight('key')
+        coalescer.release(flight)
+        assert flight.wait(0)
+        assert flight.result is None
+
+    def test_timeout(self):
+        application = create_coalescing_application(timeout=0.01)
+        threads = [threading.Thread(
+            target=request, args=(application, '/coalesced'))
+            for index in range(2)]
+        threads[0].start()
+        CoalescedController.started.wait(5)
+        CoalescedController.started.clear()
+        # the second request gives up waiting and is executed itself
+        threads[1].start()
+        CoalescedController.started.wait(5)
+        CoalescedController.proceed.set()
+        for thread in threads:
+            thread.join(5)
+        assert CoalescedController.calls == 2
+
+    def test_across_processes(self, tmpdir):
+        application = create_coalescing_application(lock_dir=str(tmpdir))
+        storage = application.container.get('request_coalescer').storage
+        CoalescedController.proceed.set()
+        assert request(application, '/coalesced') == [
+            b'{"content": "Call 1"}']
+        key = next(key for key in storage._cache
+                   if key.startswith('watson.framework.coalesce'))
+        storage.set(key, dict(storage.get(key), body=b'{"content": "Shared"}'))
+        # simulate another process executing the same request
+        fd = os.open(str(tmpdir.listdir()[0]), os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        bodies = []
+        thread = threading.Thread(
+            target=lambda: bodies.append(request(application, '/coalesced')))
+        thread.start()
+        time.sleep(0.05)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+        thread.join(5)
+        assert bodies == [[b'{"content": "Shared"}']]
+        assert CoalescedController.calls == 1
+
+    def test_asgi_not_coalesced(self):
+        application = applications.Asgi({
+            'routes': {
+                'coalesced': {
+                    'path': '/coalesced',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.AsyncCoalescedController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            },
+            'cache': {'coalesce': {'enabled': True, 'timeout': 3}}
+        })
+        AsyncCoalescedController.calls = 0
+        scope = {
+            'type': 'http', 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': '/coalesced', 'query_string': b'',
+            'headers': [], 'server': ('127.0.0.1', 8000)
+        }
+
+        async def call():
+            sent = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                sent.append(message)
+            await application(scope, receive, send)
+            return sent
+
+        async def run():
+            return await asyncio.gather(call(), call())
+        started = time.monotonic()
+        results = asyncio.run(run())
+        # waiting on the leading request would block the loop until timeout
+        assert time.monotonic() - started < 1
+        assert [sent[0]['status'] for sent in results] == [200, 200]
+        assert AsyncCoalescedController.calls == 2
+        assert not application.container.get('request_coalescer').flights
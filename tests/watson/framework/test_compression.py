@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import gzip
+import zlib
+from watson.http.messages import Response
+from watson.framework import compression
+
+
+class TestCompression(object):
+
+    def test_negotiate(self):
+        assert compression.negotiate('gzip, deflate') == 'gzip'
+        assert compression.negotiate('deflate, gzip') == 'gzip'
+        assert compression.negotiate('gzip;q=0, deflate') == 'deflate'
+        assert compression.negotiate('deflate', ('gzip',)) is None
+        assert compression.negotiate('br') is None
+        assert compression.negotiate('*') == 'gzip'
+        assert compression.negotiate('*, gzip;q=0') == 'deflate'
+        assert compression.negotiate('gzip;q=invalid') is None
+        assert compression.negotiate(None) is None
+
+    def test_compress(self):
+        body = b'Hello World!' * 100
+        assert gzip.decompress(compression.compress(body, 'gzip')) == body
+        assert zlib.decompress(compression.compress(body, 'deflate')) == body
+        assert compression.compress(body, 'gzip') == \
+            compression.compress(body, 'gzip')
+
+    def test_compress_stream(self):
+        chunks = [b'Hello ', b'World!']
+        compressed = list(compression.compress_stream(iter(chunks), 'gzip'))
+        assert len(compressed) > 1
+        assert gzip.decompress(b''.join(compressed)) == b'Hello World!'
+
+    def test_is_compressible(self):
+        exclude = ('image/png', 'video/')
+        assert compression.is_compressible('text/html; charset=utf-8', exclude)
+        assert compression.is_compressible('image/svg+xml', exclude)
+        assert not compression.is_compressible('image/png', exclude)
+        assert not compression.is_compressible('video/mp4', exclude)
+        assert not compression.is_compressible(None, exclude)
+
+    def test_add_vary(self):
+        response = Response(200)
+        compression.add_vary(response, 'Accept-Encoding')
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        compression.add_vary(response, 'accept-encoding')
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        response = Response(200)
+        response.headers.add('Vary', 'Accept')
+        compression.add_vary(response, 'Accept-Encoding')
+        assert response.headers['Vary'] == 'Accept, Accept-Encoding'
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timezone
+from watson.http.messages import Request, Response
+from watson.framework import conditional
+from tests.watson.framework.support import (sample_environ,
+                                            ConditionalController)
+
+
+def create_request(**kwargs):
+    return Request.from_environ(sample_environ(**kwargs))
+
+
+class TestConditional(object):
+
+    def test_decorator(self):
+        etag, last_modified = ConditionalController.GET.__conditional__
+        assert etag is ConditionalController.version
+        assert last_modified == 'modified'
+
+    def test_validate(self):
+        controller = ConditionalController()
+        etag, last_modified = conditional.validate(
+            controller, controller.GET)
+        assert etag == '"v1"'
+        assert last_modified == datetime(
+            2017, 7, 14, 2, 40, tzinfo=timezone.utc)
+        assert conditional.validate(controller, controller.POST) is None
+
+    def test_generate_etag(self):
+        etag = conditional.generate_etag(b'body')
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == conditional.generate_etag(b'body')
+        assert etag != conditional.generate_etag(b'other body')
+
+    def test_http_date(self):
+        assert conditional.http_date(1500000000) == \
+            'Fri, 14 Jul 2017 02:40:00 GMT'
+        assert conditional.http_date(datetime(2017, 7, 14, 2, 40, 0, 5)) == \
+            'Fri, 14 Jul 2017 02:40:00 GMT'
+
+    def test_if_none_match(self):
+        request = create_request(HTTP_IF_NONE_MATCH='"a", W/"b"')
+        assert conditional.is_not_modified(request, '"a"')
+        assert conditional.is_not_modified(request, 'W/"b"')
+        assert not conditional.is_not_modified(request, '"c"')
+        assert not conditional.is_not_modified(request)
+        request = create_request(HTTP_IF_NONE_MATCH='*')
+        assert conditional.is_not_modified(request, '"c"')
+
+    def test_if_none_match_takes_precedence(self):
+        request = create_request(
+            HTTP_IF_NONE_MATCH='"a"',
+            HTTP_IF_MODIFIED_SINCE='Fri, 14 Jul 2017 02:40:00 GMT')
+        assert not conditional.is_not_modified(request, '"b"', 1500000000)
+
+    def test_if_modified_since(self):
+        request = create_request(
+            HTTP_IF_MODIFIED_SINCE='Fri, 14 Jul 2017 02:40:00 GMT')
+        assert conditional.is_not_modified(request, None, 1500000000.5)
+        assert not conditional.is_not_modified(request, None, 1500000001)
+        assert not conditional.is_not_modified(request)
+        request = create_request(HTTP_IF_MODIFIED_SINCE='invalid')
+        assert not conditional.is_not_modified(request, None, 1500000000)
+
+    def test_only_safe_methods(self):
+        request = create_request(REQUEST_METHOD='POST',
+                                 HTTP_IF_NONE_MATCH='"a"')
+        assert not conditional.is_not_modified(request, '"a"')
+
+    def test_not_modified(self):
+        response = Response(200, body='Hello')
+        conditional.set_validators(response, '"a"', 1500000000)
+        conditional.not_modified(response)
+        assert response.status_code == 304
+        assert response.raw_body == b''
+        assert response.headers['ETag'] == '"a"'
+        assert response.headers['Last-Modified'] == \
+            'Fri, 14 Jul 2017 02:40:00 GMT'
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import functools
+import threading
+import time
 from io import BytesIO, BufferedReader
 from pytest import raises
 from unittest.mock import Mock
@@ -6,9 +9,10 @@ from watson.di.container import IocContainer
 from watson.events import types
 from watson.http.messages import Request, Response
 from watson.http import sessions
-from watson.framework import controllers
+from watson.framework import applications, controllers, deadlines, local
+from watson.framework.exceptions import ApplicationError, InternalServerError
 from watson.routing.routers import DictRouter
-from tests.watson.framework.support import SampleActionController, SampleRestController, sample_environ
+from tests.watson.framework.support import SampleActionController, SampleRestController, GatherController, sample_environ
 
 
 class TestNotImplementedController(object):
@@ -18,6 +22,22 @@ class TestNotImplementedController(object):
             controllers.Base()
 
 
+class TestPool(object):
+
+    def test_acquire_release(self):
+        pool = controllers.Pool(SampleActionController, size=1)
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first is not second
+        first.execute(action='something')
+        pool.release(first)
+        pool.release(second)
+        assert len(pool) == 1
+        assert repr(pool) == '<watson.framework.controllers.Pool idle:1>'
+        assert pool.acquire() is first
+        assert '__action__' not in first.__dict__
+
+
 class TestBaseHttpController(object):
 
     def test_request_response(self):
@@ -163,6 +183,17 @@ class TestActionController(object):
         assert controller.get_execute_method_path(
             action='something') == ['sampleactioncontroller', 'something']
 
+    def test_method_key(self):
+        controller = SampleActionController()
+        assert controller.get_execute_method_key(action='something') == 'something'
+        assert controller.get_execute_method_key() == 'index'
+
+    def test_method_key_overridden_path(self):
+        class CustomPath(SampleActionController):
+            def get_execute_method_path(self, **kwargs):
+                return ['custom', kwargs.get('format', 'html')]
+        assert CustomPath().get_execute_method_key(action='something') is None
+
     def test_kwargs_missing(self):
         with raises(Exception):
             controller = SampleActionController()
@@ -188,6 +219,158 @@ class TestRestController(object):
         assert controller.get_execute_method_path() == [
             'samplerestcontroller', 'get']
 
+    def test_method_key(self):
+        controller = SampleRestController()
+        controller.request = Request.from_environ(
+            sample_environ(REQUEST_METHOD='POST'))
+        assert controller.get_execute_method_key() == 'POST'
+
+    def test_method_key_overridden_path(self):
+        class CustomPath(SampleRestController):
+            def get_execute_method_path(self, **kwargs):
+                return ['custom', self.request.method.lower()]
+        controller = CustomPath()
+        controller.request = Request.from_environ(sample_environ())
+        assert controller.get_execute_method_key() is None
+
+    def test_method_table(self):
+        assert SampleRestController.__methods__ == {
+            'GET': 'GET', 'HEAD': 'GET', 'OPTIONS': 'OPTIONS'}
+        assert SampleRestController.__allow__ == 'GET, HEAD, OPTIONS'
+        assert controllers.Rest.__allow__ == 'OPTIONS'
+        assert GatherController.__allow__ == 'GET, HEAD, OPTIONS, POST'
+
+    def test_head_falls_back_to_get(self):
+        controller = SampleRestController()
+        controller.request = Request.from_environ(
+            sample_environ(REQUEST_METHOD='HEAD'))
+        assert controller.execute() == 'GET'
+
+    def test_options(self):
+        controller = SampleRestController()
+        controller.request = Request.from_environ(
+            sample_environ(REQUEST_METHOD='OPTIONS'))
+        response = controller.execute()
+        assert response.status_code == 200
+        assert response.headers['Allow'] == 'GET, HEAD, OPTIONS'
+
+    def test_method_not_allowed(self):
+        controller = SampleRestController()
+        controller.request = Request.from_environ(
+            sample_environ(REQUEST_METHOD='DELETE'))
+        response = controller.execute()
+        assert response.status_code == 405
+        assert response.headers['Allow'] == 'GET, HEAD, OPTIONS'
+
+
+class TestGather(object):
+
+    def create_controller(self, **settings):
+        application = applications.Http({'gather': settings})
+        controller = SampleRestController()
+        controller.container = application.container
+        controller.request = Request.from_environ(sample_environ())
+        return controller
+
+    def test_results(self):
+        controller = self.create_controller()
+        threads = set()
+
+        def work(value):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.02)
+            return value
+
+        start = time.time()
+        assert controller.gather(
+            functools.partial(work, 1), functools.partial(work, 2)) == [1, 2]
+        assert time.time() - start < 0.04
+        assert all(name.startswith('watson.framework.gather')
+                   for name in threads)
+
+    def test_context(self):
+        controller = self.create_controller()
+        token = local.current_context.set({'request': 'test'})
+        try:
+            assert controller.gather(local.current_context.get) == [
+                {'request': 'test'}]
+        finally:
+            local.current_context.reset(token)
+
+    def test_errors(self):
+        controller = self.create_controller()
+
+        def fail():
+            raise ValueError('broken')
+
+        def not_found():
+            raise ApplicationError('Missing', 404)
+
+        with raises(InternalServerError) as exc:
+            controller.gather(fail)
+        assert isinstance(exc.value.__cause__, ValueError)
+        assert 'fail' in str(exc.value)
+        results = controller.gather(
+            fail, not_found, lambda: 'ok', return_exceptions=True)
+        assert isinstance(results[0], InternalServerError)
+        assert results[1].status_code == 404
+        assert results[2] == 'ok'
+
+    def test_timeout(self):
+        controller = self.create_controller(timeout=0.01)
+        with raises(InternalServerError) as exc:
+            controller.gather(functools.partial(time.sleep, 0.1))
+        assert 'did not complete within 0.01s' in str(exc.value)
+
+    def test_raised_timeout(self):
+        controller = self.create_controller(timeout=None)
+
+        def fail():
+            raise TimeoutError('upstream')
+
+        with raises(InternalServerError) as exc:
+            controller.gather(fail)
+        assert 'An error occurred executing' in str(exc.value)
+        assert isinstance(exc.value.__cause__, TimeoutError)
+        results = controller.gather(fail, return_exceptions=True)
+        assert isinstance(results[0].__cause__, TimeoutError)
+        controller = self.create_controller(timeout=1)
+        with raises(InternalServerError) as exc:
+            controller.gather(fail)
+        assert 'did not complete' not in str(exc.value)
+
+    def test_exception_flow(self):
+        application = applications.Http({
+            'routes': {
+                'gather': {
+                    'path': '/',
+                    'accepts': ('GET', 'POST'),
+                    'options': {
+                        'controller': 'tests.watson.framework.support.GatherController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            },
+            'logging': {'ignore_status': (500,)}
+        })
+        statuses = []
+
+        def start_response(status, headers):
+            statuses.append(status)
+
+        body = application(sample_environ(PATH_INFO='/'), start_response)
+        assert body == [b'{"results": [1, 2]}']
+        application(sample_environ(PATH_INFO='/', REQUEST_METHOD='POST'),
+                    start_response)
+        assert statuses == ['200 OK', '500 Internal Server Error']
+
+    def test_deadline(self):
+        controller = self.create_controller(timeout=None)
+        controller.event.params['context']['deadline'] = deadlines.Deadline(
+            0.01)
+        with raises(InternalServerError):
+            controller.gather(functools.partial(time.sleep, 0.1))
+
 
 class TestFlashMessageContainer(object):
 
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+from pytest import raises
+from watson.http.messages import Response
+from watson.framework import applications, cors
+from watson.framework.caching.response import serialize
+from tests.watson.framework.support import (create_feature_application,
+                                            make_request, CountingController)
+
+
+ROUTES = {
+    'api': {
+        'path': '/api',
+        'accepts': ('GET', 'POST'),
+        'options': {
+            'controller': 'tests.watson.framework.support.CountingController'
+        },
+        'defaults': {'format': 'json'}
+    },
+    'private': {
+        'path': '/private',
+        'options': {
+            'controller': 'tests.watson.framework.support.CountingController',
+            'cors': False
+        },
+        'defaults': {'format': 'json'}
+    },
+    'shared': {
+        'path': '/shared',
+        'options': {
+            'controller': 'tests.watson.framework.support.CountingController',
+            'cors': {
+                'origins': ('https://example.com',),
+                'methods': ('GET',),
+                'credentials': True,
+                'expose': ('ETag',),
+                'max_age': 3600
+            }
+        },
+        'defaults': {'format': 'json'}
+    }
+}
+
+
+def create_application(**settings):
+    return create_feature_application('cors', settings, ROUTES)
+
+
+def request(application, path='/api', **kwargs):
+    return make_request(application, path, **kwargs)
+
+
+def preflight(application, path='/api', method='POST',
+              origin='https://example.com'):
+    return request(application, path, REQUEST_METHOD='OPTIONS',
+                   HTTP_ORIGIN=origin,
+                   HTTP_ACCESS_CONTROL_REQUEST_METHOD=method)
+
+
+class TestPolicy(object):
+
+    def test_create_policy(self):
+        policy = cors.policy.create_policy({
+            'origins': ('*',),
+            'headers': ('Content-Type',),
+            'max_age': 60
+        }, ('GET', 'POST'))
+        assert policy.origins is None
+        assert policy.wildcard == '*'
+        assert policy.methods == {'GET', 'POST'}
+        assert policy.preflight == (
+            ('Access-Control-Allow-Methods', 'GET, POST'),
+            ('Access-Control-Max-Age', '60'),
+            ('Access-Control-Allow-Headers', 'Content-Type'))
+        assert policy.headers == ()
+
+    def test_credentials(self):
+        policy = cors.policy.create_policy({
+            'origins': ('https://example.com',),
+            'credentials': True,
+            'expose': ('ETag', 'Link'),
+            'max_age': 60
+        }, ('GET',))
+        assert policy.wildcard is None
+        assert policy.headers == (
+            ('Access-Control-Allow-Credentials', 'true'),
+            ('Access-Control-Expose-Headers', 'ETag, Link'))
+
+    def test_credentials_any_origin(self):
+        with raises(ValueError):
+            cors.policy.create_policy({
+                'origins': ('*',),
+                'credentials': True,
+                'max_age': 60
+            }, ('GET',))
+        with raises(ValueError):
+            create_application(origins=('*',), credentials=True)
+
+
+class TestCors(object):
+
+    def setup(self):
+        CountingController.calls = 0
+
+    def test_disabled_by_default(self):
+        application = applications.Http({
+            'routes': {
+                'api': {
+                    'path': '/api',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.CountingController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            }
+        })
+        (status, headers), body = request(
+            application, HTTP_ORIGIN='https://example.com')
+        assert 'Access-Control-Allow-Origin' not in headers
+
+    def test_policies_precomputed(self):
+        application = create_application()
+        policies = application.container.get('cors').policies
+        assert set(policies) == {'api', 'private', 'shared'}
+        assert policies['private'] is None
+
+    def test_preflight(self):
+        application = create_application()
+        (status, headers), body = preflight(application)
+        assert status == '204 No Content'
+        assert body == b''
+        assert headers['Access-Control-Allow-Origin'] == '*'
+        assert headers['Access-Control-Allow-Methods'] == 'GET, POST'
+        assert headers['Access-Control-Max-Age'] == '600'
+        assert headers['Access-Control-Allow-Headers'] == (
+            'Accept, Content-Type, X-Requested-With')
+        assert CountingController.calls == 0
+
+    def test_preflight_method_not_allowed(self):
+        application = create_application()
+        (status, headers), body = preflight(application, '/shared', 'POST')
+        assert status == '204 No Content'
+        assert 'Access-Control-Allow-Origin' not in headers
+        # the route does not accept the method
+        (status, headers), body = preflight(application, method='DELETE')
+        assert status.startswith('404')
+
+    def test_preflight_origin(self):
+        application = create_application()
+        (status, headers), body = preflight(
+            application, '/shared', 'GET', 'https://example.com')
+        assert headers['Access-Control-Allow-Origin'] == 'https://example.com'
+        assert headers['Access-Control-Allow-Credentials'] == 'true'
+        assert headers['Access-Control-Max-Age'] == '3600'
+        assert headers['Vary'] == 'Origin'
+        (status, headers), body = preflight(
+            application, '/shared', 'GET', 'https://evil.com')
+        assert 'Access-Control-Allow-Origin' not in headers
+
+    def test_preflight_unmatched(self):
+        application = create_application()
+        (status, headers), body = preflight(application, '/missing')
+        assert status.startswith('404')
+        (status, headers), body = preflight(application, '/private', 'GET')
+        assert 'Access-Control-Allow-Origin' not in headers
+
+    def test_response_headers(self):
+        application = create_application()
+        (status, headers), body = request(
+            application, HTTP_ORIGIN='https://example.com')
+        assert status == '200 OK'
+        assert headers['Access-Control-Allow-Origin'] == '*'
+        assert 'Access-Control-Allow-Methods' not in headers
+        (status, headers), body = request(
+            application, '/shared', HTTP_ORIGIN='https://example.com')
+        assert headers['Access-Control-Allow-Origin'] == 'https://example.com'
+        assert headers['Access-Control-Expose-Headers'] == 'ETag'
+        assert 'Origin' in headers['Vary']
+        (status, headers), body = request(application, '/private',
+                                          HTTP_ORIGIN='https://example.com')
+        assert 'Access-Control-Allow-Origin' not in headers
+        (status, headers), body = request(application)
+        assert 'Access-Control-Allow-Origin' not in headers
+
+    def test_unmatched_response_headers(self):
+        application = create_application()
+        (status, headers), body = request(
+            application, '/missing', HTTP_ORIGIN='https://example.com')
+        assert status.startswith('404')
+        assert 'Access-Control-Allow-Origin' not in headers
+
+    def test_headers_not_cached(self):
+        response = Response(200, body='Hello')
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        response.headers.add('Content-Type', 'text/plain')
+        assert serialize(response)['headers'] == [
+            ('Content-Type', 'text/plain')]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+from pytest import raises
+from watson.events.types import Event
+from watson.http.messages import Response
+from watson.framework import applications, deadlines, listeners, views
+from watson.framework.exceptions import DeadlineExceededError
+from tests.watson.framework.support import (create_feature_application,
+                                            make_request)
+
+
+def create_application(timeout=None, **options):
+    options.setdefault(
+        'controller', 'tests.watson.framework.support.DeadlineController')
+    routes = {
+        'deadline': {
+            'path': '/',
+            'accepts': ('GET', 'POST'),
+            'options': options,
+            'defaults': {'format': 'json'}
+        }
+    }
+    return create_feature_application(
+        'deadline', {'timeout': timeout}, routes,
+        logging={'ignore_status': (504,)})
+
+
+def request(application, **kwargs):
+    return make_request(application, **kwargs)
+
+
+class TestDeadline(object):
+
+    def test_remaining(self):
+        deadline = deadlines.Deadline(10)
+        assert not deadline.expired
+        assert 9 < deadline.remaining <= 10
+        assert repr(deadline).startswith(
+            '<watson.framework.deadlines.Deadline timeout:10 remaining:')
+        deadline.check()
+
+    def test_expired(self):
+        deadline = deadlines.Deadline(1, time.monotonic() - 2)
+        assert deadline.expired
+        assert deadline.remaining == 0.0
+        with raises(DeadlineExceededError) as exc:
+            deadline.check('render')
+        assert exc.value.status_code == 504
+        assert str(exc.value) == 'Deadline of 1s exceeded before render'
+
+    def test_check_context(self):
+        deadlines.check({})
+        with raises(DeadlineExceededError):
+            deadlines.check(
+                {'deadline': deadlines.Deadline(1, time.monotonic() - 2)})
+
+
+class TestListeners(object):
+
+    def expired_context(self):
+        return {
+            'response': Response(200),
+            'deadline': deadlines.Deadline(1, time.monotonic() - 2)
+        }
+
+    def test_dispatch(self):
+        listener = listeners.DispatchExecute({})
+        event = Event('dispatch', params={'context': self.expired_context()})
+        with raises(DeadlineExceededError):
+            listener(event)
+
+    def test_render(self):
+        app = applications.Http()
+        listener = app.container.get('app_render_listener')
+        vm = views.Model(format='json', data={'content': 'test'})
+        event = Event('render', params={
+            'context': self.expired_context(), 'view_model': vm,
+            'container': app.container})
+        with raises(DeadlineExceededError):
+            listener(event)
+
+
+class TestApplicationDeadlines(object):
+
+    def test_no_deadline(self):
+        application = create_application()
+        (status, headers), body = request(application)
+        assert json.loads(body.decode('utf-8')) == {'remaining': None}
+
+    def test_remaining(self):
+        application = create_application(timeout=30)
+        (status, headers), body = request(application)
+        assert status == '200 OK'
+        assert 0 < json.loads(body.decode('utf-8'))['remaining'] <= 30
+
+    def test_route_overrides(self):
+        application = create_application(timeout=30, deadline=False)
+        (status, headers), body = request(application)
+        assert json.loads(body.decode('utf-8')) == {'remaining': None}
+        application = create_application(deadline=5)
+        (status, headers), body = request(application)
+        assert 0 < json.loads(body.decode('utf-8'))['remaining'] <= 5
+
+    def test_exceeded_before_render(self):
+        application = create_application(deadline=0.01)
+        (status, headers), body = request(
+            application, REQUEST_METHOD='POST')
+        assert status == '504 Gateway Timeout'
+        assert headers['Content-Type'] == 'text/plain'
+        assert body == b'504 Gateway Timeout'
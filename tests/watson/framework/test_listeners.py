@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import gzip
 from wsgiref import util
 from pytest import raises
 from watson.di.container import IocContainer
@@ -7,8 +8,11 @@ from watson.http.messages import Request, Response
 from watson.routing.routers import DictRouter
 from watson.routing.routes import RouteMatch, LiteralRoute
 from watson.framework.exceptions import NotFoundError, InternalServerError
-from watson.framework import listeners, config, views, applications
-from tests.watson.framework.support import sample_environ
+from watson.framework import listeners, config, views, applications, controllers
+from watson.framework.responses import StreamingResponse
+from jinja2 import DictLoader
+from tests.watson.framework.support import (sample_environ,
+                                            ConditionalController)
 
 
 class TestBaseListener(object):
@@ -68,6 +72,23 @@ class TestDispatchExecuteListener(object):
         response, view_model = listener(event)
         assert isinstance(response, Response)
 
+    def test_head_short_circuit(self):
+        environ = sample_environ(REQUEST_METHOD='HEAD')
+        route = LiteralRoute(
+            'test',
+            path='/',
+            options={'controller': 'tests.watson.framework.support.ShortCircuitedController'})
+        match = RouteMatch(route, {})
+        context = {'request': Request.from_environ(environ), 'route_match': match}
+        event = Event(
+            'something',
+            params={'container': IocContainer(), 'context': context})
+        listener = listeners.DispatchExecute({'404': 'page/404'})
+        response, view_model = listener(event)
+        assert view_model is response
+        assert response.headers['Content-Length'] == '7'
+        assert response.raw_body == b''
+
     def test_returned_view_model(self):
         environ = sample_environ()
         route = LiteralRoute(
@@ -100,11 +121,282 @@ class TestDispatchExecuteListener(object):
         assert isinstance(view_model, views.Model)
         assert view_model.template == 'sampleactioncontroller/404'
 
+    def test_cached_view_template(self):
+        route = LiteralRoute(
+            'test',
+            path='/',
+            options={'controller': 'tests.watson.framework.support.SampleActionController'})
+        listener = listeners.DispatchExecute(
+            {'sampleactioncontroller/something': 'override'})
+        container = IocContainer()
+        for action in ('something', 'something', 'blah'):
+            context = {'request': Request.from_environ(sample_environ()),
+                       'route_match': RouteMatch(route, {'action': action})}
+            event = Event(
+                'something',
+                params={'container': container, 'context': context})
+            response, view_model = listener(event)
+        assert len(listener.view_templates) == 2
+        controller = container.get(
+            'tests.watson.framework.support.SampleActionController')
+        key = (controller.__class__, 'something')
+        assert listener.view_templates[key] == (
+            ('sampleactioncontroller', 'something'), 'override')
+        assert view_model.template == 'sampleactioncontroller/blah'
+
+    def test_streamed_controller(self):
+        route = LiteralRoute(
+            'test',
+            path='/',
+            options={'controller': 'tests.watson.framework.support.SampleActionController'})
+        match = RouteMatch(route, {'action': 'stream'})
+        context = {'request': Request.from_environ(sample_environ()), 'route_match': match}
+        event = Event(
+            'something',
+            params={'container': IocContainer(), 'context': context})
+        listener = listeners.DispatchExecute({})
+        response, view_model = listener(event)
+        assert isinstance(response, StreamingResponse)
+        assert context['response'] is response
+        assert response.headers['Content-Type'] == 'text/html'
+        assert response.body == 'streamed response'
+
+    def dispatch_conditional(self, **environ):
+        route = LiteralRoute(
+            'test',
+            path='/',
+            options={'controller': 'tests.watson.framework.support.ConditionalController'})
+        context = {
+            'request': Request.from_environ(sample_environ(**environ)),
+            'route_match': RouteMatch(route, {})}
+        event = Event(
+            'something', params={'container': IocContainer(), 'context': context})
+        return listeners.DispatchExecute({})(event)
+
+    def test_conditional_not_modified(self):
+        ConditionalController.calls = 0
+        response, view_model = self.dispatch_conditional(
+            HTTP_IF_NONE_MATCH='"v1"')
+        assert response is view_model
+        assert response.status_code == 304
+        assert response.headers['ETag'] == '"v1"'
+        assert ConditionalController.calls == 0
+
+    def test_conditional_modified(self):
+        ConditionalController.calls = 0
+        response, view_model = self.dispatch_conditional(
+            HTTP_IF_MODIFIED_SINCE='Fri, 14 Jul 2017 02:39:59 GMT')
+        assert response.status_code == 200
+        assert view_model.data['content'] == 'Hello World!'
+        assert response.headers['Last-Modified'] == \
+            'Fri, 14 Jul 2017 02:40:00 GMT'
+        assert ConditionalController.calls == 1
+
+    def test_conditional_unsafe_method(self):
+        response, view_model = self.dispatch_conditional(
+            REQUEST_METHOD='POST', HTTP_IF_NONE_MATCH='"v1"')
+        assert view_model.data['content'] == 'Posted'
+        assert 'ETag' not in response.headers
+
+
+class TestControllerScopes(object):
+
+    def dispatch(self, listener, container, controller, path='/'):
+        route = LiteralRoute(
+            'test',
+            path='/',
+            options={'controller': 'tests.watson.framework.support.' + controller})
+        context = {
+            'request': Request.from_environ(sample_environ(PATH_INFO=path)),
+            'route_match': RouteMatch(route, {})}
+        event = Event(
+            'something', params={'container': container, 'context': context})
+        response, view_model = listener(event)
+        return view_model.data['content']
+
+    def test_unscoped(self):
+        listener = listeners.DispatchExecute({})
+        container = IocContainer()
+        first = self.dispatch(listener, container, 'SampleRestController')
+        assert first == 'GET'
+        scope, pool = listener.controller_scopes[
+            'tests.watson.framework.support.SampleRestController']
+        assert scope is None and pool is None
+
+    def test_request_scope(self):
+        listener = listeners.DispatchExecute({})
+        container = IocContainer()
+        container.get('tests.watson.framework.support.RequestScopedController')
+        first = self.dispatch(listener, container, 'RequestScopedController')
+        second = self.dispatch(listener, container, 'RequestScopedController')
+        assert first != second
+
+    def dispatch_stream(self, listener, container, controller, path='/'):
+        route = LiteralRoute(
+            'test',
+            path='/',
+            options={'controller': 'tests.watson.framework.support.' + controller})
+        context = {
+            'request': Request.from_environ(
+                sample_environ(PATH_INFO=path, REQUEST_METHOD='POST')),
+            'route_match': RouteMatch(route, {})}
+        event = Event(
+            'something', params={'container': container, 'context': context})
+        response, view_model = listener(event)
+        return response
+
+    def test_streamed_scopes(self):
+        listener = listeners.DispatchExecute({})
+        container = IocContainer()
+        for controller in ('PooledController', 'StatelessController'):
+            response = self.dispatch_stream(
+                listener, container, controller, path='/streamed')
+            assert b''.join(response.chunks()) == b'path=/streamed'
+        scope, pool = listener.controller_scopes[
+            'tests.watson.framework.support.PooledController']
+        # the pooled controller is only released once the stream has closed
+        response = self.dispatch_stream(listener, container, 'PooledController')
+        assert len(pool) == 0
+        assert b''.join(response.chunks()) == b'path=/'
+        assert len(pool) == 1
+
+    def test_pooled_scope(self):
+        listener = listeners.DispatchExecute({})
+        container = IocContainer()
+        first = self.dispatch(listener, container, 'PooledController')
+        second = self.dispatch(listener, container, 'PooledController')
+        assert first == second
+        scope, pool = listener.controller_scopes[
+            'tests.watson.framework.support.PooledController']
+        assert scope == controllers.POOLED_SCOPE
+        controller = pool.idle[0]
+        assert controller.resets == 2
+        assert not controller._event
+
+    def test_singleton_scope(self):
+        listener = listeners.DispatchExecute({})
+        container = IocContainer()
+        assert self.dispatch(
+            listener, container, 'StatelessController', '/first') == '/first'
+        assert self.dispatch(
+            listener, container, 'StatelessController', '/second') == '/second'
+        controller = container.get(
+            'tests.watson.framework.support.StatelessController')
+        assert not controller._event
+        assert controller.request is None
+
 
 class TestExceptionListener(object):
     pass
 
 
+class TestCompressListener(object):
+
+    def trigger(self, response, **environ):
+        context = {
+            'request': Request.from_environ(sample_environ(**environ)),
+            'response': response}
+        listener = listeners.Compress(
+            dict(config.compression, enabled=True, minimum_size=10))
+        listener(Event('render', params={'context': context}))
+        return response
+
+    def create_response(self, body='Hello World!', content_type='text/html'):
+        response = Response(200, body=body)
+        response.headers.add('Content-Type', content_type)
+        return response
+
+    def test_compress(self):
+        response = self.trigger(
+            self.create_response(), HTTP_ACCEPT_ENCODING='gzip')
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(response.raw_body) == b'Hello World!'
+
+    def test_not_accepted(self):
+        response = self.trigger(self.create_response())
+        assert 'Content-Encoding' not in response.headers
+        assert response.headers['Vary'] == 'Accept-Encoding'
+
+    def test_skipped(self):
+        response = self.trigger(
+            self.create_response('Hello'), HTTP_ACCEPT_ENCODING='gzip')
+        assert response.body == 'Hello'
+        response = self.trigger(
+            self.create_response(content_type='image/png'),
+            HTTP_ACCEPT_ENCODING='gzip')
+        assert 'Vary' not in response.headers
+        response = self.create_response()
+        response.headers.add('Content-Encoding', 'br')
+        response = self.trigger(response, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.body == 'Hello World!'
+
+    def test_weak_etag(self):
+        response = self.create_response()
+        response.headers.add('ETag', '"v1"')
+        response = self.trigger(response, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.headers['ETag'] == 'W/"v1"'
+
+    def test_stream(self):
+        response = StreamingResponse(200, stream=iter(['Hello', ' World!']))
+        response.headers.add('Content-Type', 'text/html')
+        response = self.trigger(response, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.raw_body) == b'Hello World!'
+
+    def test_disabled(self):
+        response = self.create_response()
+        context = {
+            'request': Request.from_environ(
+                sample_environ(HTTP_ACCEPT_ENCODING='gzip')),
+            'response': response}
+        listeners.Compress(config.compression)(
+            Event('render', params={'context': context}))
+        assert 'Content-Encoding' not in response.headers
+
+
+class TestETagListener(object):
+
+    def trigger(self, response, config=None, **environ):
+        context = {
+            'request': Request.from_environ(sample_environ(**environ)),
+            'response': response}
+        listener = listeners.ETag(config or {'etag': True})
+        listener(Event('render', params={'context': context}))
+        return response
+
+    def test_generate(self):
+        response = self.trigger(Response(200, body='Hello'))
+        assert response.headers['ETag'].startswith('"')
+        assert response.body == 'Hello'
+
+    def test_disabled(self):
+        response = self.trigger(Response(200, body='Hello'), {'etag': False})
+        assert 'ETag' not in response.headers
+
+    def test_not_modified(self):
+        etag = self.trigger(Response(200, body='Hello')).headers['ETag']
+        response = self.trigger(
+            Response(200, body='Hello'), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.raw_body == b''
+
+    def test_existing_etag(self):
+        response = Response(200, body='Hello')
+        response.headers.add('ETag', '"v1"')
+        response = self.trigger(response, HTTP_IF_NONE_MATCH='"v1"')
+        assert response.status_code == 304
+
+    def test_ignored_responses(self):
+        response = self.trigger(Response(404, body='Not Found'))
+        assert 'ETag' not in response.headers
+        response = self.trigger(
+            Response(200, body='Hello'), REQUEST_METHOD='POST')
+        assert 'ETag' not in response.headers
+        response = self.trigger(StreamingResponse(200, stream=iter(['a'])))
+        assert 'ETag' not in response.headers
+
+
 class TestRenderListener(object):
     def test_execute(self):
         app = applications.Http()
@@ -125,3 +417,41 @@ class TestRenderListener(object):
         response = listener(event)
         assert response.status_code == 200
         assert response.headers['Content-Type'] == 'application/json'
+
+    def test_streamed_body(self):
+        app = applications.Http()
+        listener = app.container.get('app_render_listener')
+        context = {'response': Response(200)}
+        renderer = app.container.get('jinja2_renderer')
+        renderer._fully_loaded = True
+        renderer.env.loader = DictLoader({'stream.html': '<p>{{ text }}</p>'})
+        vm = views.Model(format='html', template='stream', data={'text': 'streamed'}, stream=True)
+        event = Event('render', params={
+            'context': context, 'view_model': vm, 'container': app.container})
+        response = listener(event)
+        assert isinstance(response, StreamingResponse)
+        assert context['response'] is response
+        assert response.headers['Content-Type'] == 'text/html'
+        assert response.body == '<p>streamed</p>'
+
+    def test_format_table(self):
+        app = applications.Http()
+        listener = app.container.get('app_render_listener')
+        listener.compile(app.container)
+        assert set(listener.formats) == {'jinja2', 'xml', 'json'}
+        renderer, mime_type = listener.formats['json']
+        assert renderer is app.container.get('json_renderer')
+        assert mime_type == 'application/json'
+        assert listener.resolve('csv', app.container) == (
+            listener.default_renderer, 'text/csv')
+        assert listener.resolve('image/png', app.container)[1] == 'image/png'
+        assert 'csv' in listener.formats
+
+    def test_format_table_limit(self):
+        app = applications.Http()
+        listener = listeners.Render(config.views)
+        listener.max_formats = 3
+        listener.compile(app.container)
+        listener.resolve('csv', app.container)
+        assert 'csv' not in listener.formats
+        assert listener.resolve('csv', app.container)[1] == 'text/csv'
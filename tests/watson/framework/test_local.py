@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import threading
+from watson.framework import applications, events, local
+from tests.watson.framework.support import (make_request, sample_environ,
+                                            start_response, CachedController)
+
+
+class Sample(object):
+    value = local.RequestLocal()
+    items = local.RequestLocal(list)
+
+
+class TestRequestLocal(object):
+
+    def test_outside_request(self):
+        sample = Sample()
+        assert sample.value is None
+        sample.value = 'test'
+        sample.items.append(1)
+        assert sample.value == 'test'
+        assert sample.items == [1]
+        del sample.value
+        assert sample.value is None
+        assert isinstance(Sample.value, local.RequestLocal)
+
+    def test_within_request(self):
+        sample = Sample()
+        sample.value = 'outside'
+        context = {}
+        token = local.current_context.set(context)
+        try:
+            assert sample.value is None
+            sample.value = 'inside'
+            sample.items.append(1)
+            assert sample.value == 'inside'
+        finally:
+            local.current_context.reset(token)
+        assert sample.value == 'outside'
+        assert sample.items == []
+        assert context['locals'][id(sample)] == {
+            'value': 'inside', 'items': [1]}
+
+    def test_isolated_between_threads(self):
+        sample = Sample()
+        barrier = threading.Barrier(2)
+        results = {}
+
+        def run(name):
+            token = local.current_context.set({})
+            try:
+                sample.value = name
+                barrier.wait()
+                results[name] = sample.value
+            finally:
+                local.current_context.reset(token)
+        threads = [threading.Thread(target=run, args=(name,))
+                   for name in ('first', 'second')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == {'first': 'first', 'second': 'second'}
+
+
+class TestRequestCached(object):
+
+    def test_outside_request(self):
+        calls = []
+
+        @local.request_cached
+        def lookup(value):
+            calls.append(value)
+            return value
+
+        assert local.request_cache() is None
+        assert lookup(1) == lookup(1) == 1
+        assert calls == [1, 1]
+
+    def test_within_request(self):
+        calls = []
+
+        @local.request_cached
+        def lookup(value, option=None):
+            calls.append(value)
+            return value
+
+        context = {}
+        token = local.current_context.set(context)
+        try:
+            assert lookup(1) == lookup(1) == 1
+            assert lookup(1, option=True) == 1
+            assert lookup([2]) == lookup([2]) == [2]
+        finally:
+            local.current_context.reset(token)
+        # unhashable arguments are not cached
+        assert calls == [1, 1, [2], [2]]
+        assert len(context['request_cache']) == 2
+
+    def test_exceptions_not_cached(self):
+        calls = []
+
+        @local.request_cached
+        def fail():
+            calls.append(1)
+            raise ValueError('failed')
+
+        token = local.current_context.set({})
+        try:
+            for _ in range(2):
+                try:
+                    fail()
+                except ValueError:
+                    pass
+        finally:
+            local.current_context.reset(token)
+        assert len(calls) == 2
+
+    def test_coroutine(self):
+        calls = []
+
+        @local.request_cached
+        async def lookup(value):
+            calls.append(value)
+            return value
+
+        async def run():
+            token = local.current_context.set({})
+            try:
+                return [await lookup(1), await lookup(1)]
+            finally:
+                local.current_context.reset(token)
+        assert asyncio.run(run()) == [1, 1]
+        assert calls == [1]
+
+    def test_cleared_on_complete(self):
+        seen = []
+        application = applications.Http({
+            'routes': {
+                'cached': {
+                    'path': '/cached',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.CachedController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            }
+        })
+        application.dispatcher.add(
+            events.COMPLETE,
+            lambda event: seen.append(
+                dict(event.params['context']['request_cache'])),
+            1)
+        application.dispatcher.add(
+            events.COMPLETE,
+            lambda event: seen.append(
+                'request_cache' in event.params['context']),
+            -2000)
+        del CachedController.calls[:]
+        for _ in range(2):
+            response = application(
+                sample_environ(PATH_INFO='/cached'), start_response)
+            assert b''.join(response) == b'{"content": ["USER", "OTHER"]}'
+        # cached within each request, but not between requests
+        assert CachedController.calls == ['user', 'other'] * 2
+        assert seen[0]['first'] == 'USER'
+        assert seen[1] is False
+
+
+class TestApplicationContext(object):
+
+    def test_context(self):
+        seen = []
+        application = applications.Http({
+            'routes': {
+                'home': {
+                    'path': '/',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.TestController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            }
+        })
+        application.dispatcher.add(
+            events.DISPATCH_EXECUTE,
+            lambda event: seen.append(
+                (application.context, local.current_application.get())),
+            2)
+        application(sample_environ(PATH_INFO='/'), start_response)
+        context, current_application = seen[0]
+        assert context['request'].url.path == '/'
+        assert current_application is application
+        assert application.context is None
+        assert local.current_application.get() is None
+
+    def test_concurrent_threads(self):
+        application = applications.Http({
+            'routes': {
+                'echo': {
+                    'path': '/',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.EchoController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            }
+        })
+        bodies = {}
+
+        def run(n):
+            (status, headers), body = make_request(
+                application, '/', QUERY_STRING='n={0}'.format(n))
+            bodies[n] = json.loads(body.decode('utf-8'))
+        threads = [threading.Thread(target=run, args=(n,)) for n in (1, 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        assert bodies == {
+            1: {'before': '1', 'after': '1'},
+            2: {'before': '2', 'after': '2'}}
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import os
+from wsgiref.util import FileWrapper
+from watson.framework import applications, middleware
+from watson.framework.conditional import http_date
+from tests.watson.framework.support import make_request
+
+
+class Tagging(object):
+
+    def __init__(self, application, tag='outer'):
+        self.application = application
+        self.tag = tag
+
+    def __call__(self, environ, start_response):
+        environ.setdefault('tags', []).append(self.tag)
+        return self.application(environ, start_response)
+
+
+def hello(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'Hello']
+
+
+class TestBuild(object):
+
+    def test_empty(self):
+        assert middleware.build(hello, []) is hello
+
+    def test_order(self):
+        stack = middleware.build(hello, [
+            Tagging,
+            {'class': Tagging, 'options': {'tag': 'disabled'},
+             'enabled': False},
+            {'class': 'tests.watson.framework.test_middleware.Tagging',
+             'options': {'tag': 'inner'}}
+        ])
+        assert stack.application.application is hello
+        tags = []
+        make_request(stack, tags=tags)
+        assert tags == ['outer', 'inner']
+
+
+class TestTiming(object):
+
+    def test_header(self):
+        stack = middleware.Timing(hello, name='watson')
+        (status, headers), body = make_request(stack)
+        assert body == b'Hello'
+        assert headers['Server-Timing'].startswith('watson;dur=')
+
+
+class TestStatic(object):
+
+    def create_static(self, tmpdir):
+        tmpdir.join('style.css').write('body {}')
+        tmpdir.mkdir('js').join('app.js').write('var a;')
+        return middleware.Static(hello, str(tmpdir), prefix='assets')
+
+    def test_serves_files(self, tmpdir):
+        static = self.create_static(tmpdir)
+        (status, headers), body = make_request(static, '/assets/style.css')
+        assert status == '200 OK'
+        assert body == b'body {}'
+        assert headers['Content-Type'] == 'text/css'
+        assert headers['Content-Length'] == '7'
+        assert headers['Cache-Control'] == 'max-age=3600'
+        (status, headers), body = make_request(static, '/assets/js/app.js')
+        assert body == b'var a;'
+
+    def test_file_wrapper(self, tmpdir):
+        static = self.create_static(tmpdir)
+        (status, headers), body = make_request(
+            static, '/assets/style.css', **{'wsgi.file_wrapper': FileWrapper})
+        assert body == b'body {}'
+
+    def test_not_modified(self, tmpdir):
+        static = self.create_static(tmpdir)
+        modified = http_date(os.stat(str(tmpdir.join('style.css'))).st_mtime)
+        (status, headers), body = make_request(
+            static, '/assets/style.css', HTTP_IF_MODIFIED_SINCE=modified)
+        assert status == '304 Not Modified'
+        assert body == b''
+
+    def test_head(self, tmpdir):
+        static = self.create_static(tmpdir)
+        (status, headers), body = make_request(
+            static, '/assets/style.css', REQUEST_METHOD='HEAD')
+        assert headers['Content-Length'] == '7'
+        assert body == b''
+
+    def test_passes_through(self, tmpdir):
+        static = self.create_static(tmpdir)
+        tmpdir.dirpath().join('secret.txt').write('secret')
+        for path in ('/', '/assets/missing.css', '/assets/js',
+                     '/assets/../secret.txt'):
+            (status, headers), body = make_request(static, path)
+            assert body == b'Hello'
+        (status, headers), body = make_request(
+            static, '/assets/style.css', REQUEST_METHOD='POST')
+        assert body == b'Hello'
+
+
+class TestApplicationMiddleware(object):
+
+    def test_no_middleware(self):
+        application = applications.Http()
+        assert application.middleware is None
+
+    def test_wraps_run(self, tmpdir):
+        tmpdir.join('robots.txt').write('User-agent: *')
+        application = applications.Http({
+            'routes': {
+                'home': {
+                    'path': '/',
+                    'options': {
+                        'controller': 'tests.watson.framework.support.TestController'
+                    },
+                    'defaults': {'format': 'json'}
+                }
+            },
+            'middleware': [
+                'watson.framework.middleware.Timing',
+                {
+                    'class': 'watson.framework.middleware.Static',
+                    'options': {'path': str(tmpdir), 'prefix': '/'}
+                },
+                {
+                    'class': 'tests.watson.framework.test_middleware.Tagging',
+                    'options': {'tag': 'application'}
+                }
+            ]
+        })
+        tags = []
+        (status, headers), body = make_request(application, tags=tags)
+        assert body == b'{"content": "Hello World!"}'
+        assert 'Server-Timing' in headers
+        assert tags == ['application']
+        tags = []
+        (status, headers), body = make_request(
+            application, '/robots.txt', tags=tags)
+        assert body == b'User-agent: *'
+        # served without reaching the application
+        assert tags == []
+        assert 'Server-Timing' in headers
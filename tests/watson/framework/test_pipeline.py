@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from watson.framework import pipeline
+from tests.watson.framework.support import (create_feature_application,
+                                            make_request)
+
+
+def create_application(profile):
+    routes = {
+        'profiled': {
+            'path': '/',
+            'accepts': ('GET', 'POST', 'PUT'),
+            'options': {
+                'controller': 'tests.watson.framework.support.ProfiledController',
+                'pipeline': profile
+            }
+        }
+    }
+    return create_feature_application(
+        'pipeline',
+        {'profiles': {'api': {'session': False, 'render': 'json'}}},
+        routes, logging={'ignore_status': (500,)})
+
+
+def request(application, **kwargs):
+    return make_request(application, **kwargs)
+
+
+class TestProfile(object):
+
+    def test_default(self):
+        profile = pipeline.Profile.from_options(None)
+        assert profile == pipeline.DEFAULT_PROFILE
+        assert profile.session and profile.toolbar and profile.render
+
+    def test_from_options(self):
+        profile = pipeline.Profile.from_options(
+            {'session': False, 'render': 'json'})
+        assert not profile.session
+        assert profile.toolbar
+        assert profile.render == 'json'
+
+    def test_named(self):
+        profile = pipeline.Profile.from_options(
+            'api', {'api': {'toolbar': False}})
+        assert not profile.toolbar
+        assert profile.session
+
+
+class TestApplicationProfiles(object):
+
+    def test_default_profile(self):
+        application = create_application(None)
+        route = application.container.get('router').routes['profiled']
+        assert application.get_profile(route) is pipeline.DEFAULT_PROFILE
+
+    def test_session_and_render(self):
+        application = create_application('api')
+        (status, headers), body = request(
+            application, HTTP_ACCEPT='text/html')
+        assert body == b'{"session": false}'
+        assert headers['Content-Type'] == 'application/json'
+
+    def test_minimal_exceptions(self):
+        application = create_application({'exceptions': False})
+        (status, headers), body = request(
+            application, REQUEST_METHOD='POST')
+        assert status.startswith('500')
+        assert body == b'500 Internal Server Error'
+        assert headers['Content-Type'] == 'text/plain'
+
+    def test_no_render(self):
+        application = create_application({'render': False})
+        (status, headers), body = request(
+            application, REQUEST_METHOD='PUT')
+        assert body == b'Unrendered'
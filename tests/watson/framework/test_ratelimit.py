@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+from pytest import raises
+from watson.http.messages import Request
+from watson.http.sessions import Memory as MemoryStorage
+from watson.framework import applications, events
+from watson.framework.ratelimit import backends
+from tests.watson.framework.support import (create_feature_application,
+                                            make_request, sample_environ)
+
+
+ROUTES = {
+    'home': {
+        'path': '/',
+        'options': {
+            'controller': 'tests.watson.framework.support.TestController'
+        },
+        'defaults': {'format': 'json'}
+    },
+    'login': {
+        'path': '/login',
+        'options': {
+            'controller': 'tests.watson.framework.support.TestController',
+            'ratelimit': {'rate': 0.01, 'burst': 2}
+        },
+        'defaults': {'format': 'json'}
+    },
+    'search': {
+        'path': '/search',
+        'options': {
+            'controller': 'tests.watson.framework.support.TestController',
+            'ratelimit': {'rate': 0.01, 'burst': 1, 'key': 'route'}
+        },
+        'defaults': {'format': 'json'}
+    }
+}
+
+
+def create_application(**ratelimit):
+    ratelimit.setdefault('backend', {
+        'class': 'watson.framework.ratelimit.backends.Memory',
+        'options': {}
+    })
+    return create_feature_application('ratelimit', ratelimit, ROUTES)
+
+
+def request(application, path='/', remote_addr='10.0.0.1', **kwargs):
+    return make_request(application, path, REMOTE_ADDR=remote_addr, **kwargs)
+
+
+class TestConsume(object):
+
+    def test_take(self):
+        assert backends.consume(5, 0, 0, 1, 5) == (True, 4, 0.0)
+        assert backends.consume(0.5, 0, 0, 1, 5) == (False, 0.5, 0.5)
+
+    def test_refill(self):
+        assert backends.consume(0, 0, 2, 1, 5) == (True, 1, 0.0)
+        assert backends.consume(0, 0, 100, 1, 5) == (True, 4, 0.0)
+
+
+class TestBackends(object):
+
+    def assert_limited(self, backend):
+        assert backend.take('client', 0.01, 2) == (True, 0.0)
+        assert backend.take('client', 0.01, 2) == (True, 0.0)
+        allowed, retry_after = backend.take('client', 0.01, 2)
+        assert not allowed
+        assert 99 < retry_after <= 100
+        assert backend.take('other', 0.01, 2)[0]
+
+    def test_memory(self):
+        backend = backends.Memory(max_size=2)
+        self.assert_limited(backend)
+        backend.take('another', 1, 1)
+        assert list(backend.buckets) == ['other', 'another']
+
+    def test_shared_memory(self, tmpdir):
+        path = str(tmpdir.join('buckets'))
+        backend = backends.SharedMemory(path, slots=64)
+        self.assert_limited(backend)
+        # another process sharing the same buckets
+        shared = backends.SharedMemory(path, slots=64)
+        assert not shared.take('client', 0.01, 2)[0]
+        assert tmpdir.join('buckets').size() == backend.slot.size * 64
+        shared.close()
+        backend.close()
+
+    def test_shared_memory_default_path(self, tmpdir, monkeypatch):
+        monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+        monkeypatch.setattr(tempfile, 'tempdir', str(tmpdir))
+        path = backends.default_path('/srv/app')
+        directory = os.path.dirname(path)
+        assert directory == str(tmpdir.join('watson-{0}'.format(os.getuid())))
+        assert os.stat(directory).st_mode & 0o777 == 0o700
+        assert path != backends.default_path('/srv/other')
+        backend = backends.SharedMemory(slots=64)
+        assert os.path.dirname(backend.path) == directory
+        backend.close()
+        os.chmod(directory, 0o777)
+        with raises(RuntimeError):
+            backends.default_path()
+
+    def test_shared_memory_symlink(self, tmpdir):
+        target = tmpdir.join('target')
+        target.write('')
+        path = tmpdir.join('buckets')
+        path.mksymlinkto(target)
+        with raises(OSError):
+            backends.SharedMemory(str(path), slots=64)
+        assert target.size() == 0
+
+    def test_cache(self):
+        application = create_application()
+        backend = application.container.get(
+            'watson.framework.ratelimit.backends.Cache')
+        self.assert_limited(backend)
+        tokens, updated = backend.storage.get('client')
+        assert tokens < 1
+
+
+class TestRateLimiter(object):
+
+    def test_disabled_by_default(self):
+        application = applications.Http()
+        assert len(application.dispatcher.events[events.ROUTE_MATCH]) == 1
+
+    def test_client_limit(self):
+        application = create_application(rate=0.01, burst=2)
+        assert len(application.dispatcher.events[events.ROUTE_MATCH]) == 3
+        assert request(application)[0][0] == '200 OK'
+        # not found responses also consume tokens
+        assert request(application, '/missing')[0][0].startswith('404')
+        (status, headers), body = request(application, '/missing')
+        assert status.startswith('429')
+        assert headers['Retry-After'] == '100'
+        assert headers['Content-Type'] == 'text/plain; charset=utf-8'
+        assert body == b'Too Many Requests'
+        assert request(application, remote_addr='10.0.0.2')[0][0] == '200 OK'
+
+    def test_route_limit(self):
+        application = create_application()
+        assert len(application.dispatcher.events[events.ROUTE_MATCH]) == 2
+        for _ in range(2):
+            assert request(application, '/login')[0][0] == '200 OK'
+        assert request(application, '/login')[0][0].startswith('429')
+        assert request(application)[0][0] == '200 OK'
+        assert request(
+            application, '/login', remote_addr='10.0.0.2')[0][0] == '200 OK'
+
+    def test_route_key(self):
+        application = create_application()
+        assert request(application, '/search')[0][0] == '200 OK'
+        assert request(
+            application, '/search',
+            remote_addr='10.0.0.2')[0][0].startswith('429')
+
+    def test_client_keys(self):
+        application = create_application(rate=1)
+        limiter = application.container.get('rate_limiter')
+        environ = sample_environ(
+            REMOTE_ADDR='10.0.0.1',
+            HTTP_COOKIE='watson.session=abc',
+            HTTP_X_FORWARDED_FOR='192.168.0.1, 10.0.0.2')
+        request = Request.from_environ(environ)
+        assert limiter.client(request) == 'ip:10.0.0.1'
+        # the client has no session
+        assert limiter.client(request, 'session') == 'ip:10.0.0.1'
+        limiter.config['forwarded'] = True
+        assert limiter.client(request) == 'ip:10.0.0.2'
+        limiter.config['forwarded'] = 2
+        assert limiter.client(request) == 'ip:192.168.0.1'
+        limiter.config['forwarded'] = 3
+        assert limiter.client(request) == 'ip:10.0.0.1'
+
+    def test_session_key(self):
+        application = create_application(rate=1)
+        limiter = application.container.get('rate_limiter')
+        session = MemoryStorage('known')
+        session['user'] = 1
+        for cookie, client in (('known', 'session:known'),
+                               ('unknown', 'ip:10.0.0.1')):
+            request = Request.from_environ(
+                sample_environ(REMOTE_ADDR='10.0.0.1',
+                               HTTP_COOKIE='watson.session={0}'.format(
+                                   cookie)),
+                session_class='watson.http.sessions.Memory')
+            assert limiter.client(request, 'session') == client
+        session.destroy()
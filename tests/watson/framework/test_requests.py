@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from io import BytesIO
+from watson.framework import applications
+from watson.framework.requests import LazyRequest, is_form
+from tests.watson.framework.support import make_request, sample_environ
+
+
+ROUTES = {
+    'session': {
+        'path': '/',
+        'accepts': ('GET', 'POST'),
+        'options': {
+            'controller': 'tests.watson.framework.support.SessionController'
+        },
+        'defaults': {'format': 'json'}
+    }
+}
+
+
+def create_application():
+    return applications.Http({'routes': ROUTES})
+
+
+def form_fields(body, content_type='application/x-www-form-urlencoded'):
+    body = body.encode('utf-8')
+    return {
+        'REQUEST_METHOD': 'POST',
+        'CONTENT_TYPE': content_type,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body)
+    }
+
+
+def form_environ(body, content_type='application/x-www-form-urlencoded'):
+    return sample_environ(**form_fields(body, content_type))
+
+
+class TestIsForm(object):
+
+    def test_content_types(self):
+        assert is_form({})
+        assert is_form({'CONTENT_TYPE': 'multipart/form-data; boundary=x'})
+        assert not is_form({'CONTENT_TYPE': 'application/json'})
+
+
+class TestLazyRequest(object):
+
+    def test_nothing_materialized(self):
+        environ = sample_environ(CONTENT_TYPE='text/plain')
+        request = LazyRequest.from_environ(environ)
+        assert request.method == 'GET'
+        assert 'HTTP_CONTENT_TYPE' not in environ
+        assert not request.session_loaded
+        assert 'get' not in request.__dict__
+        assert 'headers' not in request.__dict__
+        assert request.headers['Content-Type'] == 'text/plain'
+
+    def test_method_override(self):
+        request = LazyRequest.from_environ(
+            form_environ('HTTP_REQUEST_METHOD=put'))
+        assert request.method == 'PUT'
+
+    def test_non_form_body_not_read(self):
+        request = LazyRequest.from_environ(
+            form_environ('{"HTTP_REQUEST_METHOD": "PUT"}', 'application/json'))
+        assert request.method == 'POST'
+        assert '_get_post_files_from_environ' not in request.__dict__
+        assert request.json_body == {'HTTP_REQUEST_METHOD': 'PUT'}
+
+    def test_session(self):
+        request = LazyRequest.from_environ(
+            sample_environ(),
+            session_class='watson.http.sessions.Memory')
+        assert not request.session_loaded
+        assert request.session is not None
+        assert request.session_loaded
+
+
+class TestApplicationRequests(object):
+
+    def test_session_not_loaded(self):
+        application = create_application()
+        (status, headers), body = make_request(application)
+        assert body == b'{"session": false}'
+        assert 'Set-Cookie' not in headers
+
+    def test_session_cookie(self):
+        application = create_application()
+        (status, headers), body = make_request(
+            application, **form_fields('name=watson'))
+        assert body == b'{"session": true}'
+        assert headers['Set-Cookie'].startswith('watson.session=')
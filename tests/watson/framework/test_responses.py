@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+from watson.http.messages import Response
+from watson.framework.responses import (StreamingResponse, ClosingIterator,
+                                        ClosingList, closing, is_stream)
+
+
+def chunks():
+    yield '<html>'
+    yield b'<body>'
+    yield ''
+    yield 1
+
+
+class TestIsStream(object):
+
+    def test_is_stream(self):
+        assert is_stream(chunks())
+        assert is_stream(iter([1]))
+        assert not is_stream([1])
+        assert not is_stream({})
+        assert not is_stream('test')
+
+
+class TestStreamingResponse(object):
+
+    def test_call(self):
+        started = []
+
+        def start_response(status_line, headers):
+            started.append(status_line)
+        response = StreamingResponse(200, stream=chunks())
+        body = response(start_response)
+        assert started == ['200 OK']
+        assert list(body) == [b'<html>', b'<body>', b'1']
+
+    def test_raw_body(self):
+        response = StreamingResponse(200, stream=chunks())
+        assert response.raw_body == b'<html><body>1'
+        assert response.stream is None
+        assert response.body == '<html><body>1'
+        assert response(lambda status_line, headers: None) == [b'<html><body>1']
+
+    def test_set_body(self):
+        response = StreamingResponse(200, stream=chunks())
+        response.body = 'test'
+        assert response.stream is None
+        assert response.raw_body == b'test'
+
+    def test_from_response(self):
+        response = Response(201)
+        response.headers.add('Content-Type', 'text/plain')
+        response.cookies.add('test', 'value')
+        streaming = StreamingResponse.from_response(response, chunks())
+        assert streaming.status_code == 201
+        assert streaming.headers['Content-Type'] == 'text/plain'
+        assert 'test' in streaming.cookies
+
+    def test_close(self):
+        closed = []
+
+        def generate():
+            try:
+                yield 'first'
+                yield 'second'
+            finally:
+                closed.append(True)
+        response = StreamingResponse(200, stream=generate())
+        body = response(lambda status_line, headers: None)
+        assert next(body) == b'first'
+        body.close()
+        assert closed
+
+
+class TestClosing(object):
+
+    def test_closing_list(self):
+        closed = []
+        body = closing([b'body'], lambda: closed.append(True))
+        assert isinstance(body, ClosingList)
+        assert body == [b'body']
+        body.close()
+        body.close()
+        assert closed == [True]
+
+    def test_closing_iterator(self):
+        closed = []
+
+        def generate():
+            try:
+                yield b'first'
+                yield b'second'
+            finally:
+                closed.append('generator')
+        body = closing(generate(), lambda: closed.append('callback'))
+        assert isinstance(body, ClosingIterator)
+        assert next(iter(body)) == b'first'
+        body.close()
+        assert closed == ['generator', 'callback']
+
+    def test_callback_after_failed_close(self):
+        closed = []
+
+        class Body(object):
+            def __iter__(self):
+                return iter([])
+
+            def close(self):
+                raise ValueError()
+        body = closing(Body(), lambda: closed.append(True))
+        try:
+            body.close()
+        except ValueError:
+            pass
+        assert closed == [True]
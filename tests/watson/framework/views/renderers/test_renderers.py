@@ -2,7 +2,7 @@
 from watson.framework.views.renderers.xml import Renderer as Xml
 from watson.framework.views.renderers.json import Renderer as Json
 from watson.framework.views.renderers.jinja2 import Renderer as Jinja2, template_to_posix_path
-from watson.framework import applications
+from watson.framework import applications, views
 from watson.http import messages
 from tests.watson.framework.support import sample_view_model, sample_object_view_model
 
@@ -49,3 +49,59 @@ class TestJinja2Renderer(object):
     def test_posix_path(self):
         assert template_to_posix_path('some/template') == 'some/template'
         assert template_to_posix_path('some\\template', sep='\\') == 'some/template'
+
+    def test_stream(self, tmpdir):
+        tmpdir.join('stream.html').write('{% for i in items %}{{ i }}{% endfor %}')
+        app = applications.Http()
+        renderer_config = dict(
+            app.config['views']['renderers']['jinja2']['config'],
+            paths=[str(tmpdir)], stream_buffer=2)
+        renderer = Jinja2(config=renderer_config, application=app)
+        view_model = views.Model(
+            template='stream', data={'items': range(4)}, stream=True)
+        output = renderer(view_model)
+        assert list(output) == ['01', '23']
+        view_model.stream = False
+        assert renderer(view_model) == '0123'
+
+    def test_offload(self, tmpdir):
+        tmpdir.join('report.html').write(
+            '{% for i in items %}{{ i|get_qualified_name }}{% endfor %}')
+        app = applications.Http()
+        renderer_config = dict(
+            app.config['views']['renderers']['jinja2']['config'],
+            paths=[str(tmpdir)],
+            offload={'enabled': True, 'workers': 1, 'threshold': 0,
+                     'templates': ['report']})
+        renderer = Jinja2(config=renderer_config, application=app)
+        try:
+            assert renderer._pool
+            assert renderer.should_offload('report')
+            assert not renderer.should_offload('report', offload=False)
+            assert renderer.should_offload('other', offload=True)
+            assert not renderer.should_offload('other')
+            assert renderer.offload('report.html', {'items': ['a', 1]}) == 'strint'
+            view_model = views.Model(template='report', data={'items': [1, 2]})
+            assert renderer(view_model) == 'intint'
+        finally:
+            renderer.shutdown()
+        assert not renderer._pool
+
+    def test_offload_fallback(self, tmpdir):
+        tmpdir.join('report.html').write('{{ items|length }}')
+        app = applications.Http()
+        renderer_config = dict(
+            app.config['views']['renderers']['jinja2']['config'],
+            paths=[str(tmpdir)],
+            offload={'enabled': True, 'workers': 1, 'threshold': 1024})
+        renderer = Jinja2(config=renderer_config, application=app)
+        try:
+            # below the threshold, or unpicklable data is rendered inline
+            assert renderer.offload('report.html', {'items': [1]}) is None
+            assert renderer.offload(
+                'report.html', {'items': [lambda: None] * 2048}) is None
+            view_model = views.Model(
+                template='report', data={'items': [1]}, offload=True)
+            assert renderer(view_model) == '1'
+        finally:
+            renderer.shutdown()
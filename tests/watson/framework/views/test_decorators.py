@@ -20,6 +20,14 @@ class MyController(object):
     def bool_action(self):
         return True
 
+    @view(template='listing', stream=True)
+    def stream_action(self):
+        return {}
+
+    @view(template='report', offload=True)
+    def offload_action(self):
+        return {}
+
 
 class TestViewDecorator(object):
 
@@ -41,3 +49,13 @@ class TestViewDecorator(object):
         controller = MyController()
         controller_response = controller.bool_action()
         assert controller_response.data['content']
+
+    def test_view_model_stream(self):
+        controller = MyController()
+        assert controller.stream_action().stream
+        assert not controller.html_action().stream
+
+    def test_view_model_offload(self):
+        controller = MyController()
+        assert controller.offload_action().offload
+        assert controller.html_action().offload is None
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# Admission control, shedding requests when the application is overloaded
+import threading
+import time
+from watson.common.imports import get_qualified_name
+from watson.http.messages import Response
+
+
+class Limiter(object):
+
+    """Limits the number of requests that can be in flight at once.
+
+    Attributes:
+        limit (int): The maximum number of requests in flight
+        timeout (float): The number of seconds to wait for a free slot
+    """
+
+    def __init__(self, limit, timeout=0):
+        self.limit = limit
+        self.timeout = timeout
+        self.in_flight = 0
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking=True):
+        """Acquire a slot, waiting up to timeout seconds for one to be freed.
+
+        Args:
+            blocking (bool): Whether or not to wait for a free slot
+
+        Returns:
+            bool: Whether or not a slot was acquired
+        """
+        if blocking and self.timeout:
+            acquired = self._semaphore.acquire(timeout=self.timeout)
+        else:
+            acquired = self._semaphore.acquire(blocking=False)
+        if acquired:
+            with self._lock:
+                self.in_flight += 1
+        return acquired
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    def __repr__(self):
+        return '<{0} in_flight:{1} limit:{2}>'.format(
+            get_qualified_name(self), self.in_flight, self.limit)
+
+
+def request_start(value):
+    """Convert the value of an X-Request-Start header into a timestamp.
+
+    Supports values in seconds, milliseconds or microseconds, optionally
+    prefixed with t= (as set by nginx, Heroku and New Relic conventions).
+
+    Returns:
+        float: The timestamp, or None if the value is invalid
+    """
+    try:
+        value = float(value.strip().lstrip('t='))
+    except (AttributeError, ValueError):
+        return None
+    if value > 1e14:
+        return value / 1e6
+    if value > 1e11:
+        return value / 1e3
+    return value
+
+
+class AdmissionControl(object):
+
+    """Sheds requests with a 503 Service Unavailable when the application is
+    overloaded.
+
+    A global limit applies to all requests before they are routed, and routes
+    can declare their own limit via the concurrency option. Requests wait up
+    to queue_timeout seconds for a free slot before being shed. Requests that
+    have already spent longer than max_queue_time seconds queued upstream
+    (determined from the queue_header set by the web server) are shed
+    immediately.
+
+    The 503 response is prepared once, so shedding a request does not
+    require routing, executing a controller or rendering a view.
+
+    Example:
+
+    .. code-block:: python
+
+        admission = {
+            'enabled': True,
+            'limit': 32,
+            'queue_timeout': 0.5,
+            'max_queue_time': 5,
+            'retry_after': 2
+        }
+
+        routes = {
+            'report': {
+                'path': '/report',
+                'options': {
+                    'controller': 'app.controllers.Report',
+                    'concurrency': 4
+                }
+            }
+        }
+
+    Attributes:
+        config (dict): The admission settings
+        limiter (Limiter): The global limiter
+        routes (dict): The limiter for each route
+    """
+    status_line = '503 Service Unavailable'
+
+    def __init__(self, config):
+        self.config = config
+        self.limiter = self.create_limiter(config.get('limit'))
+        self.routes = {}
+        self.body = config.get('body', 'Service Unavailable').encode('utf-8')
+        self.headers = [
+            ('Content-Type', 'text/plain; charset=utf-8'),
+            ('Content-Length', str(len(self.body))),
+            ('Retry-After', str(config.get('retry_after', 1)))
+        ]
+        header = config.get('queue_header')
+        self.queue_header = 'HTTP_{0}'.format(
+            header.upper().replace('-', '_')) if header else None
+
+    def create_limiter(self, limit):
+        if not limit:
+            return None
+        return Limiter(limit, self.config.get('queue_timeout', 0))
+
+    def queued_too_long(self, environ):
+        """Determine whether or not a request has waited longer than the max
+        queue time before reaching the application.
+        """
+        max_queue_time = self.config.get('max_queue_time')
+        if not max_queue_time or not self.queue_header:
+            return False
+        started = request_start(environ.get(self.queue_header))
+        return started is not None and time.time() - started > max_queue_time
+
+    def admit(self, environ, blocking=True):
+        """Admit a request to the application.
+
+        Args:
+            environ (dict): The WSGI environ of the request
+            blocking (bool): Whether or not to wait for a free slot
+
+        Returns:
+            bool: Whether or not the request was admitted
+        """
+        if self.queued_too_long(environ):
+            return False
+        if self.limiter is None:
+            return True
+        return self.limiter.acquire(blocking)
+
+    def admit_route(self, context, route, blocking=True):
+        """Admit a request to the matched route.
+
+        The acquired limiter is held within the context of the request until
+        it is released.
+
+        Returns:
+            bool: Whether or not the request was admitted
+        """
+        try:
+            limiter = self.routes[route.name]
+        except KeyError:
+            limiter = self.routes[route.name] = self.create_limiter(
+                route.options.get('concurrency'))
+        if limiter is None:
+            return True
+        if not limiter.acquire(blocking):
+            return False
+        context['admission'] = limiter
+        return True
+
+    def release_route(self, context):
+        """Release the slot of the matched route held by a request.
+        """
+        limiter = context.pop('admission', None)
+        if limiter is not None:
+            limiter.release()
+
+    def release(self, context):
+        """Release the slots held by a request.
+        """
+        self.release_route(context)
+        if self.limiter is not None:
+            self.limiter.release()
+
+    def response(self):
+        """Create a 503 Service Unavailable response.
+
+        Returns:
+            watson.http.messages.Response
+        """
+        response = Response(503)
+        for name, value in self.headers:
+            response.headers.add(name, value)
+        response._body = self.body
+        return response
+
+    def reject(self, start_response):
+        """Shed a request prior to it being routed.
+
+        Returns:
+            list: The body of the 503 response
+        """
+        start_response(self.status_line, list(self.headers))
+        return [self.body]
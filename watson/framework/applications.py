@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 import abc
+import functools
+import http
+import inspect
+import logging
+import time
 from types import ModuleType
 from watson.console import Runner
 from watson.console.command import find_commands_in_module
@@ -9,9 +14,16 @@ from watson.di import ContainerAware
 from watson.di.container import IocContainer
 from watson.events.dispatcher import EventDispatcherAware
 from watson.events.types import Event
-from watson.http.messages import Request, Response
-from watson.framework.exceptions import ApplicationError
-from watson.framework import config as DefaultConfig, events
+from watson.http.messages import Response
+from watson.framework.exceptions import (ApplicationError,
+                                         DeadlineExceededError)
+from watson.framework import config as DefaultConfig, events, local
+from watson.framework.deadlines import Deadline
+from watson.framework.middleware import build as build_stack
+from watson.framework.pipeline import DEFAULT_PROFILE, Profile
+from watson.framework.requests import LazyRequest
+from watson.framework.responses import StreamingResponse, closing
+from watson.framework.support import asgi
 from watson.framework.support.console import commands as DefaultConsoleCommands
 
 
@@ -25,7 +37,9 @@ class Base(ContainerAware, EventDispatcherAware, metaclass=abc.ABCMeta):
 
     Attributes:
         _config (dict): The configuration for the application.
-        global_app (Base): A reference to the currently running application.
+        global_app (Base): A reference to the most recently initialized
+            application. Within a request use
+            watson.framework.local.current_application instead.
     """
     _config = None
     global_app = None
@@ -191,67 +205,268 @@ class Http(Base):
 
         application = applications.Http({..})
         application(environ, start_response)
+
+    Attributes:
+        admission (watson.framework.admission.AdmissionControl): Sheds
+            requests when the application is overloaded (if enabled).
+        middleware (callable): The WSGI middleware wrapping run, or None if
+            no middleware has been configured.
     """
+    profiles = None
+    deadlines = None
+    admission = None
+    middleware = None
 
-    def __run_inner(self, request):
-        context = {
-            'request': request
-        }
-        self.context = context
+    def __init__(self, config=None):
+        super(Http, self).__init__(config)
+        self.profiles = {}
+        self.deadlines = {}
+        if self.config['admission']['enabled']:
+            self.admission = self.container.get('admission_control')
+        self.middleware = self.build_middleware()
+
+    def build_middleware(self):
+        """Assemble the middleware config into a single WSGI callable.
+
+        The stack is built once the INIT listeners have been executed, so that
+        it wraps any replacement of run (such as the debug profile panel).
+
+        Returns:
+            callable: The outermost middleware, or None if there is none.
+        """
+        stack = build_stack(self.run, self.config['middleware'])
+        return None if stack == self.run else stack
+
+    def __call__(self, environ, start_response):
+        if self.middleware is not None:
+            return self.middleware(environ, start_response)
+        return self.run(environ, start_response)
+
+    def trigger(self, name, params):
+        """Trigger one of the request events.
+
+        Args:
+            name (string): The name of the event
+            params (dict): The params associated with the event
+
+        Returns:
+            watson.events.collections.Result
+        """
+        return self.dispatcher.trigger(Event(name, target=self, params=params))
+
+    def get_profile(self, route):
+        """Retrieve the pipeline profile declared by a route.
+
+        Returns:
+            watson.framework.pipeline.Profile
+        """
+        try:
+            return self.profiles[route.name]
+        except KeyError:
+            options = route.options.get('pipeline')
+            if options is None:
+                profile = DEFAULT_PROFILE
+            else:
+                profile = Profile.from_options(
+                    options, self.config['pipeline'].get('profiles'))
+            self.profiles[route.name] = profile
+            return profile
+
+    def apply_profile(self, context, route_match):
+        """Apply the pipeline profile of the matched route to the request.
+
+        Returns:
+            watson.framework.pipeline.Profile
+        """
+        profile = context['profile'] = self.get_profile(route_match.route)
+        if profile is not DEFAULT_PROFILE:
+            if not profile.session:
+                context['request'].environ['watson.session.class'] = None
+            if isinstance(profile.render, str):
+                route_match.params['format'] = profile.render
+        return profile
+
+    def get_deadline(self, route):
+        """Retrieve the number of seconds a route has to respond within.
+
+        Routes can override the default deadline via the deadline option, or
+        disable it by setting the option to False.
+
+        Returns:
+            float: The timeout, or None if the route has no deadline
+        """
+        try:
+            return self.deadlines[route.name]
+        except KeyError:
+            timeout = route.options.get(
+                'deadline', self.config['deadline']['timeout']) or None
+            self.deadlines[route.name] = timeout
+            return timeout
+
+    def set_deadline(self, context, route_match, started):
+        """Set the deadline of the request from the matched route.
+        """
+        timeout = self.get_deadline(route_match.route)
+        if timeout:
+            context['deadline'] = Deadline(timeout, started)
+
+    def admit_route(self, context, route_match, blocking=True):
+        """Shed the request if the matched route is at its concurrency limit.
+
+        Responses already provided by a listener (for example from a cache)
+        are not subject to the limit of the route.
+        """
+        if self.admission is None or 'response' in context:
+            return
+        if not self.admission.admit_route(
+                context, route_match.route, blocking):
+            context['response'] = self.admission.response()
+
+    @property
+    def context(self):
+        """The context of the request being handled by the current thread (or
+        task).
+
+        Returns:
+            dict: The request, response, route match etc.
+        """
+        return local.current_context.get()
+
+    def __run_inner(self, context):
+        token = local.current_context.set(context)
+        try:
+            return self.__handle(context)
+        finally:
+            local.current_context.reset(token)
+
+    def handle(self, context):
+        """Route, dispatch and render a request made within the application,
+        such as the sub-requests of a batch request.
+
+        The request is triggered through the same events as a request made
+        via run, and any exceptions are converted into an error response.
+
+        Args:
+            context (dict): The context of the request, containing the request
+
+        Returns:
+            watson.http.messages.Response
+        """
+        token = local.current_application.set(self)
+        try:
+            response = self.__run_inner(context)
+        except Exception as exc:
+            response, view_model = self.exception(
+                exception=exc, context={'request': context['request']})
+        finally:
+            local.current_application.reset(token)
+            # the request was admitted to the application by its parent, so
+            # only the slot of the matched route is released
+            if self.admission is not None:
+                self.admission.release_route(context)
+        context['response'] = response
+        return response
+
+    def __handle(self, context):
+        started = time.monotonic()
+        # The params are shared by each event triggered during the request
+        params = {'context': context, 'container': self.container,
+                  'router': self.container.get('router')}
         # Retrieve the required route match for the request.
         try:
-            route_result = self.dispatcher.trigger(
-                Event(
-                    events.ROUTE_MATCH,
-                    target=self,
-                    params={'context': context,
-                            'router': self.container.get('router')}))
-            route_match = route_result.first()
+            route_match = self.trigger(events.ROUTE_MATCH, params).first()
+            # listeners may execute before the route listener (rate limits)
+            route_match = context.get('route_match') or route_match
         except self.exception_class as exc:
             route_match = None
             response, view_model = self.exception(exception=exc,
                                                   context=context)
-        # Execute the relevant controller for the route
+        profile = DEFAULT_PROFILE
         if route_match:
+            profile = self.apply_profile(context, route_match)
+            self.set_deadline(context, route_match, started)
+            self.admit_route(context, route_match)
+        # Execute the relevant controller for the route, unless a listener
+        # has already provided the response (for example from a cache)
+        if 'response' in context:
+            response = view_model = context['response']
+        elif route_match:
             try:
-                dispatch_result = self.dispatcher.trigger(
-                    Event(
-                        events.DISPATCH_EXECUTE,
-                        target=self,
-                        params={'container': self.container,
-                                'context': context}))
-                response, view_model = dispatch_result.first()
+                response, view_model = (self.trigger(
+                    events.DISPATCH_EXECUTE, params)).first()
             except self.exception_class as exc:
                 response, view_model = self.exception(
                     exception=exc, context=context)
         # Render the view model or response
-        if not hasattr(view_model, 'status_code'):
+        if not profile.render:
+            response = context.setdefault('response', response)
+        elif not hasattr(view_model, 'status_code'):
+            params['view_model'] = view_model
             try:
-                self.render(context=context, view_model=view_model)
+                self.trigger(events.RENDER_VIEW, params)
             except Exception as exc:
                 response, view_model = self.exception(exception=exc,
                                                       context=context)
         # Do any cleanup required after the request has ended
-        self.dispatcher.trigger(Event(events.COMPLETE,
-                                      target=self,
-                                      params={'container': self.container}))
-        return response
+        self.trigger(events.COMPLETE, params)
+        # The response may have been replaced during rendering (streaming)
+        return context.get('response', response)
 
     def run(self, environ, start_response):
         session = self.config['session']
-        request = Request.from_environ(environ,
-                                       session_class=session.get(
-                                           'class', None),
-                                       session_options=session.get(
-                                           'options', None))
+        request = LazyRequest.from_environ(environ,
+                                           session_class=session.get(
+                                               'class', None),
+                                           session_options=session.get(
+                                               'options', None))
+        context = {
+            'request': request
+        }
+        admission = self.admission
+        if admission is not None and not admission.admit(environ):
+            return admission.reject(start_response)
+        token = local.current_application.set(self)
         try:
-            response = self.__run_inner(request)
+            response = self.__run_inner(context)
         except Exception as exc:
             response, view_model = self.exception(
                 exception=exc, context={'request': request})
-        return response(start_response)
+        finally:
+            local.current_application.reset(token)
+            if admission is not None:
+                admission.release(context)
+        context['response'] = response
+        return closing(response(start_response),
+                       functools.partial(self.post_response, context))
+
+    def post_response(self, context):
+        """Trigger the POST_RESPONSE event.
+
+        Executed once the response has been sent to the client (when the WSGI
+        server closes the returned iterable), so listeners do not add to the
+        latency of the response. As the response can no longer be changed any
+        exceptions raised by the listeners are logged.
+
+        Args:
+            context (dict): The context of the completed request
+        """
+        app_token = local.current_application.set(self)
+        token = local.current_context.set(context)
+        try:
+            self.trigger(events.POST_RESPONSE,
+                         {'container': self.container, 'context': context})
+        except Exception:
+            logging.getLogger(__name__).exception(
+                'Exception raised after the response was sent')
+        finally:
+            local.current_context.reset(token)
+            local.current_application.reset(app_token)
 
     def exception(self, last_exception=None, **kwargs):
+        profile = kwargs['context'].get('profile', DEFAULT_PROFILE)
+        if not profile.exceptions or isinstance(
+                kwargs['exception'], DeadlineExceededError):
+            return self.minimal_exception(**kwargs)
         event = Event(events.EXCEPTION, target=self, params=kwargs)
         result = self.dispatcher.trigger(event)
         view_model = result.first()
@@ -274,14 +489,222 @@ class Http(Base):
             self.exception(last_exception=exc, **kwargs)
         return response, view_model
 
+    def minimal_exception(self, exception, context, **kwargs):
+        """Convert an exception into a plain text response, without
+        formatting the exception or rendering any templates.
+
+        Used for routes whose pipeline profile has disabled exceptions, and
+        for requests that have exceeded their deadline.
+        """
+        listener = self.container.get('app_exception_listener')
+        listener.set_status_code(exception)
+        listener.log(exception)
+        status_code = exception.status_code
+        with contextmanagers.suppress(ValueError):
+            status_code = '{0} {1}'.format(
+                status_code, http.HTTPStatus(status_code).phrase)
+        response = Response(exception.status_code, body=str(status_code))
+        response.headers.add('Content-Type', 'text/plain')
+        context['response'] = response
+        return response, response
+
     def render(self, with_dispatcher=True, **kwargs):
         kwargs['container'] = self.container
-        render_event = Event(events.RENDER_VIEW, target=self, params=kwargs)
         if with_dispatcher:
-            self.dispatcher.trigger(render_event)
+            self.trigger(events.RENDER_VIEW, kwargs)
         else:
             listener = self.container.get('app_render_listener')
-            listener(render_event)
+            listener(Event(events.RENDER_VIEW, target=self, params=kwargs))
+
+
+class Asgi(Http):
+
+    """An application structure suitable for use with the ASGI protocol.
+
+    Uses the same configuration, container, router, listeners and renderers
+    as watson.framework.applications.Http. Controller actions may be defined
+    with `async def`, and listeners may return awaitables which will be
+    awaited before the next listener is triggered.
+
+    Example:
+
+    .. code-block:: python
+
+        application = applications.Asgi({..})
+        await application(scope, receive, send)
+
+    WSGI middleware cannot wrap an ASGI application, so the middleware config
+    is ignored.
+    """
+
+    def build_middleware(self):
+        return None
+
+    def __call__(self, scope, receive, send):
+        return self.run(scope, receive, send)
+
+    async def trigger_async(self, name, params):
+        """Trigger one of the request events, awaiting any awaitable results.
+
+        Args:
+            name (string): The name of the event
+            params (dict): The params associated with the event
+
+        Returns:
+            watson.events.collections.Result
+        """
+        results = self.dispatcher.trigger(
+            Event(name, target=self, params=params))
+        for index, result in enumerate(results):
+            if inspect.isawaitable(result):
+                results[index] = await result
+        return results
+
+    async def __run_inner(self, context):
+        token = local.current_context.set(context)
+        try:
+            return await self.__handle(context)
+        finally:
+            local.current_context.reset(token)
+
+    async def __handle(self, context):
+        started = time.monotonic()
+        # The params are shared by each event triggered during the request
+        params = {'context': context, 'container': self.container,
+                  'router': self.container.get('router')}
+        # Retrieve the required route match for the request.
+        try:
+            route_match = (await self.trigger_async(
+                events.ROUTE_MATCH, params)).first()
+            # listeners may execute before the route listener (rate limits)
+            route_match = context.get('route_match') or route_match
+        except self.exception_class as exc:
+            route_match = None
+            response, view_model = self.exception(exception=exc,
+                                                  context=context)
+        profile = DEFAULT_PROFILE
+        if route_match:
+            profile = self.apply_profile(context, route_match)
+            self.set_deadline(context, route_match, started)
+            self.admit_route(context, route_match, blocking=False)
+        # Execute the relevant controller for the route, unless a listener
+        # has already provided the response (for example from a cache)
+        if 'response' in context:
+            response = view_model = context['response']
+        elif route_match:
+            try:
+                response, view_model = (await self.trigger_async(
+                    events.DISPATCH_EXECUTE, params)).first()
+            except self.exception_class as exc:
+                response, view_model = self.exception(
+                    exception=exc, context=context)
+        # Render the view model or response
+        if not profile.render:
+            response = context.setdefault('response', response)
+        elif not hasattr(view_model, 'status_code'):
+            params['view_model'] = view_model
+            try:
+                await self.trigger_async(events.RENDER_VIEW, params)
+            except Exception as exc:
+                response, view_model = self.exception(exception=exc,
+                                                      context=context)
+        # Do any cleanup required after the request has ended
+        await self.trigger_async(events.COMPLETE, params)
+        # The response may have been replaced during rendering (streaming)
+        return context.get('response', response)
+
+    async def run(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(
+                'Unsupported ASGI scope type: {0}'.format(scope['type']))
+        session = self.config['session']
+        environ = asgi.environ_from_scope(scope, await asgi.read_body(receive))
+        request = LazyRequest.from_environ(environ,
+                                           session_class=session.get(
+                                               'class', None),
+                                           session_options=session.get(
+                                               'options', None))
+        context = {
+            'request': request
+        }
+        admission = self.admission
+        if admission is not None and not admission.admit(
+                environ, blocking=False):
+            return await self.send(admission.response(), send)
+        token = local.current_application.set(self)
+        try:
+            response = await self.__run_inner(context)
+        except Exception as exc:
+            response, view_model = self.exception(
+                exception=exc, context={'request': request})
+        finally:
+            local.current_application.reset(token)
+            if admission is not None:
+                admission.release(context)
+        context['response'] = response
+        try:
+            await self.send(response, send)
+        finally:
+            await self.post_response(context)
+
+    async def send(self, response, send):
+        """Send the status, headers and body of a response to the client.
+        """
+        status_line, headers = response.start()
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': asgi.encode_headers(headers)
+        })
+        if isinstance(response, StreamingResponse):
+            for chunk in response.chunks():
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True
+                })
+            await send({'type': 'http.response.body', 'body': b''})
+        else:
+            await send({
+                'type': 'http.response.body',
+                'body': response.raw_body
+            })
+
+    async def post_response(self, context):
+        """Trigger the POST_RESPONSE event once the response has been sent,
+        awaiting any awaitable listener results.
+
+        Args:
+            context (dict): The context of the completed request
+        """
+        app_token = local.current_application.set(self)
+        token = local.current_context.set(context)
+        try:
+            await self.trigger_async(
+                events.POST_RESPONSE,
+                {'container': self.container, 'context': context})
+        except Exception:
+            logging.getLogger(__name__).exception(
+                'Exception raised after the response was sent')
+        finally:
+            local.current_context.reset(token)
+            local.current_application.reset(app_token)
+
+    async def lifespan(self, receive, send):
+        """Acknowledge the startup and shutdown messages of the server.
+
+        The application is fully initialized on construction, so there is
+        nothing further to do on startup.
+        """
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
 
 
 class Console(Base):
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+from watson.framework.batch.controllers import Batch
+
+__all__ = ['Batch']
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+import contextvars
+import json
+import threading
+from io import BytesIO
+from watson.framework import controllers
+from watson.framework.requests import SubRequest
+
+# Environ keys of the batch request that are not inherited by sub-requests,
+# sub-responses are not compressed or validated against the batch request.
+EXCLUDED_ENVIRON = frozenset((
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'QUERY_STRING',
+    'HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH', 'HTTP_ACCEPT_ENCODING',
+    'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+    'wsgi.input', 'wsgi.body.original'
+))
+
+
+def environ_from_spec(environ, spec):
+    """Create the environ of a sub-request from the environ of the batch
+    request it was made within.
+
+    Args:
+        environ (dict): The environ of the batch request
+        spec (dict): The method, path, headers and body of the sub-request.
+                     Bodies that are not strings are encoded as JSON.
+
+    Returns:
+        dict
+    """
+    sub_environ = {key: value for key, value in environ.items()
+                   if key not in EXCLUDED_ENVIRON}
+    path, _, query_string = spec['path'].partition('?')
+    body = spec.get('body')
+    headers = dict(spec.get('headers') or {})
+    if body is None:
+        body = b''
+    elif not isinstance(body, (str, bytes)):
+        body = json.dumps(body)
+        headers.setdefault('Content-Type', 'application/json')
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    for name, value in headers.items():
+        key = name.upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_{0}'.format(key)
+        sub_environ[key] = value
+    sub_environ.update({
+        'REQUEST_METHOD': spec.get('method', 'GET').upper(),
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body)
+    })
+    return sub_environ
+
+
+class Batch(controllers.Rest):
+
+    """Executes a JSON list of sub-requests, returning their responses in a
+    single response.
+
+    Each sub-request is routed, dispatched and rendered through the same
+    listeners as any other request, and shares the session of the batch
+    request. Sub-requests are executed in order, or in parallel on the
+    batch_executor thread pool when workers are configured.
+
+    Example:
+
+    .. code-block:: javascript
+
+        POST /batch
+        [
+            {"method": "GET", "path": "/posts?page=2"},
+            {"method": "POST", "path": "/posts", "body": {"title": "Hello"}}
+        ]
+
+        [
+            {"status": 200, "headers": {...}, "body": "..."},
+            {"status": 201, "headers": {...}, "body": "..."}
+        ]
+    """
+
+    def POST(self, **kwargs):
+        # the event of the controller may be replaced while the sub-requests
+        # are dispatched, so the request and response are retrieved up front
+        request, response = self.request, self.response
+        config = self.container.get('application.config')['batch']
+        try:
+            if isinstance(request, SubRequest):
+                raise ValueError('Batch requests cannot be nested')
+            sub_requests = self.create_requests(request, config)
+        except ValueError as exc:
+            return self.bad_request(response, str(exc))
+        contexts = [{'request': sub_request} for sub_request in sub_requests]
+        results = [self.to_result(sub_response) for sub_response
+                   in self.execute_requests(contexts, config['workers'])]
+        response.headers.add('Content-Type', 'application/json')
+        response.body = json.dumps(results)
+        return response
+
+    def create_requests(self, request, config):
+        """Convert the body of the batch request into sub-requests.
+
+        The body must be sent as application/json, so that cross site forms
+        (which can only send text/plain, form or multipart bodies) cannot
+        make batch requests with the cookies of the user.
+
+        Raises:
+            ValueError: If the body is not a JSON list of sub-requests, or
+                        contains too many.
+        """
+        content_type = request.environ.get('CONTENT_TYPE') or ''
+        if content_type.split(';', 1)[0].strip().lower() != 'application/json':
+            raise ValueError('Batch requests must be sent as application/json')
+        try:
+            specs = request.json_body
+        except ValueError:
+            raise ValueError('Invalid batch request')
+        if (not isinstance(specs, list) or not all(
+                isinstance(spec, dict) and 'path' in spec for spec in specs)):
+            raise ValueError('Invalid batch request')
+        if len(specs) > config['max_requests']:
+            raise ValueError(
+                'A batch request can contain at most {0} requests'.format(
+                    config['max_requests']))
+        lock = threading.Lock()
+        return [SubRequest(environ_from_spec(request.environ, spec),
+                           request, lock)
+                for spec in specs]
+
+    def execute_requests(self, contexts, workers=None):
+        """Handle each sub-request via the application.
+
+        Returns:
+            list: The responses of the sub-requests, in order
+        """
+        application = self.container.get('application')
+        if workers and len(contexts) > 1:
+            executor = self.container.get('batch_executor')
+            # each sub-request runs within a copy of the current context
+            futures = [executor.submit(contextvars.copy_context().run,
+                                       application.handle, context)
+                       for context in contexts]
+            responses = [future.result() for future in futures]
+        else:
+            responses = [application.handle(context) for context in contexts]
+        for context in contexts:
+            application.post_response(context)
+        return responses
+
+    def bad_request(self, response, message):
+        """Reject a batch request with a plain text 400 Bad Request.
+        """
+        response.status_code = 400
+        response.headers.add('Content-Type', 'text/plain; charset=utf-8')
+        response.body = message
+        return response
+
+    def to_result(self, response):
+        """Convert the response of a sub-request into a dict.
+        """
+        body = response.body
+        status_line, headers = response.start()
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', 'replace')
+        return {
+            'status': response.status_code,
+            'headers': dict(headers),
+            'body': body
+        }
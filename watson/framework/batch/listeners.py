@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from watson.di import ContainerAware
+from watson.framework import applications
+
+
+class Init(ContainerAware):
+
+    """Attaches itself to the applications INIT event and adds the route of
+    the batch endpoint.
+
+    Batches are not supported by Asgi applications, as the sub-requests are
+    handled synchronously.
+    """
+    route_name = 'watson.framework.batch'
+
+    def __call__(self, event):
+        app = event.target
+        if isinstance(app, applications.Asgi):
+            return None
+        if isinstance(app, applications.Http):
+            config = app.config['batch']
+            if config['enabled']:
+                router = self.container.get('router')
+                return router.add_definition({
+                    'name': self.route_name,
+                    'path': config['path'],
+                    'accepts': ('POST',),
+                    'options': {
+                        'controller': 'watson.framework.batch.Batch'
+                    },
+                    'defaults': {'format': 'json'}
+                })
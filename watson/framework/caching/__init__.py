@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+from watson.framework.caching.coalescing import RequestCoalescer, coalesce
+from watson.framework.caching.response import ResponseCache
+
+__all__ = ['RequestCoalescer', 'ResponseCache', 'coalesce']
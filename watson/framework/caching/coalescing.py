@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from watson.common.imports import get_qualified_name
+from watson.di import ContainerAware
+from watson.framework import compression, conditional, events
+from watson.framework.caching.response import (fingerprint, is_cacheable,
+                                               serialize, to_response)
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+def in_event_loop():
+    """Determine whether or not the current thread is running an event loop,
+    in which case waiting on another request would block the loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def coalesce(func):
+    """Coalesce identical concurrent GET requests to a controller method.
+
+    Example:
+
+    .. code-block:: python
+
+        class Home(controllers.Rest):
+            @coalesce
+            def GET(self, **kwargs):
+                return {'posts': posts.popular()}
+    """
+    func.__coalesce__ = True
+    return func
+
+
+class Flight(object):
+
+    """An in-flight request that identical requests are waiting on.
+
+    Attributes:
+        key (string): The key of the request
+        result (dict): The serialized response, or None if the response could
+                       not be shared.
+        lock_file (int): The file descriptor of the lock held across processes
+    """
+    result = None
+    lock_file = None
+
+    def __init__(self, key):
+        self.key = key
+        self.landed = threading.Event()
+
+    def wait(self, timeout=None):
+        return self.landed.wait(timeout)
+
+    def __repr__(self):
+        return '<{0} key:{1} landed:{2}>'.format(
+            get_qualified_name(self), self.key, self.landed.is_set())
+
+
+class RequestCoalescer(ContainerAware):
+
+    """Coalesces identical concurrent GET requests into a single execution of
+    the controller and view.
+
+    Only routes that declare the coalesce option, or controller methods that
+    have been decorated with coalesce, are coalesced. The first request for a
+    key is executed as normal, while any identical requests that arrive
+    before it has completed wait for it and are then served its rendered
+    response. Waiting requests are executed as normal if the response cannot
+    be shared (streamed, not successful or setting cookies), or if they have
+    waited longer than the timeout.
+
+    Requests handled within an event loop (watson.framework.applications.Asgi)
+    are never coalesced, as waiting on the leading request would block the
+    loop it is executing on.
+
+    When a lock_dir is configured requests are also coalesced across
+    processes. The process holding the lock file of a key executes the
+    request and shares the response via the cache storage, while the other
+    processes wait for the lock to be released.
+
+    Example:
+
+    .. code-block:: python
+
+        routes = {
+            'home': {
+                'path': '/',
+                'options': {
+                    'controller': 'app.controllers.Home',
+                    'coalesce': True
+                }
+            }
+        }
+
+    Attributes:
+        config (dict): The coalescing settings
+        flights (dict): The requests currently in flight, by key
+    """
+    context_key = 'coalesced_flight'
+
+    def __init__(self, config):
+        self.config = config
+        self.flights = {}
+        self._lock = threading.Lock()
+        if config.get('lock_dir') and fcntl is None:
+            raise RuntimeError(
+                'Coalescing requests across processes requires fcntl')
+
+    @property
+    def storage(self):
+        """The watson.cache storage responses are shared across processes
+        with.
+        """
+        return self.container.get(
+            self.container.get('application.config')['cache']['type'])
+
+    def register_listeners(self, dispatcher):
+        """Register the listeners that release the waiting requests.
+
+        Requests are released once the response has been rendered, or once
+        the response has been sent if the request did not complete.
+        """
+        dispatcher.add(events.COMPLETE, self.land, 100)
+        dispatcher.add(events.POST_RESPONSE, self.land, 100)
+
+    def key(self, route_match, request):
+        """Generate the key of a request, identical requests share a key.
+        """
+        config = self.container.get('application.config')['compression']
+        encoding = None
+        if config['enabled']:
+            encoding = compression.negotiate(
+                request.headers.get('Accept-Encoding'),
+                tuple(config['encodings']))
+        return '{0}:{1}'.format(
+            self.config['prefix'],
+            fingerprint(route_match, request, self.config['vary'], encoding))
+
+    def join(self, context):
+        """Join an identical request that is already in flight.
+
+        If there is no such request, this request becomes the one that
+        others will wait on.
+
+        Returns:
+            watson.http.messages.Response: The shared response, or None if the
+                                           request should be executed.
+        """
+        if not self.config['enabled'] or in_event_loop():
+            return None
+        request = context['request']
+        key = self.key(context['route_match'], request)
+        with self._lock:
+            flight = self.flights.get(key)
+            leading = flight is None
+            if leading:
+                flight = self.flights[key] = Flight(key)
+        if leading:
+            context[self.context_key] = flight
+            if self.config.get('lock_dir'):
+                return self.lead_processes(context, flight)
+            return None
+        if not flight.wait(self.config['timeout']) or not flight.result:
+            return None
+        return self.to_response(request, flight.result)
+
+    def lead_processes(self, context, flight):
+        """Acquire the lock file of a request, waiting for another process to
+        execute the request if it already holds the lock.
+
+        Returns:
+            watson.http.messages.Response: The response shared by the other
+                                           process, if any.
+        """
+        filename = os.path.join(
+            self.config['lock_dir'],
+            '{0}.lock'.format(hashlib.sha1(flight.key.encode()).hexdigest()))
+        fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+        expires = time.monotonic() + self.config['timeout']
+        waited = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if time.monotonic() >= expires:
+                    os.close(fd)
+                    return None
+                waited = True
+                time.sleep(0.01)
+        flight.lock_file = fd
+        if not waited:
+            return None
+        result = self.storage.get(flight.key)
+        if not result:
+            return None
+        context.pop(self.context_key)
+        self.release(flight, result)
+        return self.to_response(context['request'], result)
+
+    def land(self, event):
+        """Share the response of a completed request with any identical
+        requests that are waiting on it.
+        """
+        context = event.params.get('context') or {}
+        flight = context.pop(self.context_key, None)
+        if flight is None:
+            return
+        response = context.get('response')
+        result = None
+        if is_cacheable(context['request'], response):
+            result = serialize(response)
+            if flight.lock_file is not None:
+                self.storage.set(
+                    flight.key, result, self.config['share_timeout'])
+        self.release(flight, result)
+
+    def release(self, flight, result=None):
+        """Release the requests waiting on a flight.
+        """
+        with self._lock:
+            if self.flights.get(flight.key) is flight:
+                del self.flights[flight.key]
+        flight.result = result
+        flight.landed.set()
+        if flight.lock_file is not None:
+            fcntl.flock(flight.lock_file, fcntl.LOCK_UN)
+            os.close(flight.lock_file)
+            flight.lock_file = None
+
+    def to_response(self, request, result):
+        """Convert a shared response into a response for a waiting request.
+        """
+        response = to_response(result)
+        if conditional.is_not_modified(
+                request,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')):
+            conditional.not_modified(response)
+        return response
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from watson.di import ContainerAware
+from watson.framework import applications
+
+
+class Init(ContainerAware):
+
+    """Attaches itself to the applications INIT event and registers the
+    response cache and request coalescing listeners.
+    """
+
+    def __call__(self, event):
+        app = event.target
+        if isinstance(app, applications.Http):
+            config = app.config['cache']
+            if config['coalesce']['enabled']:
+                coalescer = self.container.get('request_coalescer')
+                coalescer.register_listeners(app.dispatcher)
+            if config['response']['enabled']:
+                response_cache = self.container.get('response_cache')
+                response_cache.register_listeners(app.dispatcher)
+                return response_cache
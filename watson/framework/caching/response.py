@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import time
+import uuid
+from watson.common.contextmanagers import suppress
+from watson.di import ContainerAware
+from watson.http.messages import Response
+from watson.framework import compression, conditional, events
+from watson.framework.responses import StreamingResponse
+
+
+def fingerprint(route_match, request, vary=(), *extra):
+    """Generate a hash identifying the response to a request from the route
+    name, params, format, query string and any headers the response varies
+    on.
+
+    Args:
+        route_match (watson.routing.routes.RouteMatch): The matched route
+        request (watson.http.messages.Request): The request
+        vary (tuple): The request headers the response varies on
+        extra: Any other values that form part of the hash
+
+    Returns:
+        string
+    """
+    parts = extra + (
+        route_match.route.name,
+        sorted((str(name), str(value))
+               for name, value in route_match.params.items()),
+        route_match.params.get('format', 'html'),
+        request.environ.get('QUERY_STRING', ''),
+        [request.headers.get(header) for header in vary]
+    )
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def is_cacheable(request, response):
+    """Determine whether or not a response can be stored and served to other
+    requests.
+
+    Only successful GET requests are stored, and streamed responses or
+    responses that set cookies never are.
+    """
+    if not response or not request.is_method('GET'):
+        return False
+    if response.status_code != 200 or response.cookies:
+        return False
+    return not isinstance(response, StreamingResponse)
+
+
+def serialize(response):
+    """Convert a response into a dict that can be stored.
+
+    CORS headers depend on the origin of each request, so they are not
+    stored.
+    """
+    return {
+        'status_code': response.status_code,
+        'headers': [(name, value) for name, value in response.headers()
+                    if not name.lower().startswith('access-control-')],
+        'body': response.raw_body
+    }
+
+
+def to_response(cached):
+    """Convert a stored response back into a response object.
+    """
+    response = Response(cached['status_code'])
+    for name, value in cached['headers']:
+        response.headers.add(name, value)
+    response._body = cached['body']
+    return response
+
+
+class ResponseCache(ContainerAware):
+
+    """Caches the rendered responses of routes within a watson.cache storage.
+
+    Only routes that declare a cache option are cached, the option can either
+    be True (use the default settings), the number of seconds to cache the
+    response for, or a dict containing any of timeout, stale and vary.
+
+    The cached response is retrieved after the route has been matched, and if
+    found the controller and view are never executed (a 304 Not Modified is
+    returned if the cached ETag or Last-Modified satisfy the request).
+    Responses are stored once they have been sent to the client. Only
+    successful GET requests that do not set any cookies are stored.
+
+    Once a response is older than its timeout it may still be served for a
+    further number of stale seconds. The first request to see the stale
+    response will regenerate it, while any other requests during that time
+    are served the stale response.
+
+    Example:
+
+    .. code-block:: python
+
+        routes = {
+            'home': {
+                'path': '/',
+                'options': {
+                    'controller': 'app.controllers.Home',
+                    'cache': {'timeout': 60, 'stale': 30}
+                }
+            }
+        }
+
+        # later, when the data used within the page has changed
+        container.get('response_cache').invalidate('home')
+
+    Attributes:
+        config (dict): The response cache settings
+        routes (dict): The resolved cache settings for each route
+    """
+    context_key = 'response_cache'
+
+    def __init__(self, config):
+        self.config = config
+        self.routes = {}
+
+    @property
+    def storage(self):
+        """The watson.cache storage the responses are stored within.
+        """
+        return self.container.get(
+            self.container.get('application.config')['cache']['type'])
+
+    def register_listeners(self, dispatcher):
+        """Register the lookup and store listeners against the dispatcher.
+
+        The lookup is executed once the route has been matched, and the store
+        once the response has been sent to the client.
+        """
+        dispatcher.add(events.ROUTE_MATCH, self.lookup, 0)
+        dispatcher.add(events.POST_RESPONSE, self.store, 1)
+
+    def settings(self, route):
+        """Retrieve the cache settings for a route.
+
+        Returns:
+            dict: The timeout, stale and vary settings, or None if the route is
+                  not cached.
+        """
+        if route.name in self.routes:
+            return self.routes[route.name]
+        options = route.options.get('cache')
+        if options is None or options is False:
+            settings = None
+        else:
+            if options is True:
+                options = {}
+            elif not isinstance(options, dict):
+                options = {'timeout': options}
+            settings = {
+                'timeout': int(options.get('timeout', self.config['timeout'])),
+                'stale': int(options.get('stale', self.config['stale'])),
+                'vary': tuple(options.get('vary', self.config['vary']))
+            }
+        self.routes[route.name] = settings
+        return settings
+
+    def generation(self, route_name=None):
+        """Retrieve the current generation of a route (or all routes).
+
+        The generation forms part of each key, so changing it invalidates
+        every response that was stored beneath it.
+        """
+        key = '{0}:generation:{1}'.format(self.config['prefix'], route_name or '')
+        generation = self.storage.get(key)
+        if generation is None:
+            generation = self.invalidate(route_name)
+        return generation
+
+    def key(self, route_match, request, settings):
+        """Generate the key of a response from the route name, params, format,
+        query string, content encoding and any headers the response varies on.
+        """
+        return '{0}:{1}'.format(
+            self.config['prefix'],
+            fingerprint(route_match, request, settings['vary'],
+                        self.generation(),
+                        self.generation(route_match.route.name),
+                        self.content_encoding(request)))
+
+    def content_encoding(self, request):
+        """The content encoding the response to a request will be compressed
+        with, allowing compressed bodies to be stored and reused.
+        """
+        config = self.container.get('application.config')['compression']
+        if not config['enabled']:
+            return None
+        return compression.negotiate(
+            request.headers.get('Accept-Encoding'), tuple(config['encodings']))
+
+    def lookup(self, event):
+        """Retrieve a cached response for the matched route.
+
+        If a fresh (or stale) response is found, it is added to the context
+        which will cause the application to skip dispatching and rendering.
+        HEAD requests receive the headers of the cached response without its
+        body.
+        """
+        context = event.params['context']
+        route_match, request = context.get('route_match'), context['request']
+        if not route_match or not request.is_method('GET', 'HEAD'):
+            return
+        settings = self.settings(route_match.route)
+        if not settings:
+            return
+        key = self.key(route_match, request, settings)
+        cached = self.storage.get(key)
+        if cached and not self.should_regenerate(key, cached):
+            response = context['response'] = self.to_response(cached)
+            if request.is_method('HEAD'):
+                response.headers.add(
+                    'Content-Length', str(len(response.raw_body)),
+                    replace=True)
+                response.body = ''
+            if conditional.is_not_modified(
+                    request,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')):
+                conditional.not_modified(response)
+            return
+        context[self.context_key] = key, settings
+
+    def should_regenerate(self, key, cached):
+        """Determine whether or not a cached response should be regenerated.
+
+        Only the first request to see a stale response will regenerate it.
+        """
+        age = time.time() - cached['created']
+        if age < cached['timeout']:
+            return False
+        if age >= cached['timeout'] + cached['stale']:
+            return True
+        lock = '{0}:regenerate'.format(key)
+        if self.storage.get(lock):
+            return False
+        self.storage.set(lock, True, cached['stale'])
+        return True
+
+    def store(self, event):
+        """Store the response of a cacheable request.
+        """
+        context = event.params.get('context') or {}
+        if self.context_key not in context:
+            return
+        key, settings = context.pop(self.context_key)
+        response = context.get('response')
+        if not self.is_cacheable(context['request'], response):
+            return
+        cached = dict(serialize(response),
+                      created=time.time(),
+                      timeout=settings['timeout'],
+                      stale=settings['stale'])
+        storage = self.storage
+        storage.set(key, cached, settings['timeout'] + settings['stale'])
+        with suppress(KeyError):
+            del storage['{0}:regenerate'.format(key)]
+
+    def is_cacheable(self, request, response):
+        """Determine whether or not a response can be stored.
+
+        Streamed responses and responses that set cookies are never stored.
+        """
+        return is_cacheable(request, response)
+
+    def to_response(self, cached):
+        """Convert a stored response back into a response object.
+        """
+        return to_response(cached)
+
+    def invalidate(self, route_name=None):
+        """Invalidate the cached responses for a route.
+
+        Args:
+            route_name (string): The name of the route, if omitted all cached
+                                 responses are invalidated.
+
+        Returns:
+            string: The new generation of the route
+        """
+        key = '{0}:generation:{1}'.format(self.config['prefix'], route_name or '')
+        generation = uuid.uuid4().hex
+        self.storage.set(key, generation, 0)
+        return generation
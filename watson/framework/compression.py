@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Support for compressing the body of responses (gzip and deflate)
+import functools
+import zlib
+
+# The window bits used by zlib for each supported content encoding
+WINDOW_BITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS
+}
+
+
+@functools.lru_cache(maxsize=128)
+def negotiate(accept_encoding, encodings=tuple(WINDOW_BITS)):
+    """Determine the content encoding to use for a request.
+
+    The encodings are in order of preference, and the first that is
+    acceptable to the client is returned.
+
+    Args:
+        accept_encoding (string): The Accept-Encoding header of the request
+        encodings (tuple): The supported encodings
+
+    Returns:
+        string: The encoding, or None if the body should not be encoded
+
+    Example:
+
+    .. code-block:: python
+
+        negotiate('gzip, deflate')  # gzip
+        negotiate('gzip;q=0, deflate')  # deflate
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding, level=6):
+    """Compress a body with the given content encoding.
+
+    Args:
+        body (bytes): The body to compress
+        encoding (string): gzip or deflate
+        level (int): The compression level (1-9)
+
+    Returns:
+        bytes
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, WINDOW_BITS[encoding])
+    return compressor.compress(body) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, level=6):
+    """Compress an iterable of chunks with the given content encoding.
+
+    Each chunk is flushed from the compressor as it is produced so that the
+    response can still be streamed to the client.
+
+    Args:
+        chunks (iterable): The bytes to compress
+        encoding (string): gzip or deflate
+        level (int): The compression level (1-9)
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, WINDOW_BITS[encoding])
+    try:
+        for chunk in chunks:
+            chunk = compressor.compress(chunk) + compressor.flush(
+                zlib.Z_SYNC_FLUSH)
+            if chunk:
+                yield chunk
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close:
+            close()
+
+
+def is_compressible(mime_type, exclude):
+    """Determine whether or not a mime type is worth compressing.
+
+    Args:
+        mime_type (string): The Content-Type of the response
+        exclude (tuple): Mime types (or prefixes) that are already compressed
+    """
+    if not mime_type:
+        return False
+    return not mime_type.split(';')[0].strip().lower().startswith(
+        tuple(exclude))
+
+
+def add_vary(response, header):
+    """Add a header to the Vary header of a response.
+    """
+    vary = response.headers.get('Vary')
+    if not vary:
+        response.headers.add('Vary', header)
+    elif header.lower() not in [
+            value.strip().lower() for value in vary.split(',')]:
+        response.headers.add(
+            'Vary', '{0}, {1}'.format(vary, header), replace=True)
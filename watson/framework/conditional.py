@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Support for conditional GET requests (ETag and Last-Modified validators)
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from watson.common.contextmanagers import suppress
+
+
+def conditional(etag=None, last_modified=None):
+    """Declare the validators of a controller method.
+
+    The validators are called with the controller and the route params before
+    the method is executed. If the values they return match the If-None-Match
+    or If-Modified-Since headers of the request then a 304 Not Modified
+    response is returned, and neither the method or the view are executed.
+
+    Args:
+        etag (callable|string): Returns the ETag of the resource
+        last_modified (callable|string): Returns the datetime or timestamp the
+                                         resource was last modified.
+
+    Example:
+
+    .. code-block:: python
+
+        class Post(controllers.Rest):
+            def version(self, id, **kwargs):
+                return str(posts.version(id))
+
+            @conditional(etag=version)
+            def GET(self, id, **kwargs):
+                return {'post': posts.get(id)}
+    """
+    def decorator(func):
+        func.__conditional__ = (etag, last_modified)
+        return func
+    return decorator
+
+
+def validate(controller, method, **kwargs):
+    """Retrieve the ETag and last modified values of a controller method.
+
+    Returns:
+        tuple: The ETag and last modified values, or None if the method has
+               not declared any validators.
+    """
+    validators = getattr(method, '__conditional__', None)
+    if not validators:
+        return None
+    values = []
+    for validator in validators:
+        if isinstance(validator, str):
+            validator = getattr(controller.__class__, validator)
+        values.append(validator(controller, **kwargs) if validator else None)
+    etag, last_modified = values
+    return (format_etag(etag) if etag else None,
+            to_datetime(last_modified) if last_modified else None)
+
+
+def generate_etag(body):
+    """Generate a strong ETag from the body of a response.
+    """
+    return format_etag(hashlib.md5(body).hexdigest())
+
+
+def format_etag(etag):
+    """Quote an ETag if it has not already been quoted.
+    """
+    etag = str(etag)
+    if etag.endswith('"'):
+        return etag
+    return '"{0}"'.format(etag)
+
+
+def parse_etags(header):
+    """Convert an If-None-Match header into a set of (weak compared) ETags.
+    """
+    return {etag.strip()[2:] if etag.strip().startswith('W/') else etag.strip()
+            for etag in header.split(',')}
+
+
+def to_datetime(value):
+    """Convert a datetime, timestamp or HTTP date into a UTC datetime without
+    microseconds.
+    """
+    if isinstance(value, str):
+        value = parsedate_to_datetime(value)
+    elif not isinstance(value, datetime):
+        value = datetime.fromtimestamp(value, timezone.utc)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def http_date(value):
+    """Format a datetime for use within an HTTP header.
+    """
+    return format_datetime(to_datetime(value), usegmt=True)
+
+
+def is_not_modified(request, etag=None, last_modified=None):
+    """Determine whether or not the client already has the current
+    representation of a resource.
+
+    If-None-Match takes precedence over If-Modified-Since.
+
+    Args:
+        request (watson.http.messages.Request): The request
+        etag (string): The current ETag of the resource
+        last_modified (mixed): When the resource was last modified
+    """
+    if not request.is_method('GET', 'HEAD'):
+        return False
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        if not etag:
+            return False
+        etags = parse_etags(if_none_match)
+        return '*' in etags or parse_etags(etag) <= etags
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since and last_modified:
+        with suppress(TypeError, ValueError, IndexError):
+            if_modified_since = to_datetime(if_modified_since)
+            return to_datetime(last_modified) <= if_modified_since
+    return False
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """Add the ETag and Last-Modified headers to a response.
+    """
+    if etag:
+        response.headers.add('ETag', etag, replace=True)
+    if last_modified:
+        response.headers.add(
+            'Last-Modified', http_date(last_modified), replace=True)
+
+
+def not_modified(response):
+    """Convert a response into a 304 Not Modified response.
+
+    Returns:
+        watson.http.messages.Response
+    """
+    response.status_code = 304
+    response.body = ''
+    return response
@@ -84,6 +84,18 @@ dependencies = {
             'init':
             [lambda container: container.get('application.config')['views']]
         },
+        'app_compress_listener': {
+            'item': 'watson.framework.listeners.Compress',
+            'init':
+            [lambda container: container.get(
+             'application.config')['compression']]
+        },
+        'app_etag_listener': {
+            'item': 'watson.framework.listeners.ETag',
+            'init':
+            [lambda container: container.get(
+             'application.config')['conditional']]
+        },
         'translator': {
             'item': 'watson.framework.i18n.translate.Translator',
             'init': [
@@ -93,6 +105,56 @@ dependencies = {
                     'application.config')['i18n']['package']
             ]
         },
+        'response_cache': {
+            'item': 'watson.framework.caching.ResponseCache',
+            'init':
+            [lambda container: container.get(
+             'application.config')['cache']['response']]
+        },
+        'request_coalescer': {
+            'item': 'watson.framework.caching.RequestCoalescer',
+            'init':
+            [lambda container: container.get(
+             'application.config')['cache']['coalesce']]
+        },
+        'rate_limiter': {
+            'item': 'watson.framework.ratelimit.RateLimiter',
+            'init':
+            [lambda container: container.get(
+             'application.config')['ratelimit']]
+        },
+        'ratelimit_backend': {
+            'item': lambda container: container.get('application.config')['ratelimit']['backend']['class'],
+            'init': lambda container: container.get('application.config')['ratelimit']['backend']['options']
+        },
+        'gather_executor': {
+            'item': 'concurrent.futures.ThreadPoolExecutor',
+            'init': lambda container: {
+                'max_workers': container.get(
+                    'application.config')['gather']['workers'],
+                'thread_name_prefix': 'watson.framework.gather'
+            }
+        },
+        'batch_executor': {
+            'item': 'concurrent.futures.ThreadPoolExecutor',
+            'init': lambda container: {
+                'max_workers': container.get(
+                    'application.config')['batch']['workers'],
+                'thread_name_prefix': 'watson.framework.batch'
+            }
+        },
+        'cors': {
+            'item': 'watson.framework.cors.Cors',
+            'init':
+            [lambda container: container.get(
+             'application.config')['cors']]
+        },
+        'admission_control': {
+            'item': 'watson.framework.admission.AdmissionControl',
+            'init':
+            [lambda container: container.get(
+             'application.config')['admission']]
+        },
         'mailer_backend': {
             'item': lambda container: container.get('application.config')['mail']['backend']['class'],
             'init': lambda container: container.get('application.config')['mail']['backend']['options']
@@ -126,6 +188,13 @@ views = {
                 ],
                 'filters': ['watson.framework.support.jinja2.filters'],
                 'globals': ['watson.framework.support.jinja2.globals'],
+                # render CPU heavy templates in a pool of processes
+                'offload': {
+                    'enabled': False,
+                    'workers': None,  # defaults to the number of CPUs
+                    'threshold': 65536,  # minimum size of the pickled data
+                    'templates': []
+                }
             }
         },
         'xml': {'name': 'xml_renderer'},
@@ -176,6 +245,163 @@ session = {
     }
 }
 
+# Request pipeline settings
+# profiles: named pipeline profiles that can be referenced by the pipeline
+# option of a route, e.g. {'api': {'session': False, 'render': 'json'}}
+pipeline = {
+    'profiles': {}
+}
+
+# Conditional request settings
+# etag: generate an ETag from the rendered body of each successful GET
+# request, responding with 304 Not Modified when it matches If-None-Match.
+conditional = {
+    'etag': True
+}
+
+# Response compression settings
+# encodings: the supported content encodings in order of preference.
+# minimum_size: bodies smaller than this (in bytes) are not compressed.
+# exclude: mime types (or prefixes) that are already compressed.
+compression = {
+    'enabled': False,
+    'encodings': ('gzip', 'deflate'),
+    'level': 6,
+    'minimum_size': 500,
+    'exclude': (
+        'image/png', 'image/jpeg', 'image/gif', 'image/webp',
+        'audio/', 'video/', 'font/woff',
+        'application/zip', 'application/gzip', 'application/pdf',
+        'application/octet-stream'
+    )
+}
+
+# Cache settings
+# type: the container definition of the watson.cache storage to use.
+# response: the full page response cache, only routes that define a cache
+# option will be cached (see watson.framework.caching.ResponseCache).
+# coalesce: identical concurrent GET requests to routes that define a coalesce
+# option (or controller methods decorated with coalesce) wait on a single
+# execution of the controller and view (see
+# watson.framework.caching.RequestCoalescer). Set lock_dir to coalesce
+# requests across processes, sharing the response via the cache storage.
+cache = {
+    'type': 'watson.cache.storage.Memory',
+    'response': {
+        'enabled': False,
+        'timeout': 300,
+        'stale': 0,
+        'vary': ('Accept',),
+        'prefix': 'watson.framework.response'
+    },
+    'coalesce': {
+        'enabled': False,
+        'timeout': 10,
+        'vary': ('Accept',),
+        'lock_dir': None,
+        'share_timeout': 5,
+        'prefix': 'watson.framework.coalesce'
+    }
+}
+
+# Request deadline settings
+# timeout: the number of seconds a request has to be dispatched and rendered,
+# once spent the request is aborted with a 504 Gateway Timeout. Routes can
+# override this via the deadline option (False to disable).
+deadline = {
+    'timeout': None
+}
+
+# Admission control settings
+# limit: the maximum number of requests in flight, routes can also declare
+# their own limit via the concurrency option.
+# queue_timeout: the number of seconds a request waits for a free slot before
+# it is rejected with a 503 Service Unavailable.
+# max_queue_time: reject requests that have already waited longer than this
+# many seconds before reaching the application (determined from the
+# queue_header set by the web server, e.g. X-Request-Start: t=1234567890.123)
+# retry_after: the value of the Retry-After header of rejected requests.
+admission = {
+    'enabled': False,
+    'limit': None,
+    'queue_timeout': 0,
+    'max_queue_time': None,
+    'queue_header': 'X-Request-Start',
+    'retry_after': 1
+}
+
+# Settings of the thread pool shared by controllers via HttpMixin.gather
+# workers: the maximum number of threads executing gathered callables.
+# timeout: the default number of seconds gathered callables have to complete
+# (None to wait indefinitely, or until the deadline of the request).
+gather = {
+    'workers': 8,
+    'timeout': 10
+}
+
+# Batch request settings
+# path: the path of the batch endpoint, which accepts a POST request with a
+# JSON list of sub-requests, e.g. [{"method": "GET", "path": "/posts?page=2"}]
+# max_requests: the maximum number of sub-requests within a batch.
+# workers: execute the sub-requests in parallel on a pool of this many threads
+# (None to execute them in order).
+batch = {
+    'enabled': False,
+    'path': '/batch',
+    'max_requests': 20,
+    'workers': None
+}
+
+# WSGI middleware settings
+# The middleware wrapping the application, outermost first. Each is either the
+# qualified name of a class instantiated with the WSGI callable it wraps, or a
+# dict of the class, its options and whether or not it is enabled, e.g.
+# {'class': 'watson.framework.middleware.Static',
+#  'options': {'path': 'public', 'prefix': '/static'}}
+# See watson.framework.middleware for the included Timing and Static.
+middleware = []
+
+# Rate limit settings
+# rate: the number of requests per second each client can make (None to only
+# limit the routes that define a ratelimit option).
+# burst: the number of requests a client can make in quick succession.
+# key: identify clients by ip or session.
+# forwarded: the number of trusted proxies in front of the application, used to
+# identify clients by the X-Forwarded-For header (0 to ignore the header).
+# backend: where the token buckets are stored, see
+# watson.framework.ratelimit.backends (Memory, SharedMemory or Cache).
+ratelimit = {
+    'enabled': False,
+    'rate': None,
+    'burst': 20,
+    'key': 'ip',
+    'forwarded': 0,
+    'backend': {
+        'class': 'watson.framework.ratelimit.backends.SharedMemory',
+        'options': {}
+    },
+    'prefix': 'watson.framework.ratelimit'
+}
+
+# CORS settings
+# origins: the origins allowed to make cross origin requests ('*' for any).
+# methods: the methods that can be requested (defaults to those the route
+# accepts).
+# headers: the request headers that clients can send.
+# expose: the response headers that clients can read.
+# credentials: whether or not clients can send cookies.
+# max_age: the number of seconds clients can cache preflight responses for.
+# Routes can override these via the cors option (False to disable).
+cors = {
+    'enabled': False,
+    'origins': ('*',),
+    'methods': None,
+    'headers': ('Accept', 'Content-Type', 'X-Requested-With'),
+    'expose': (),
+    'credentials': False,
+    'max_age': 600
+}
+
 # Exceptions
 exceptions = {
     'class': 'watson.framework.exceptions.ApplicationError'
@@ -203,9 +429,20 @@ events = {
     events.EXCEPTION: [('app_exception_listener',)],
     events.INIT: [
         ('watson.framework.logging.listeners.Init', 1),
-        ('watson.framework.debug.listeners.Init', 1)
+        ('watson.framework.debug.listeners.Init', 1),
+        ('watson.framework.caching.listeners.Init', 1),
+        ('watson.framework.ratelimit.listeners.Init', 1),
+        ('watson.framework.batch.listeners.Init', 1),
+        ('watson.framework.cors.listeners.Init', 1)
     ],
     events.ROUTE_MATCH: [('watson.framework.listeners.Route',)],
     events.DISPATCH_EXECUTE: [('app_dispatch_execute_listener',)],
-    events.RENDER_VIEW: [('app_render_listener',)],
+    events.RENDER_VIEW: [
+        ('app_render_listener',),
+        ('app_compress_listener', -1050),
+        ('app_etag_listener', -1100)
+    ],
+    events.COMPLETE: [
+        ('watson.framework.listeners.ClearRequestCache', -1000)
+    ],
 }
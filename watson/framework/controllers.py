@@ -1,10 +1,18 @@
 # -*- coding: utf-8 -*-
 import abc
 import collections
+import contextvars
+import functools
 import re
+import threading
+import time
+from concurrent import futures
 from watson.di import ContainerAware
 from watson.events import types
 from watson.framework import events
+from watson.framework.exceptions import ApplicationError, InternalServerError
+from watson.framework.local import current_event
+from watson.http import REQUEST_METHODS
 from watson.http.messages import Response, Request
 from watson.common.imports import get_qualified_name
 from watson.common.contextmanagers import suppress
@@ -12,14 +20,73 @@ from watson.common.contextmanagers import suppress
 
 ACCEPTABLE_RETURN_TYPES = (str, int, float, bool)
 
+# Controller lifecycle scopes
+REQUEST_SCOPE = 'request'
+POOLED_SCOPE = 'pooled'
+SINGLETON_SCOPE = 'singleton'
+
+
+def to_application_error(func, exc=None, timeout=None):
+    """Convert an exception raised by a gathered callable into an
+    ApplicationError, so that it is handled like any other exception raised
+    by a controller.
+
+    Args:
+        func (callable): The gathered callable
+        exc (Exception): The exception raised by the callable, or None if the
+                         callable did not complete within the timeout
+        timeout (float): The number of seconds the callable had to complete
+
+    Returns:
+        watson.framework.exceptions.ApplicationError
+    """
+    if isinstance(exc, ApplicationError):
+        return exc
+    name = get_qualified_name(getattr(func, 'func', func))
+    if exc is None:
+        return InternalServerError(
+            '{0} did not complete within {1:g}s'.format(name, timeout or 0))
+    error = InternalServerError(
+        'An error occurred executing {0}'.format(name))
+    error.__cause__ = exc
+    return error
+
+
+@functools.lru_cache(maxsize=256)
+def action_template(action):
+    """Convert an action name into the name of its template.
+    """
+    return re.sub('.-', '_', action.lower())
+
 
 class Base(ContainerAware, metaclass=abc.ABCMeta):
 
     """The base class for all controllers.
 
+    The lifecycle of a controller can be declared via the __scope__ attribute:
+
+    request
+        A new instance is retrieved from the container for each request.
+    pooled
+        Instances are reused from a pool, and reset() is called on the
+        instance before it is returned to the pool.
+    singleton
+        A single stateless instance is shared between all requests. Request
+        state is never assigned to the instance, instead the event being
+        dispatched is bound to the executing thread or task.
+
+    If no scope is declared the controller is retrieved from the container
+    as is (a shared instance by default), and like a singleton the event is
+    bound to the executing thread or task rather than set on the instance.
+
     Attributes:
         __action__ (string): The last action that was called on the controller.
+        __scope__ (string): The lifecycle scope of the controller.
+        __pool_size__ (int): The maximum number of idle pooled instances.
     """
+    __scope__ = None
+    __pool_size__ = None
+
     def execute(self, **kwargs):
         method = self.get_execute_method(**kwargs)
         self.__action__ = method
@@ -35,10 +102,66 @@ class Base(ContainerAware, metaclass=abc.ABCMeta):
         raise NotImplementedError(
             'You must implement get_execute_method_path')  # pragma: no cover
 
+    def get_execute_method_key(self, **kwargs):
+        """A hashable key identifying the method that will be executed.
+
+        The path returned from get_execute_method_path is cached per
+        controller class and key. Returning None disables the caching, which
+        Action and Rest do for subclasses that override
+        get_execute_method_path without also overriding this method.
+        """
+        return None
+
+    def reset(self):
+        """Clear any request state held by the controller.
+
+        Called before a pooled controller is returned to its pool.
+        """
+        self.__dict__.pop('__action__', None)
+        self._event = None
+
     def __repr__(self):
         return '<{0}>'.format(get_qualified_name(self))
 
 
+class Pool(object):
+
+    """A pool of controller instances for controllers with a pooled scope.
+
+    Attributes:
+        factory (callable): Creates a new controller instance
+        size (int): The maximum number of idle instances to retain
+    """
+
+    def __init__(self, factory, size=None):
+        self.factory = factory
+        self.size = size
+        self.idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Retrieve an idle controller, creating one if none are available.
+        """
+        with self._lock:
+            if self.idle:
+                return self.idle.pop()
+        return self.factory()
+
+    def release(self, controller):
+        """Reset the controller and return it to the pool.
+        """
+        controller.reset()
+        with self._lock:
+            if self.size is None or len(self.idle) < self.size:
+                self.idle.append(controller)
+
+    def __len__(self):
+        return len(self.idle)
+
+    def __repr__(self):
+        return '<{0} idle:{1}>'.format(get_qualified_name(self), len(self))
+
+
 class HttpMixin(object):
 
     """A mixin for controllers that can contain http request and response
@@ -58,10 +181,17 @@ class HttpMixin(object):
         Returns:
             watson.events.types.Event
         """
-        if not self._event:
-            self._event = types.Event(
-                events.DISPATCH_EXECUTE, params={'context': {}})
-        return self._event
+        # the event of the request being dispatched takes precedence, as the
+        # instance may be shared with other concurrent requests
+        event = current_event.get()
+        if event is not None:
+            return event
+        if self._event:
+            return self._event
+        event = types.Event(events.DISPATCH_EXECUTE, params={'context': {}})
+        if getattr(self, '__scope__', None) != SINGLETON_SCOPE:
+            self._event = event
+        return event
 
     @event.setter
     def event(self, event):
@@ -137,6 +267,97 @@ class HttpMixin(object):
                 'Invalid response type, expected watson.http.messages.Response')
         self.event.params['context']['response'] = response
 
+    @property
+    def deadline(self):
+        """The deadline of the request, if one has been set.
+
+        The remaining time can be used to cap any calls made to other
+        services, see watson.framework.deadlines.Deadline.
+
+        Returns:
+            watson.framework.deadlines.Deadline
+        """
+        return self.event.params['context'].get('deadline')
+
+    @property
+    def request_cache(self):
+        """A cache that lives for the duration of the request.
+
+        Values stored within the cache are shared with any forwarded
+        controllers, listeners and functions decorated with
+        watson.framework.local.request_cached, and are cleared once the
+        request has completed.
+
+        Returns:
+            dict
+        """
+        return self.event.params['context'].setdefault('request_cache', {})
+
+    def gather(self, *callables, timeout=None, return_exceptions=False):
+        """Execute callables concurrently on the thread pool shared by all
+        controllers (see the gather config).
+
+        Each callable is executed within a copy of the current context, so
+        request local state is available to it. Callables that have not
+        completed within the timeout are abandoned (but not interrupted).
+
+        Example:
+
+        .. code-block:: python
+
+            class Dashboard(controllers.Rest):
+                def GET(self, **kwargs):
+                    posts, stats = self.gather(
+                        posts.latest, functools.partial(stats.get, days=7))
+                    return {'posts': posts, 'stats': stats}
+
+        Args:
+            callables (callable): The callables to execute, use
+                functools.partial to provide any arguments.
+            timeout (float): The number of seconds the callables have to
+                complete, defaults to the timeout in the gather config. The
+                timeout is capped by the deadline of the request.
+            return_exceptions (bool): Return the errors in place of the
+                results rather than raising the first error.
+
+        Returns:
+            list: The results of the callables, in the same order
+
+        Raises:
+            watson.framework.exceptions.ApplicationError: If a callable raised
+                an exception or did not complete within the timeout.
+        """
+        if timeout is None:
+            timeout = self.container.get(
+                'application.config')['gather']['timeout']
+        deadline = self.deadline
+        if deadline is not None:
+            timeout = deadline.remaining if timeout is None else min(
+                timeout, deadline.remaining)
+        executor = self.container.get('gather_executor')
+        pending = [executor.submit(contextvars.copy_context().run, func)
+                   for func in callables]
+        expires = None if timeout is None else time.monotonic() + timeout
+        results = []
+        for func, future in zip(callables, pending):
+            remaining = None if expires is None else max(
+                0, expires - time.monotonic())
+            # the callable itself may raise a TimeoutError, so only the wait
+            # determines whether or not it timed out
+            if futures.wait((future,), remaining).not_done:
+                error = to_application_error(func, timeout=timeout)
+            elif future.exception() is not None:
+                error = to_application_error(func, future.exception())
+            else:
+                results.append(future.result())
+                continue
+            if not return_exceptions:
+                for other in pending:
+                    other.cancel()
+                raise error
+            results.append(error)
+        return results
+
     def url(self, route_name, host=None, scheme=None, **params):
         """Converts a route into a url.
 
@@ -216,8 +437,9 @@ class HttpMixin(object):
             method = self.__action__
         if not hasattr(controller, method):
             controller = self.container.get(controller)
-        controller.request = self.request
-        controller.event = self.event
+        if getattr(controller, '__scope__', None) != SINGLETON_SCOPE:
+            controller.request = self.request
+            controller.event = self.event
         return getattr(controller, method)(*args, **kwargs)
 
     @property
@@ -373,14 +595,45 @@ class Action(Base, HttpMixin):
         return getattr(self, method_name)
 
     def get_execute_method_path(self, **kwargs):
-        template = re.sub('.-', '_', self.get_action(**kwargs).lower())
+        template = action_template(self.get_action(**kwargs))
         return [self.__class__.__name__.lower(), template]
 
+    def get_execute_method_key(self, **kwargs):
+        if type(self).get_execute_method_path is not (
+                Action.get_execute_method_path):
+            # the path may not be derived from the action alone
+            return None
+        return self.get_action(**kwargs)
+
+
+def method_table(cls):
+    """Map each request method to the name of the controller method that
+    will be executed for it.
+
+    HEAD falls back to GET when the controller does not define HEAD.
+
+    Returns:
+        dict
+    """
+    methods = {}
+    for method in REQUEST_METHODS + ('PATCH',):
+        if callable(getattr(cls, method, None)):
+            methods[method] = method
+    if 'HEAD' not in methods and 'GET' in methods:
+        methods['HEAD'] = 'GET'
+    return methods
+
 
 class Rest(Base, HttpMixin):
 
     """A controller thats methods can be accessed by the request method name.
 
+    The methods a controller responds to are determined once per class. HEAD
+    requests execute GET when HEAD is not defined (the view is not rendered
+    for HEAD requests, see watson.framework.listeners.DispatchExecute), and
+    OPTIONS requests are answered with the Allow header. Any other method
+    that has not been defined receives a 405 Method Not Allowed.
+
     Example:
 
     .. code-block:: python
@@ -388,11 +641,51 @@ class Rest(Base, HttpMixin):
         class MyController(controllers.Rest):
             def GET(self):
                 return 'something'
+
+    Attributes:
+        __methods__ (dict): The controller method executed for each request
+                            method.
+        __allow__ (string): The value of the Allow header.
     """
+    __methods__ = {'OPTIONS': 'OPTIONS'}
+    __allow__ = 'OPTIONS'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.__methods__ = method_table(cls)
+        cls.__allow__ = ', '.join(sorted(cls.__methods__))
 
     def get_execute_method(self, **kwargs):
-        return getattr(self, self.request.method)
+        method = self.request.method
+        name = self.__methods__.get(method)
+        if name is None:
+            return getattr(self, method, self.method_not_allowed)
+        return getattr(self, name)
+
+    def OPTIONS(self, **kwargs):
+        """Respond with the methods the controller allows.
+        """
+        self.response.headers.add('Allow', self.__allow__, replace=True)
+        return self.response
+
+    def method_not_allowed(self, **kwargs):
+        """Reject a request method the controller does not define with a
+        plain text 405 Method Not Allowed.
+        """
+        response = self.response
+        response.status_code = 405
+        response.headers.add('Allow', self.__allow__, replace=True)
+        response.headers.add('Content-Type', 'text/plain; charset=utf-8')
+        response.body = 'Method Not Allowed'
+        return response
 
     def get_execute_method_path(self, **kwargs):
         template = self.request.method.lower()
         return [self.__class__.__name__.lower(), template]
+
+    def get_execute_method_key(self, **kwargs):
+        if type(self).get_execute_method_path is not (
+                Rest.get_execute_method_path):
+            # the path may not be derived from the request method alone
+            return None
+        return self.request.method
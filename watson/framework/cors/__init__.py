@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+from watson.framework.cors.policy import Cors, Policy
+
+__all__ = ['Cors', 'Policy']
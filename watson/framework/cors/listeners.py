@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from watson.di import ContainerAware
+from watson.framework import applications
+
+
+class Init(ContainerAware):
+
+    """Attaches itself to the applications INIT event and registers the
+    CORS listeners.
+    """
+
+    def __call__(self, event):
+        app = event.target
+        if isinstance(app, applications.Http):
+            if app.config['cors']['enabled']:
+                cors = self.container.get('cors')
+                cors.compile(self.container.get('router'))
+                cors.register_listeners(app.dispatcher)
+                return cors
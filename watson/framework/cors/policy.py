@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+import collections
+from watson.di import ContainerAware
+from watson.http.messages import Response
+from watson.framework import compression, events
+
+# origins: the allowed origins, or None if any origin is allowed
+# methods: the methods that can be requested
+# wildcard: the Access-Control-Allow-Origin value when any origin is allowed
+# preflight: the headers added to preflight responses
+# headers: the headers added to all other responses
+Policy = collections.namedtuple(
+    'Policy', 'origins methods wildcard preflight headers')
+
+
+def create_policy(settings, accepts):
+    """Convert CORS settings into a policy, precomputing the headers of each
+    response.
+
+    Args:
+        settings (dict): The origins, methods, headers, expose, credentials
+                         and max_age settings.
+        accepts (tuple): The methods accepted by the route
+
+    Returns:
+        Policy
+
+    Raises:
+        ValueError: If credentials are allowed for any origin, which would let
+                    any site make credentialed requests.
+    """
+    origins = tuple(settings['origins'])
+    methods = tuple(settings.get('methods') or accepts)
+    credentials = settings.get('credentials')
+    any_origin = '*' in origins
+    if any_origin and credentials:
+        raise ValueError(
+            'CORS credentials cannot be allowed for any origin (*), the '
+            'allowed origins must be listed')
+    headers = []
+    if credentials:
+        headers.append(('Access-Control-Allow-Credentials', 'true'))
+    preflight = headers + [
+        ('Access-Control-Allow-Methods', ', '.join(methods)),
+        ('Access-Control-Max-Age', str(settings['max_age']))
+    ]
+    if settings.get('headers'):
+        preflight.append(
+            ('Access-Control-Allow-Headers', ', '.join(settings['headers'])))
+    if settings.get('expose'):
+        headers.append(
+            ('Access-Control-Expose-Headers', ', '.join(settings['expose'])))
+    return Policy(
+        origins=None if any_origin else frozenset(origins),
+        methods=frozenset(methods),
+        wildcard='*' if any_origin else None,
+        preflight=tuple(preflight),
+        headers=tuple(headers))
+
+
+class Cors(ContainerAware):
+
+    """Handles Cross-Origin Resource Sharing.
+
+    A policy is precomputed for each route from the cors config, which routes
+    can override via the cors option (or disable by setting it to False).
+    Preflight requests are answered before the request is routed, so no
+    controller is executed, and the CORS headers are added to the response of
+    all other requests that include an Origin header.
+
+    Example:
+
+    .. code-block:: python
+
+        cors = {
+            'enabled': True,
+            'origins': ('https://example.com',)
+        }
+
+        routes = {
+            'api': {
+                'path': '/api',
+                'options': {
+                    'controller': 'app.controllers.Api',
+                    'cors': {'credentials': True, 'max_age': 3600}
+                }
+            }
+        }
+
+    Attributes:
+        config (dict): The CORS settings
+        policies (dict): The policy of each route
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.policies = {}
+
+    def register_listeners(self, dispatcher):
+        """Register the preflight and response listeners against the
+        dispatcher.
+
+        Preflight requests are answered before the route listener is executed,
+        and the headers are added once the request has completed.
+        """
+        dispatcher.add(events.ROUTE_MATCH, self.preflight, 50)
+        dispatcher.add(events.COMPLETE, self.add_headers, 10)
+
+    def compile(self, router):
+        """Precompute the policy of each route within the router.
+        """
+        for name, route in router:
+            self.policy(route)
+
+    def policy(self, route):
+        """Retrieve the policy of a route.
+
+        Returns:
+            Policy: The policy, or None if CORS is disabled for the route
+        """
+        try:
+            return self.policies[route.name]
+        except KeyError:
+            options = route.options.get('cors', True)
+            policy = None
+            if options:
+                settings = self.config
+                if isinstance(options, dict):
+                    settings = dict(settings, **options)
+                policy = create_policy(settings, route.accepts)
+            self.policies[route.name] = policy
+            return policy
+
+    def allow_origin(self, policy, origin):
+        """Determine the Access-Control-Allow-Origin of an origin.
+
+        Returns:
+            string: The value of the header, or None if not allowed
+        """
+        if policy.origins is None:
+            return policy.wildcard
+        return origin if origin in policy.origins else None
+
+    def preflight(self, event):
+        """Answer a preflight request from the policy of the route it was made
+        to.
+
+        The route is matched as if the request was made with the requested
+        method. The route listener is not executed for preflight requests.
+        """
+        context = event.params['context']
+        request = context['request']
+        if request.method != 'OPTIONS':
+            return
+        environ = request.environ
+        method = environ.get('HTTP_ACCESS_CONTROL_REQUEST_METHOD')
+        origin = environ.get('HTTP_ORIGIN')
+        if not method or not origin:
+            return
+        route_match = event.params['router'].match(
+            RequestedMethod(request, method.upper()))
+        if not route_match:
+            return
+        policy = self.policy(route_match.route)
+        if policy is None:
+            return
+        response = context['response'] = Response(204)
+        event.stop_propagation()
+        if method.upper() not in policy.methods:
+            return
+        allow_origin = self.allow_origin(policy, origin)
+        if allow_origin is None:
+            return
+        self.set_headers(response, policy, allow_origin, policy.preflight)
+
+    def add_headers(self, event):
+        """Add the CORS headers to the response of a cross origin request to
+        a matched route.
+        """
+        context = event.params['context']
+        origin = context['request'].environ.get('HTTP_ORIGIN')
+        route_match = context.get('route_match')
+        response = context.get('response')
+        if not origin or not route_match or response is None:
+            return
+        policy = self.policy(route_match.route)
+        if policy is None:
+            return
+        allow_origin = self.allow_origin(policy, origin)
+        if allow_origin is not None:
+            self.set_headers(response, policy, allow_origin, policy.headers)
+
+    def set_headers(self, response, policy, allow_origin, headers):
+        response.headers.add('Access-Control-Allow-Origin', allow_origin)
+        if policy.wildcard is None:
+            compression.add_vary(response, 'Origin')
+        for name, value in headers:
+            response.headers.add(name, value)
+
+
+class RequestedMethod(object):
+
+    """A request as it would be made with the method requested by a preflight
+    request, used to match the route of the preflight request.
+    """
+
+    def __init__(self, request, method):
+        self.request = request
+        self.method = method
+
+    def __getattr__(self, name):
+        return getattr(self.request, name)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Request deadlines, aborting requests whose time budget has been spent
+import time
+from watson.common.imports import get_qualified_name
+from watson.framework.exceptions import DeadlineExceededError
+
+
+class Deadline(object):
+
+    """The time budget of a request.
+
+    Deadlines are set from the deadline config, or the deadline option of the
+    matched route. They are checked before the controller is executed and
+    before the view is rendered, aborting the request with a 504 Gateway
+    Timeout once the budget has been spent.
+
+    Example:
+
+    .. code-block:: python
+
+        class Search(controllers.Rest):
+            def GET(self, **kwargs):
+                timeout = min(self.deadline.remaining, 2)
+                return {'results': client.search(timeout=timeout)}
+
+    Attributes:
+        timeout (float): The number of seconds the request has
+        started (float): The monotonic time the request started
+        expires (float): The monotonic time the deadline expires
+    """
+    __slots__ = ('timeout', 'started', 'expires')
+
+    def __init__(self, timeout, started=None):
+        self.timeout = timeout
+        self.started = time.monotonic() if started is None else started
+        self.expires = self.started + timeout
+
+    @property
+    def remaining(self):
+        """The number of seconds remaining before the deadline expires.
+
+        Returns:
+            float
+        """
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    def check(self, phase='request'):
+        """Abort the request if the deadline has expired.
+
+        Args:
+            phase (string): What the request was about to do
+
+        Raises:
+            watson.framework.exceptions.DeadlineExceededError
+        """
+        if self.expired:
+            raise DeadlineExceededError(
+                'Deadline of {0}s exceeded before {1}'.format(
+                    self.timeout, phase))
+
+    def __repr__(self):
+        return '<{0} timeout:{1} remaining:{2:.3f}>'.format(
+            get_qualified_name(self), self.timeout, self.remaining)
+
+
+def check(context, phase='request'):
+    """Abort the request if the deadline within its context has expired.
+
+    Args:
+        context (dict): The context of the request
+        phase (string): What the request was about to do
+    """
+    deadline = context.get('deadline')
+    if deadline is not None:
+        deadline.check(phase)
@@ -1,20 +1,31 @@
 # -*- coding: utf-8 -*-
 import abc
 from watson.common import strings
+from watson.framework.local import RequestLocal
 
 
 class Panel(metaclass=abc.ABCMeta):
-    data = None
+
+    """The base class for all debug toolbar panels.
+
+    Panels are shared between concurrent requests, so any state collected
+    during a request should be stored in a RequestLocal attribute.
+
+    Attributes:
+        data (dict): The data collected for the current request
+        event (watson.events.types.Event): The render event of the current
+            request.
+    """
+    data = RequestLocal(dict)
     title = 'Unnamed Panel'
     icon = 'ellipsis-v'
-    event = None
+    event = RequestLocal()
 
     def __init__(self, config, renderer, application):
         self.config = config
         self.renderer = renderer
         self.application = application
         self.application_run = application.run
-        self.data = {}
 
     @property
     def _template(self):
@@ -4,6 +4,7 @@ from pygments import formatters, lexers
 import resource
 from watson.framework.debug import abc
 from watson.framework import events
+from watson.framework.local import RequestLocal
 
 
 def pretty(value, htchar='    ', lfchar='\n', indent=0):
@@ -36,7 +37,8 @@ def pretty(value, htchar='    ', lfchar='\n', indent=0):
 class Panel(abc.Panel):
     title = 'Application'
     icon = 'cube'
-    route_match = None
+    route_match = RequestLocal()
+    view_model = RequestLocal()
 
     @property
     def route_name(self):
@@ -1,16 +1,18 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 from watson.framework.debug import abc
+from watson.framework.local import RequestLocal
 import logging
 
 
 class DebugPanelHandler(logging.Handler):
-    _records = None
+
+    """Collects the log records emitted during the current request.
+    """
+    _records = RequestLocal(list)
 
     @property
     def records(self):
-        if not self._records:
-            self._records = []
         return self._records
 
     def clear(self):
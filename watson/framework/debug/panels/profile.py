@@ -5,9 +5,13 @@ from watson.framework.debug import abc, profile
 class Panel(abc.Panel):
     title = 'Profile'
     icon = 'clock-o'
+    # The profile wraps the entire request, so the data displayed is always
+    # that of the last profiled request.
+    data = None
 
     def __init__(self, config, renderer, application):
         super(Panel, self).__init__(config, renderer, application)
+        self.data = {}
         if config.get('enabled'):
             self.application_run = application.run
             application.run = self.run
@@ -2,6 +2,7 @@
 import collections
 from watson.common import imports
 from watson.framework import events
+from watson.framework.responses import StreamingResponse
 
 
 class Toolbar(object):
@@ -28,10 +29,16 @@ class Toolbar(object):
 
     def render(self, event):
         """Render the toolbar to the browser.
+
+        The toolbar is not rendered for routes whose pipeline profile has
+        disabled it.
         """
+        context = event.params['context']
+        profile = context.get('profile')
+        if profile is not None and not profile.toolbar:
+            return None
         for module, panel in self.panels.items():
             panel.event = event
-        context = event.params['context']
         response, view_model = context['response'], event.params['view_model']
         if view_model.format == 'html':
             html_body = ''.join([
@@ -39,5 +46,31 @@ class Toolbar(object):
                     'debug/toolbar',
                     {'panels': self.panels, 'config': self.config}),
                 self.replace_tag])
-            response.body = response.body.replace(self.replace_tag, html_body)
+            if isinstance(response, StreamingResponse):
+                response.stream = self.inject(response.stream, html_body)
+            else:
+                response.body = response.body.replace(
+                    self.replace_tag, html_body)
         return response
+
+    def inject(self, stream, html_body):
+        """Inject the toolbar into a streamed body.
+
+        Chunks are passed through as they are received, only holding back
+        enough characters to detect a replace tag split across two chunks.
+        """
+        hold = len(self.replace_tag) - 1
+        pending = ''
+        for chunk in stream:
+            if isinstance(chunk, bytes):
+                chunk = chunk.decode('utf-8')
+            pending += chunk
+            if self.replace_tag in pending:
+                yield pending.replace(self.replace_tag, html_body)
+                yield from stream
+                return
+            if len(pending) > hold:
+                yield pending[:-hold]
+                pending = pending[-hold:]
+        if pending:
+            yield pending
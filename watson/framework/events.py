@@ -5,3 +5,4 @@ DISPATCH_EXECUTE = 'event.framework.dispatch.execute'
 RENDER_VIEW = 'event.framework.render.view'
 EXCEPTION = 'event.framework.exception'
 COMPLETE = 'event.framework.complete'
+POST_RESPONSE = 'event.framework.post.response'
@@ -36,6 +36,16 @@ class InternalServerError(ApplicationError):
     status_code = 500
 
 
+class DeadlineExceededError(ApplicationError):
+
+    """504 Gateway Timeout exception.
+
+    Raised when the deadline of a request has passed before it could be
+    dispatched or rendered.
+    """
+    status_code = 504
+
+
 class ExceptionHandler(object):
 
     """Processes an exception and formats a stack trace.
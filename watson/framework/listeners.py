@@ -2,20 +2,53 @@
 # TODO: Refactor these into single functions rather than classes where
 # appropriate
 import abc
+import contextvars
+import functools
+import inspect
 import logging
 import os
 import sys
-from watson.common.imports import get_qualified_name
+from watson.common.contextmanagers import suppress
+from watson.common.imports import (get_qualified_name,
+                                   load_definition_from_string)
 from watson.di import ContainerAware
 from watson.http import MIME_TYPES
 from watson.http.messages import Response
 from watson.http.sessions import session_to_cookie
-from watson.framework import controllers
+from watson.framework import (compression, conditional, controllers,
+                              deadlines, local)
 from watson.framework.exceptions import (NotFoundError, InternalServerError,
                                          ApplicationError)
+from watson.framework.responses import (BoundStream, StreamingResponse,
+                                        is_stream)
 from watson.framework.views import Model
 
 
+def is_bound_stream(response):
+    """Determine whether or not a response streams chunks that are bound to
+    the controller that returned them (see DispatchExecute.create_view_model).
+    """
+    return isinstance(getattr(response, 'stream', None), BoundStream)
+
+
+def get_mime_type(format):
+    """Convert a view format into a mime type.
+
+    Example:
+
+    .. code-block:: python
+
+        get_mime_type('json')  # application/json
+        get_mime_type('csv')  # text/csv
+    """
+    try:
+        return MIME_TYPES[format][0]
+    except Exception:
+        if '/' in format:
+            return format
+        return 'text/{0}'.format(format)
+
+
 class Base(ContainerAware, metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
@@ -36,60 +69,100 @@ class Route(Base):
             'Route not found for request: {0}'.format(request.url), 404)
 
 
+class ClearRequestCache(Base):
+
+    """Clears the request cache (see watson.framework.local.request_cached)
+    once the request has completed.
+    """
+
+    def __call__(self, event):
+        event.params['context'].pop('request_cache', None)
+
+
 class DispatchExecute(Base):
 
     def __init__(self, templates):
         self.templates = templates
+        self.view_templates = {}
+        self.controller_scopes = {}
 
     def determine_controller(self, event):
         """Figure out which controller class is associated with the route.
         """
         route_match = event.params['context']['route_match']
         try:
-            controller = event.params['container'].get(
-                route_match.route.options['controller'])
-            controller.event = event
+            name = route_match.route.options['controller']
+            container = event.params['container']
+            scope, pool = self.get_controller_scope(name, container)
+            if pool is not None:
+                controller = pool.acquire()
+            else:
+                controller = container.get(name)
+            if scope in (controllers.REQUEST_SCOPE,
+                         controllers.POOLED_SCOPE):
+                # shared instances read the event from the request locals
+                controller.event = event
             return controller
         except Exception as exc:
             raise InternalServerError(
                 'Controller not found for route: {0}'.format(
                     route_match.route.name)) from exc
 
+    def get_controller_scope(self, name, container):
+        """Determine the lifecycle scope of a controller.
+
+        Controllers with a request or pooled scope are redefined as prototypes
+        within the container so that a new instance is created each time one
+        is retrieved.
+
+        Returns:
+            tuple: The scope and the pool (if the controller is pooled)
+        """
+        if name in self.controller_scopes:
+            return self.controller_scopes[name]
+        definition = container.definitions.get(name, {})
+        item = definition.get('item', name)
+        if isinstance(item, str):
+            with suppress(ImportError, AttributeError, ValueError):
+                item = load_definition_from_string(item)
+        scope = getattr(item, '__scope__', None)
+        pool = None
+        if scope in (controllers.REQUEST_SCOPE, controllers.POOLED_SCOPE):
+            container.add_definition(
+                name, dict(definition, item=item, type='prototype'))
+            container.instantiated.pop(name, None)
+            if scope == controllers.POOLED_SCOPE:
+                pool = controllers.Pool(
+                    functools.partial(container.get, name),
+                    item.__pool_size__)
+        self.controller_scopes[name] = scope, pool
+        return scope, pool
+
+    def release_controller(self, controller, event):
+        """Return a pooled controller to its pool once it has been executed.
+        """
+        route_match = event.params['context']['route_match']
+        scope, pool = self.controller_scopes.get(
+            route_match.route.options['controller'], (None, None))
+        if pool is not None:
+            pool.release(controller)
+
     def get_returned_controller_data(self, controller, event):
         context = event.params['context']
         route_match = context['route_match']
         try:
             execute_params = route_match.params
+            method = controller.get_execute_method(**execute_params)
+            response = self.validate_conditional(controller, event, method)
+            if response is None:
+                response = self.coalesce(controller, event, method)
+            if response is not None:
+                return self.create_view_model(controller, event, response)
             model_data = controller.execute(**execute_params)
-            if isinstance(model_data, controllers.ACCEPTABLE_RETURN_TYPES):
-                model_data = {'content': model_data}
-            elif isinstance(model_data, Response):
-                # Short circuited, skip any templating
-                controller.response = context['response'] = model_data
-                return model_data, model_data
-            path = controller.get_execute_method_path(
-                **route_match.params)
-            controller_template = os.path.join(*path)
-            view_template = self.templates.get(controller_template,
-                                               controller_template)
-            format = route_match.params.get('format', 'html')
-            if isinstance(model_data, Model):
-                if not model_data.template:
-                    model_data.template = view_template
-                else:
-                    overridden_template = path[:-1] + [model_data.template]
-                    model_data.template = os.path.join(
-                        *overridden_template)
-                if not model_data.format:
-                    model_data.format = format
-                view_model = model_data
-            else:
-                view_model = Model(
-                    format=format,
-                    template=view_template,
-                    data=model_data)
-            context['response'] = controller.response
-            return controller.response, view_model
+            if inspect.isawaitable(model_data):
+                return self.__await_returned_controller_data(
+                    controller, event, model_data)
+            return self.create_view_model(controller, event, model_data)
         except (ApplicationError, NotFoundError, InternalServerError):
             raise  # pragma: no cover
         except Exception as exc:
@@ -97,15 +170,214 @@ class DispatchExecute(Base):
                 'An error occurred executing controller: {0}'.format(
                     get_qualified_name(controller))) from exc
 
+    def validate_conditional(self, controller, event, method=None):
+        """Check the validators declared on the controller method against the
+        conditional headers of the request.
+
+        Args:
+            method (callable): The controller method that will be executed,
+                               resolved from the route match if not given.
+
+        Returns:
+            watson.http.messages.Response: A 304 Not Modified response if the
+                                           client has the current resource.
+        """
+        context = event.params['context']
+        request = context['request']
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        params = context['route_match'].params
+        if method is None:
+            method = controller.get_execute_method(**params)
+        if not hasattr(method, '__conditional__'):
+            return None
+        validators = conditional.validate(controller, method, **params)
+        if validators is None:
+            return None
+        response = controller.response
+        conditional.set_validators(response, *validators)
+        if conditional.is_not_modified(request, *validators):
+            return conditional.not_modified(response)
+        return None
+
+    def coalesce(self, controller, event, method=None):
+        """Wait on an identical GET request that is already being executed
+        and share its response (see watson.framework.caching.RequestCoalescer).
+
+        Args:
+            method (callable): The controller method that will be executed,
+                               resolved from the route match if not given.
+
+        Returns:
+            watson.http.messages.Response: The shared response, or None if the
+                                           controller should be executed.
+        """
+        context = event.params['context']
+        if context['request'].method != 'GET':
+            return None
+        route_match = context['route_match']
+        if not route_match.route.options.get('coalesce'):
+            if method is None:
+                method = controller.get_execute_method(**route_match.params)
+            if not getattr(method, '__coalesce__', False):
+                return None
+        coalescer = event.params['container'].get('request_coalescer')
+        return coalescer.join(context)
+
+    async def __await_returned_controller_data(
+            self, controller, event, awaitable):
+        try:
+            model_data = await awaitable or {}
+            return self.create_view_model(controller, event, model_data)
+        except ApplicationError:
+            raise
+        except Exception as exc:
+            raise InternalServerError(
+                'An error occurred executing controller: {0}'.format(
+                    get_qualified_name(controller))) from exc
+
+    def get_view_template(self, controller, route_match):
+        """Retrieve the template path for the executed controller method.
+
+        The resolved path is cached per controller class and the key returned
+        from the controllers get_execute_method_key method.
+
+        Returns:
+            tuple: The path segments and the resolved view template
+        """
+        key = controller.get_execute_method_key(**route_match.params)
+        if key is not None:
+            key = (controller.__class__, key)
+            if key in self.view_templates:
+                return self.view_templates[key]
+        path = tuple(controller.get_execute_method_path(**route_match.params))
+        controller_template = os.path.join(*path)
+        view_template = path, self.templates.get(controller_template,
+                                                 controller_template)
+        if key is not None:
+            self.view_templates[key] = view_template
+        return view_template
+
+    def create_view_model(self, controller, event, model_data):
+        """Convert the data returned from a controller into a view model.
+
+        Returns:
+            tuple: The response and view model
+        """
+        context = event.params['context']
+        route_match = context['route_match']
+        if context['request'].method == 'HEAD':
+            return self.create_head_response(controller, event, model_data)
+        if isinstance(model_data, controllers.ACCEPTABLE_RETURN_TYPES):
+            model_data = {'content': model_data}
+        elif isinstance(model_data, Response):
+            # Short circuited, skip any templating
+            controller.response = context['response'] = model_data
+            return model_data, model_data
+        elif is_stream(model_data):
+            # Stream the returned chunks, skipping any templating. The stream
+            # is consumed once the controller has been executed, so it is
+            # bound to the current context and holds on to the controller.
+            stream = BoundStream(
+                model_data, contextvars.copy_context(),
+                functools.partial(self.release_controller, controller, event))
+            response = StreamingResponse.from_response(
+                controller.response, stream)
+            if 'Content-Type' not in response.headers:
+                response.headers.add('Content-Type', get_mime_type(
+                    route_match.params.get('format', 'html')))
+            controller.response = context['response'] = response
+            return response, response
+        path, view_template = self.get_view_template(
+            controller, route_match)
+        format = route_match.params.get('format', 'html')
+        if isinstance(model_data, Model):
+            if not model_data.template:
+                model_data.template = view_template
+            else:
+                overridden_template = path[:-1] + (model_data.template,)
+                model_data.template = os.path.join(
+                    *overridden_template)
+            if not model_data.format:
+                model_data.format = format
+            view_model = model_data
+        else:
+            view_model = Model(
+                format=format,
+                template=view_template,
+                data=model_data)
+        context['response'] = controller.response
+        return controller.response, view_model
+
+    def create_head_response(self, controller, event, model_data):
+        """Convert the data returned from a controller into the response of a
+        HEAD request.
+
+        As a HEAD response has no body the view is never rendered, and any
+        stream returned is closed without being consumed. The Content-Length
+        is only set when the controller returned a response with a body.
+
+        Returns:
+            tuple: The response, as both the response and view model
+        """
+        context = event.params['context']
+        if isinstance(model_data, Response):
+            response = model_data
+            if isinstance(response, StreamingResponse):
+                model_data, response.stream = response.stream, None
+            elif response.body:
+                response.headers.add(
+                    'Content-Length', str(len(response.raw_body)),
+                    replace=True)
+            response.body = ''
+        else:
+            response = controller.response
+            format = context['route_match'].params.get('format', 'html')
+            if isinstance(model_data, Model) and model_data.format:
+                format = model_data.format
+            if 'Content-Type' not in response.headers:
+                response.headers.add('Content-Type', get_mime_type(format))
+        if hasattr(model_data, 'close'):
+            model_data.close()
+        controller.response = context['response'] = response
+        return response, response
+
     def add_session_cookie(self, controller):
-        session_to_cookie(controller.request, controller.response)
+        request = controller.request
+        if not getattr(request, 'session_loaded', True):
+            # the session was never accessed, so there is nothing to migrate
+            return
+        session_to_cookie(request, controller.response)
 
     def __call__(self, event):
+        deadlines.check(event.params['context'], 'dispatch')
         controller = self.determine_controller(event)
-        response, view_model = self.get_returned_controller_data(
-            controller, event)
-        self.add_session_cookie(controller)
-        return response, view_model
+        token = local.current_event.set(event)
+        try:
+            result = self.get_returned_controller_data(controller, event)
+            if inspect.isawaitable(result):
+                return self.__await_call(controller, event, result)
+            self.add_session_cookie(controller)
+        except Exception:
+            self.release_controller(controller, event)
+            raise
+        finally:
+            local.current_event.reset(token)
+        if not is_bound_stream(result[0]):
+            self.release_controller(controller, event)
+        return result
+
+    async def __await_call(self, controller, event, awaitable):
+        token = local.current_event.set(event)
+        response = None
+        try:
+            response, view_model = await awaitable
+            self.add_session_cookie(controller)
+            return response, view_model
+        finally:
+            local.current_event.reset(token)
+            if not is_bound_stream(response):
+                self.release_controller(controller, event)
 
 
 class Exception_(Base):
@@ -153,34 +425,170 @@ class Exception_(Base):
         return self.convert_to_view_model(exception, exc_data)
 
 
+class Compress(Base):
+
+    """Compresses the rendered body of a response with gzip or deflate when
+    the client has indicated (via Accept-Encoding) that it supports it.
+
+    Bodies smaller than the minimum size, mime types that are already
+    compressed and responses that have a Content-Encoding are not compressed.
+    Streamed responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.encodings = tuple(config.get('encodings', ()))
+
+    def __call__(self, event):
+        if not self.config.get('enabled'):
+            return
+        context = event.params['context']
+        request, response = context['request'], context['response']
+        headers = response.headers
+        if response.status_code in (204, 304) or 'Content-Encoding' in headers:
+            return
+        if not compression.is_compressible(
+                headers.get('Content-Type'), self.config['exclude']):
+            return
+        compression.add_vary(response, 'Accept-Encoding')
+        encoding = compression.negotiate(
+            request.headers.get('Accept-Encoding'), self.encodings)
+        if not encoding:
+            return
+        level = self.config['level']
+        if isinstance(response, StreamingResponse) and response.stream:
+            response.stream = compression.compress_stream(
+                response.chunks(), encoding, level)
+        elif len(response.raw_body) >= self.config['minimum_size']:
+            response._body = compression.compress(
+                response.raw_body, encoding, level)
+            if 'Content-Length' in headers:
+                headers.add(
+                    'Content-Length', str(len(response._body)), replace=True)
+        else:
+            return
+        headers.add('Content-Encoding', encoding)
+        etag = headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            # The encoded body is no longer byte for byte identical
+            headers.add('ETag', 'W/{0}'.format(etag), replace=True)
+        return response
+
+
+class ETag(Base):
+
+    """Generates an ETag from the rendered body of a response, and converts
+    the response into a 304 Not Modified if it matches the If-None-Match
+    header of the request.
+
+    Only successful GET and HEAD requests receive an ETag, and any ETag that
+    has already been set (for example via the conditional decorator) is
+    retained. Streamed responses are ignored.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def __call__(self, event):
+        if not self.config.get('etag'):
+            return
+        context = event.params['context']
+        request, response = context['request'], context['response']
+        if response.status_code != 200 or not request.is_method('GET', 'HEAD'):
+            return
+        if isinstance(response, StreamingResponse):
+            return
+        etag = response.headers.get('ETag')
+        if not etag:
+            etag = conditional.generate_etag(response.raw_body)
+            response.headers.add('ETag', etag)
+        if conditional.is_not_modified(
+                request, etag, response.headers.get('Last-Modified')):
+            conditional.not_modified(response)
+        return response
+
+
 class Render(Base):
 
+    """Renders the view model into the body of the response.
+
+    The renderer instance and mime type for each format are resolved once and
+    stored in a table keyed by format. The table is populated with the
+    configured renderers on the first render, and any other format is added
+    the first time it is seen (up to max_formats, after which unknown formats
+    are resolved on each request).
+
+    Attributes:
+        formats (dict): The resolved (renderer, mime type) for each format
+        max_formats (int): The maximum number of formats to store
+    """
+    max_formats = 64
+
     def __init__(self, view_config):
         self.view_config = view_config
+        self.formats = {}
+        self.default_renderer = None
+
+    def compile(self, container):
+        """Resolve the default renderer and each of the configured formats.
+        """
+        renderers = self.view_config['renderers']
+        self.default_renderer = container.get(
+            renderers[self.view_config['default_renderer']]['name'])
+        for format in renderers:
+            self.resolve(format, container)
+
+    def resolve(self, format, container):
+        """Resolve the renderer instance and mime type for a format.
+
+        Returns:
+            tuple: The renderer instance and mime type
+        """
+        if self.default_renderer is None:
+            self.compile(container)
+        if format in self.formats:
+            return self.formats[format]
+        renderer = self.view_config['renderers'].get(format)
+        if renderer:
+            renderer = container.get(renderer['name'])
+        else:
+            renderer = self.default_renderer
+        resolved = renderer, get_mime_type(format)
+        if len(self.formats) < self.max_formats:
+            self.formats[format] = resolved
+        return resolved
+
+    def set_body(self, context, body):
+        """Set the rendered body on the response.
+
+        Streamed bodies (such as those from Jinja2's streaming mode) replace
+        the response within the context with a StreamingResponse.
+
+        Returns:
+            watson.http.messages.Response
+        """
+        response = context['response']
+        if is_stream(body):
+            response = context['response'] = StreamingResponse.from_response(
+                response, body)
+        else:
+            response.body = body
+        return response
 
     def __call__(self, event):
         context = event.params['context']
-        response, view_model = context['response'], event.params['view_model']
-        renderers = self.view_config['renderers']
-        default_renderer = renderers[self.view_config['default_renderer']]
-        renderer = renderers.get(
-            view_model.format, default_renderer)
-        try:
-            mime_type = MIME_TYPES[view_model.format][0]
-        except Exception:
-            if '/' in view_model.format:
-                mime_type = view_model.format
-            else:
-                mime_type = 'text/{0}'.format(view_model.format)
-        container = event.params['container']
-        renderer_instance = container.get(renderer['name'])
+        deadlines.check(context, 'render')
+        view_model = event.params['view_model']
+        renderer_instance, mime_type = self.resolve(
+            view_model.format, event.params['container'])
         try:
-            response.body = renderer_instance(view_model, context=context)
+            response = self.set_body(
+                context, renderer_instance(view_model, context=context))
         except Exception:
             try:
-                renderer_instance = container.get(default_renderer['name'])
                 view_model.format = self.view_config['default_format']
-                response.body = renderer_instance(view_model, context=context)
+                response = self.set_body(
+                    context, self.default_renderer(view_model, context=context))
             except Exception as exc_:
                 raise InternalServerError(
                     'Template ({0}) not found'.format(
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Request local state, isolated between threads (and asyncio tasks)
+import contextvars
+import functools
+import inspect
+
+# The application handling the current request
+current_application = contextvars.ContextVar(
+    'watson.framework.local.current_application', default=None)
+
+# The context (request, response, route match etc) of the current request
+current_context = contextvars.ContextVar(
+    'watson.framework.local.current_context', default=None)
+
+# The event being dispatched to the controller of the current request
+current_event = contextvars.ContextVar(
+    'watson.framework.local.current_event', default=None)
+
+
+def storage(owner):
+    """Retrieve the storage of an object for the current request.
+
+    The storage lives within the context of the request, and is discarded
+    along with it once the request has completed. Outside of a request the
+    storage is held on the object itself.
+
+    Args:
+        owner (object): The object the state belongs to
+
+    Returns:
+        dict
+    """
+    context = current_context.get()
+    if context is None:
+        return owner.__dict__.setdefault('__request_locals__', {})
+    return context.setdefault('locals', {}).setdefault(id(owner), {})
+
+
+class RequestLocal(object):
+
+    """An attribute whose value is local to the request currently being
+    handled.
+
+    Allows objects that are shared between requests (such as debug panels and
+    listeners) to retain state for the duration of a request without that
+    state being visible to any other concurrent request.
+
+    Example:
+
+    .. code-block:: python
+
+        class Panel(object):
+            route_match = RequestLocal()
+            data = RequestLocal(dict)
+
+    Attributes:
+        factory (callable): Creates the default value of the attribute
+    """
+    name = None
+
+    def __init__(self, factory=None):
+        self.factory = factory
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        values = storage(instance)
+        if self.name not in values:
+            if not self.factory:
+                return None
+            values[self.name] = self.factory()
+        return values[self.name]
+
+    def __set__(self, instance, value):
+        storage(instance)[self.name] = value
+
+    def __delete__(self, instance):
+        storage(instance).pop(self.name, None)
+
+
+def request_cache():
+    """Retrieve the cache of the request currently being handled.
+
+    The cache is cleared once the request has completed (see
+    watson.framework.listeners.ClearRequestCache).
+
+    Returns:
+        dict: The cache, or None when outside of a request
+    """
+    context = current_context.get()
+    if context is None:
+        return None
+    return context.setdefault('request_cache', {})
+
+
+def request_cached(func):
+    """Memoize the result of a function for the duration of a request.
+
+    Results are keyed by the function and the arguments it was called with,
+    so methods of services retrieved from the container are cached per
+    instance. Calls made outside of a request, or with arguments that cannot
+    be hashed, are not cached. Exceptions are never cached.
+
+    Example:
+
+    .. code-block:: python
+
+        @request_cached
+        def current_user(request):
+            return users.get(request.session['user_id'])
+
+        class Permissions(object):
+            @request_cached
+            def for_user(self, user):
+                return self.repository.permissions(user.id)
+
+    Args:
+        func (callable): The function (or coroutine function) to memoize
+    """
+    def key_and_cache(args, kwargs):
+        cache = request_cache()
+        if cache is None:
+            return None, None
+        key = (func, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None, None
+        return key, cache
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            key, cache = key_and_cache(args, kwargs)
+            if cache is None:
+                return await func(*args, **kwargs)
+            if key not in cache:
+                cache[key] = await func(*args, **kwargs)
+            return cache[key]
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key, cache = key_and_cache(args, kwargs)
+        if cache is None:
+            return func(*args, **kwargs)
+        if key not in cache:
+            cache[key] = func(*args, **kwargs)
+        return cache[key]
+    return wrapper
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# WSGI middleware, wrapping the application before a request is created
+import mimetypes
+import os
+import time
+from watson.common import imports
+from watson.common.contextmanagers import suppress
+from watson.framework import conditional
+
+
+def build(application, components):
+    """Wrap a WSGI application in a stack of middleware.
+
+    Components are listed outermost first, and are each instantiated once
+    with the callable they wrap and their options. Components that are not
+    enabled are left out of the stack entirely.
+
+    Example:
+
+    .. code-block:: python
+
+        stack = build(application.run, [
+            'watson.framework.middleware.Timing',
+            {
+                'class': 'watson.framework.middleware.Static',
+                'options': {'path': 'public', 'prefix': '/static'}
+            }
+        ])
+        stack(environ, start_response)
+
+    Args:
+        application (callable): The WSGI callable to wrap
+        components (list): The class (or qualified name of the class) of each
+                           middleware, or a dict containing the class,
+                           options and whether or not it is enabled.
+
+    Returns:
+        callable: The outermost middleware, or the application if there were
+                  no enabled components.
+    """
+    stack = application
+    for component in reversed(components):
+        options = {}
+        if isinstance(component, dict):
+            if not component.get('enabled', True):
+                continue
+            options = component.get('options') or {}
+            component = component['class']
+        if isinstance(component, str):
+            component = imports.load_definition_from_string(component)
+        stack = component(stack, **options)
+    return stack
+
+
+def read_file(fp, block_size):
+    """Read a file in blocks, closing it once it has been read.
+    """
+    with fp:
+        for block in iter(lambda: fp.read(block_size), b''):
+            yield block
+
+
+class Timing(object):
+
+    """Adds the time taken to generate the response as a Server-Timing header.
+
+    The time is measured until the response is started, which for all but
+    streamed responses includes rendering the body.
+
+    Attributes:
+        name (string): The name of the metric within the header
+    """
+
+    def __init__(self, application, name='app'):
+        self.application = application
+        self.name = name
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+
+        def timed_start_response(status, headers, exc_info=None):
+            headers.append(('Server-Timing', '{0};dur={1:.1f}'.format(
+                self.name, (time.perf_counter() - started) * 1000)))
+            return start_response(status, headers, exc_info)
+
+        return self.application(environ, timed_start_response)
+
+
+class Static(object):
+
+    """Serves the files within a directory, without creating a request or
+    routing it.
+
+    Requests for paths that do not exist within the directory are passed on
+    to the application.
+
+    Attributes:
+        root (string): The absolute path of the directory files are served from
+        prefix (string): The path the files are served under
+        max_age (int): The number of seconds clients can cache files for
+    """
+    block_size = 65536
+
+    def __init__(self, application, path, prefix='/static', max_age=3600):
+        self.application = application
+        self.root = os.path.realpath(path)
+        self.prefix = '/{0}/'.format(prefix.strip('/')).replace('//', '/')
+        self.max_age = max_age
+
+    def resolve(self, path):
+        """Retrieve the absolute path of a file within the directory.
+
+        Returns:
+            string: The path of the file, or None if the file does not exist or
+                    is outside of the directory.
+        """
+        filename = os.path.realpath(os.path.join(self.root, path))
+        if not filename.startswith(self.root + os.sep):
+            return None
+        if not os.path.isfile(filename):
+            return None
+        return filename
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        method = environ.get('REQUEST_METHOD', 'GET')
+        filename = None
+        if path.startswith(self.prefix) and method in ('GET', 'HEAD'):
+            filename = self.resolve(path[len(self.prefix):])
+        if filename is None:
+            return self.application(environ, start_response)
+        stat = os.stat(filename)
+        last_modified = conditional.to_datetime(stat.st_mtime)
+        headers = [
+            ('Last-Modified', conditional.http_date(last_modified)),
+            ('Cache-Control', 'max-age={0}'.format(self.max_age))
+        ]
+        if_modified_since = environ.get('HTTP_IF_MODIFIED_SINCE')
+        with suppress(TypeError, ValueError, IndexError):
+            if if_modified_since and last_modified <= conditional.to_datetime(
+                    if_modified_since):
+                start_response('304 Not Modified', headers)
+                return []
+        content_type, encoding = mimetypes.guess_type(filename)
+        headers.extend([
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Content-Length', str(stat.st_size))
+        ])
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        fp = open(filename, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper:
+            return file_wrapper(fp, self.block_size)
+        return read_file(fp, self.block_size)
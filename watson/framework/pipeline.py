@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import collections
+
+
+class Profile(collections.namedtuple(
+        'Profile', 'session toolbar render exceptions')):
+
+    """The parts of the request pipeline that a route makes use of.
+
+    Routes can declare a profile via the pipeline option, either as a dict or
+    the name of a profile within the pipeline config. Any settings that are
+    not declared default to True.
+
+    Attributes:
+        session (bool): Whether or not the request has a session
+        toolbar (bool): Whether or not the debug toolbar is rendered
+        render (bool|string): Whether or not the view is rendered, or the
+            format that the view will always be rendered in.
+        exceptions (bool): Whether or not exceptions are formatted via the
+            EXCEPTION event and error templates, otherwise a minimal plain
+            text response is returned.
+
+    Example:
+
+    .. code-block:: python
+
+        routes = {
+            'health': {
+                'path': '/health',
+                'options': {
+                    'controller': 'app.controllers.Health',
+                    'pipeline': {'session': False, 'toolbar': False,
+                                 'render': 'json', 'exceptions': False}
+                }
+            }
+        }
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_options(cls, options, profiles=None):
+        """Create a profile from a routes pipeline option.
+
+        Args:
+            options (dict|string): The profile settings, or the name of a
+                profile within profiles.
+            profiles (dict): The named profiles
+        """
+        if isinstance(options, str):
+            options = (profiles or {})[options]
+        return DEFAULT_PROFILE._replace(**(options or {}))
+
+
+DEFAULT_PROFILE = Profile(session=True, toolbar=True, render=True,
+                          exceptions=True)
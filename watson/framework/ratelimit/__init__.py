@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+from watson.framework.ratelimit.limiter import RateLimiter
+
+__all__ = ['RateLimiter']
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+import collections
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from stat import S_ISDIR, S_ISREG
+from watson.common.imports import get_qualified_name
+from watson.di import ContainerAware
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+def consume(tokens, updated, now, rate, burst, cost=1):
+    """Refill a token bucket and take tokens from it.
+
+    Args:
+        tokens (float): The tokens in the bucket when it was last updated
+        updated (float): The time the bucket was last updated
+        now (float): The current time
+        rate (float): The number of tokens added to the bucket per second
+        burst (int): The maximum number of tokens the bucket can hold
+        cost (int): The number of tokens to take
+
+    Returns:
+        tuple: Whether or not the tokens were taken, the tokens remaining and
+               the number of seconds until enough tokens are available.
+    """
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / rate
+
+
+class Base(object):
+
+    """The base class for the storage of token buckets.
+    """
+
+    def take(self, key, rate, burst, cost=1):
+        """Take tokens from a bucket, creating a full bucket if it does not
+        already exist.
+
+        Returns:
+            tuple: Whether or not the tokens were taken, and the number of
+                   seconds until enough tokens are available.
+        """
+        raise NotImplementedError(
+            'You must implement take')  # pragma: no cover
+
+    def __repr__(self):
+        return '<{0}>'.format(get_qualified_name(self))
+
+
+class Memory(Base):
+
+    """Token buckets held in the memory of the process.
+
+    Each worker process has its own buckets, so the limits apply per process.
+    The least recently used buckets are discarded once there are more than
+    max_size buckets.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.buckets = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self.buckets.pop(key, (burst, now))
+            allowed, tokens, retry_after = consume(
+                tokens, updated, now, rate, burst, cost)
+            self.buckets[key] = tokens, now
+            if len(self.buckets) > self.max_size:
+                self.buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+def default_path(name=None):
+    """The default file that the buckets of an application are stored within.
+
+    The file is stored within a directory that is only accessible by the
+    current user ($XDG_RUNTIME_DIR, or a watson-<uid> directory within the
+    temporary directory), and is named after a digest of the application
+    directory so that unrelated applications do not share buckets.
+
+    Args:
+        name (string): The name of the application (defaults to the current
+                       working directory)
+
+    Raises:
+        RuntimeError: If the directory is accessible by other users
+    """
+    directory = os.environ.get('XDG_RUNTIME_DIR')
+    if not directory:
+        directory = os.path.join(
+            tempfile.gettempdir(), 'watson-{0}'.format(os.getuid()))
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+    stat = os.lstat(directory)
+    private = stat.st_uid == os.getuid() and not stat.st_mode & 0o077
+    if not S_ISDIR(stat.st_mode) or not private:
+        raise RuntimeError(
+            '{0} must be a directory only accessible by the current '
+            'user'.format(directory))
+    digest = hashlib.sha1((name or os.getcwd()).encode('utf-8')).hexdigest()
+    return os.path.join(directory, 'watson.ratelimit.{0}'.format(digest))
+
+
+class SharedMemory(Base):
+
+    """Token buckets held within a memory mapped file that is shared by every
+    worker process of the application on the host.
+
+    Each key is hashed into one of a fixed number of slots, and each slot is
+    locked individually while it is updated. Keys that hash into the same slot
+    reset each others bucket, so the number of slots should comfortably exceed
+    the number of active clients.
+
+    The file is opened without following symlinks, and must be owned by the
+    current user.
+
+    Args:
+        path (string): The file the buckets are stored within (see
+                       default_path)
+        slots (int): The number of buckets that can be stored
+    """
+    slot = struct.Struct('<Qdd')
+
+    def __init__(self, path=None, slots=65536):
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError('SharedMemory rate limiting requires fcntl')
+        self.path = path or default_path()
+        self.slots = slots
+        size = self.slot.size * slots
+        self._fd = os.open(
+            self.path,
+            os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o600)
+        try:
+            stat = os.fstat(self._fd)
+            if not S_ISREG(stat.st_mode) or stat.st_uid != os.getuid():
+                raise RuntimeError(
+                    '{0} must be a file owned by the current user'.format(
+                        self.path))
+            if stat.st_size < size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+        except Exception:
+            os.close(self._fd)
+            raise
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        digest = int.from_bytes(
+            hashlib.sha1(key.encode('utf-8')).digest()[:8], 'little')
+        offset = (digest % self.slots) * self.slot.size
+        now = time.time()
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.slot.size, offset)
+            try:
+                stored, tokens, updated = self.slot.unpack_from(
+                    self._map, offset)
+                if stored != digest:
+                    tokens, updated = burst, now
+                allowed, tokens, retry_after = consume(
+                    tokens, updated, now, rate, burst, cost)
+                self.slot.pack_into(self._map, offset, digest, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.slot.size, offset)
+        return allowed, retry_after
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+class Cache(Base, ContainerAware):
+
+    """Token buckets held within the watson.cache storage of the application,
+    allowing limits to be shared between hosts (via memcached or redis).
+
+    The storage does not support atomic updates, so concurrent requests from
+    the same client may slightly exceed the limit.
+    """
+
+    @property
+    def storage(self):
+        return self.container.get(
+            self.container.get('application.config')['cache']['type'])
+
+    def take(self, key, rate, burst, cost=1):
+        now = time.time()
+        storage = self.storage
+        tokens, updated = storage.get(key) or (burst, now)
+        allowed, tokens, retry_after = consume(
+            tokens, updated, now, rate, burst, cost)
+        # a bucket that has not been used for long enough to refill is full
+        storage.set(key, (tokens, now), int(burst / rate) + 1)
+        return allowed, retry_after
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import math
+from watson.di import ContainerAware
+from watson.http.messages import Response
+from watson.http.sessions import COOKIE_KEY
+from watson.framework import events
+
+
+class RateLimiter(ContainerAware):
+
+    """Limits the rate of requests using token buckets.
+
+    Each client is limited to rate requests per second, with bursts of up to
+    burst requests. The client is checked before the request is routed, so
+    clients that exceed the limit are rejected without routing, dispatching
+    or rendering (including not found and error pages). Routes can declare
+    their own limit via the ratelimit option, which is checked once the route
+    has been matched.
+
+    Clients that exceed a limit receive a 429 Too Many Requests response with
+    a Retry-After header, without the exception listener being triggered.
+
+    The buckets are stored within the ratelimit_backend (see
+    watson.framework.ratelimit.backends), which can be shared between worker
+    processes.
+
+    Example:
+
+    .. code-block:: python
+
+        ratelimit = {
+            'enabled': True,
+            'rate': 10,
+            'burst': 20
+        }
+
+        routes = {
+            'login': {
+                'path': '/login',
+                'options': {
+                    'controller': 'app.controllers.Login',
+                    'ratelimit': {'rate': 0.1, 'burst': 5}
+                }
+            }
+        }
+
+    Attributes:
+        config (dict): The rate limit settings
+        routes (dict): The resolved rate limit settings for each route
+    """
+    body = b'Too Many Requests'
+    _backend = None
+
+    def __init__(self, config):
+        self.config = config
+        self.routes = {}
+
+    @property
+    def backend(self):
+        """The storage of the token buckets.
+
+        Returns:
+            watson.framework.ratelimit.backends.Base
+        """
+        if self._backend is None:
+            self._backend = self.container.get('ratelimit_backend')
+        return self._backend
+
+    def register_listeners(self, dispatcher):
+        """Register the client and route listeners against the dispatcher.
+
+        The client is checked before the route is matched, and the route once
+        the response cache (if enabled) has been checked.
+        """
+        if self.config.get('rate'):
+            dispatcher.add(events.ROUTE_MATCH, self.limit_client, 100)
+        dispatcher.add(events.ROUTE_MATCH, self.limit_route, -100)
+
+    def client(self, request, key='ip'):
+        """Identify the client that made a request.
+
+        Clients are only identified by their session when the session exists
+        within the session storage, so sending a new session cookie with each
+        request does not reset the limit.
+
+        Args:
+            request (watson.http.messages.Request): The request
+            key (string): Identify the client by ip or session (falling back to
+                          the ip if the client has no session).
+        """
+        if key == 'session':
+            cookie = request.cookies.get(COOKIE_KEY)
+            if cookie is not None and cookie.value:
+                session = request.session
+                if session is not None and session.exists():
+                    return 'session:{0}'.format(session.id)
+        return 'ip:{0}'.format(self.address(request))
+
+    def address(self, request):
+        """Retrieve the address of the client that made a request.
+
+        When the application is behind the configured number of trusted
+        proxies (forwarded), the address is the entry of the X-Forwarded-For
+        header added by the outermost proxy, counting from the right. Entries
+        to the left of it were sent by the client and cannot be trusted.
+
+        Args:
+            request (watson.http.messages.Request): The request
+        """
+        hops = int(self.config.get('forwarded') or 0)
+        if hops:
+            forwarded = request.headers.get('X-Forwarded-For')
+            if forwarded:
+                addresses = [address.strip() for address
+                             in forwarded.split(',')]
+                if len(addresses) >= hops:
+                    return addresses[-hops]
+        return request.environ.get('REMOTE_ADDR', '')
+
+    def settings(self, route):
+        """Retrieve the rate limit settings for a route.
+
+        Returns:
+            dict: The rate, burst and key settings, or None if the route is
+                  not limited.
+        """
+        if route.name in self.routes:
+            return self.routes[route.name]
+        options = route.options.get('ratelimit')
+        settings = None
+        if options:
+            rate = float(options['rate'])
+            settings = {
+                'rate': rate,
+                'burst': int(options.get('burst', max(1, math.ceil(rate)))),
+                'key': options.get('key', self.config['key'])
+            }
+        self.routes[route.name] = settings
+        return settings
+
+    def limit_client(self, event):
+        """Reject the request if the client has exceeded the rate limit.
+
+        The route listener is not executed for rejected requests.
+        """
+        context = event.params['context']
+        key = '{0}:{1}'.format(
+            self.config['prefix'],
+            self.client(context['request'], self.config['key']))
+        allowed, retry_after = self.backend.take(
+            key, self.config['rate'], self.config['burst'])
+        if not allowed:
+            context['response'] = self.response(retry_after)
+            event.stop_propagation()
+
+    def limit_route(self, event):
+        """Reject the request if the client has exceeded the rate limit of
+        the matched route.
+        """
+        context = event.params['context']
+        route_match = context.get('route_match')
+        if not route_match:
+            return
+        route = route_match.route
+        settings = self.settings(route)
+        if not settings:
+            return
+        if settings['key'] == 'route':
+            client = 'route'
+        else:
+            client = self.client(context['request'], settings['key'])
+        key = '{0}:{1}:{2}'.format(self.config['prefix'], route.name, client)
+        allowed, retry_after = self.backend.take(
+            key, settings['rate'], settings['burst'])
+        if not allowed:
+            context['response'] = self.response(retry_after)
+
+    def response(self, retry_after):
+        """Create a 429 Too Many Requests response.
+
+        Args:
+            retry_after (float): The seconds until the request can be retried
+
+        Returns:
+            watson.http.messages.Response
+        """
+        response = Response(429)
+        response.headers.add('Content-Type', 'text/plain; charset=utf-8')
+        response.headers.add('Retry-After', str(max(1, math.ceil(retry_after))))
+        response._body = self.body
+        return response
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from watson.di import ContainerAware
+from watson.framework import applications
+
+
+class Init(ContainerAware):
+
+    """Attaches itself to the applications INIT event and registers the
+    rate limit listeners.
+    """
+
+    def __call__(self, event):
+        app = event.target
+        if isinstance(app, applications.Http):
+            if app.config['ratelimit']['enabled']:
+                rate_limiter = self.container.get('rate_limiter')
+                rate_limiter.register_listeners(app.dispatcher)
+                return rate_limiter
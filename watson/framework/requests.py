@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import threading
+from watson.common.decorators import cached_property
+from watson.http import REQUEST_METHODS
+from watson.http.messages import Request
+
+# Content types whose body may override the method via HTTP_REQUEST_METHOD
+FORM_CONTENT_TYPES = ('application/x-www-form-urlencoded',
+                      'multipart/form-data')
+
+
+def is_form(environ):
+    """Determine whether or not the body of a request contains form fields.
+
+    Requests without a content type are treated as forms, as they would be
+    when the body is parsed.
+    """
+    content_type = environ.get('CONTENT_TYPE')
+    if not content_type:
+        return True
+    return content_type.split(';', 1)[0].strip().lower() in FORM_CONTENT_TYPES
+
+
+class LazyRequest(Request):
+
+    """A request that is materialized as it is used.
+
+    Nothing is parsed from the environ when the request is created, allowing
+    requests that are answered before (or by) routing to skip the work
+    entirely. Routing only requires PATH_INFO, REQUEST_METHOD and the host,
+    while the headers, cookies, GET/POST vars and session are each built the
+    first time they are accessed.
+
+    Unlike watson.http.messages.Request, the body of a POST request is only
+    parsed to determine the method when it contains form fields, so routing a
+    JSON (or any other) POST request does not read the body.
+
+    Example:
+
+    .. code-block:: python
+
+        request = LazyRequest.from_environ(environ)
+        request.method  # GET, without parsing the headers or query string
+        request.session_loaded  # False
+    """
+
+    def __init__(self, environ):
+        # the missing HTTP_ headers are added when the headers are accessed
+        self._environ = environ
+
+    @cached_property
+    def method(self):
+        """The method associated with the request.
+
+        See watson.http.messages.Request.method
+        """
+        method = self.environ.get('REQUEST_METHOD', 'GET').upper()
+        if method == 'POST' and is_form(self.environ):
+            post_method = self.post.get('HTTP_REQUEST_METHOD', method).upper()
+            if post_method in REQUEST_METHODS:
+                method = post_method
+        return method
+
+    @property
+    def session_loaded(self):
+        """Whether or not the session storage has been created.
+        """
+        return self._session is not None
+
+
+class SubRequest(LazyRequest):
+
+    """A request made within another request, such as one of the requests
+    of a batch request (see watson.framework.batch).
+
+    Sub-requests share the session of the request they were made within. As
+    sub-requests may be executed concurrently the session is retrieved while
+    holding a lock shared by the sub-requests of the parent.
+
+    Attributes:
+        parent (watson.http.messages.Request): The request this was made within
+        lock (threading.Lock): Guards the creation of the shared session
+    """
+
+    def __init__(self, environ, parent, lock=None):
+        super(SubRequest, self).__init__(environ)
+        self.parent = parent
+        self.lock = lock or threading.Lock()
+
+    @property
+    def session(self):
+        with self.lock:
+            return self.parent.session
+
+    @property
+    def session_loaded(self):
+        """Always False, as the session is migrated to a cookie by the
+        response of the parent request rather than each sub-request.
+        """
+        return False
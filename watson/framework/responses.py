@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+from watson.http.messages import Response
+
+
+def is_stream(obj):
+    """Determine whether or not an object should be streamed as a response.
+
+    Only iterators (such as generators) are streamed, other iterables like
+    lists and dicts are treated as data to be rendered.
+    """
+    return hasattr(obj, '__next__') and hasattr(obj, '__iter__')
+
+
+class BoundStream(object):
+
+    """Iterates a stream within the context it was created in.
+
+    A stream returned from a controller is consumed after the controller has
+    been executed, once the request local state has been reset. Each chunk is
+    instead produced within a copy of the context taken while the controller
+    was executing, so the stream can still access the request (including via
+    singleton and pooled controllers). The callback is executed once the
+    stream has been exhausted or closed, which allows pooled controllers to
+    be released only once the stream no longer needs them.
+
+    Attributes:
+        stream (iterator): The wrapped stream
+        context (contextvars.Context): The context chunks are produced within
+        callback (callable): Executed once when the stream is closed
+    """
+
+    def __init__(self, stream, context, callback=None):
+        self.stream = stream
+        self.context = context
+        self.callback = callback
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return self.context.run(next, self.stream)
+        except BaseException:
+            # exhausted (StopIteration) or failed
+            self.close()
+            raise
+
+    def close(self):
+        stream, self.stream = self.stream, iter(())
+        close = getattr(stream, 'close', None)
+        if close:
+            self.context.run(close)
+        callback, self.callback = self.callback, None
+        if callback:
+            callback()
+
+
+class StreamingResponse(Response):
+
+    """A response whose body is an iterable of chunks.
+
+    Each chunk is encoded and passed to the WSGI server as it is produced,
+    allowing the server to begin sending the response before the entire body
+    has been generated. Accessing body or raw_body will consume the stream.
+
+    Example:
+
+    .. code-block:: python
+
+        def generate():
+            yield '<html>'
+            yield '</html>'
+
+        response = StreamingResponse(200, stream=generate())
+        response(start_response)  # iterable of encoded chunks
+
+    Attributes:
+        stream (iterable): The chunks of the body (str or bytes)
+    """
+    stream = None
+
+    def __init__(self, status_code=None, headers=None, stream=None,
+                 version=None):
+        super(StreamingResponse, self).__init__(
+            status_code, headers, version=version)
+        self.stream = stream
+
+    @classmethod
+    def from_response(cls, response, stream):
+        """Create a streaming response with the status, headers and cookies of
+        an existing response.
+
+        Args:
+            response (watson.http.messages.Response): The response to copy
+            stream (iterable): The chunks of the body
+        """
+        streaming = cls(response.status_code, response.headers, stream,
+                        response.version)
+        streaming.cookies = response.cookies
+        return streaming
+
+    @property
+    def raw_body(self):
+        if self.stream is not None:
+            self._body = b''.join(self.chunks())
+            self.stream = None
+        return super(StreamingResponse, self).raw_body
+
+    @property
+    def body(self):
+        return self.raw_body.decode(self.encoding)
+
+    @body.setter
+    def body(self, body):
+        self.stream = None
+        self._body = body.encode(self.encoding)
+
+    def chunks(self):
+        """Yield each encoded chunk from the stream.
+
+        The underlying stream will be closed once it has been exhausted, or
+        if the generator is closed by the WSGI server. The stream is bound
+        when this method is called, so the stream attribute can safely be
+        replaced with a wrapper around the returned generator.
+        """
+        return self.__encode_chunks(self.stream, self.encoding)
+
+    def __encode_chunks(self, stream, encoding):
+        try:
+            for chunk in stream:
+                if not isinstance(chunk, bytes):
+                    chunk = str(chunk).encode(encoding)
+                if chunk:
+                    yield chunk
+        finally:
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+
+    def __call__(self, start_response):
+        """Execute the start_response method and return the iterable body.
+        """
+        start_response(*self.start())
+        if self.stream is None:
+            return [self.raw_body]
+        return self.chunks()
+
+
+class ClosingIterator(object):
+
+    """Wraps the iterable body returned to a WSGI server so that a callback
+    is executed once the server has finished sending the response.
+
+    The callback is executed when the server calls close() on the iterable
+    (as required by PEP 3333), after the wrapped iterable has been closed.
+
+    Attributes:
+        iterable (iterable): The body of the response
+        callback (callable): Called once the iterable has been closed
+    """
+
+    def __init__(self, iterable, callback):
+        self.iterable = iterable
+        self.callback = callback
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+    def close(self):
+        callback, self.callback = self.callback, None
+        try:
+            close = getattr(self.iterable, 'close', None)
+            if close:
+                close()
+        finally:
+            if callback:
+                callback()
+
+
+class ClosingList(list):
+
+    """A list body (as returned from watson.http.messages.Response) which
+    executes a callback once the WSGI server has closed it.
+
+    See ClosingIterator.
+    """
+
+    def __init__(self, iterable, callback):
+        super(ClosingList, self).__init__(iterable)
+        self.callback = callback
+
+    def close(self):
+        callback, self.callback = self.callback, None
+        if callback:
+            callback()
+
+
+def closing(iterable, callback):
+    """Wrap the body of a response so that the callback is executed once the
+    WSGI server has closed it.
+
+    Returns:
+        ClosingList if the body is a list, otherwise a ClosingIterator
+    """
+    if isinstance(iterable, list):
+        return ClosingList(iterable, callback)
+    return ClosingIterator(iterable, callback)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Support functions for running applications via the ASGI protocol
+import sys
+from io import BytesIO
+
+SPECIAL_HEADERS = {
+    'content-type': 'CONTENT_TYPE',
+    'content-length': 'CONTENT_LENGTH'
+}
+
+
+async def read_body(receive):
+    """Read the entire body of a http request from an ASGI receive callable.
+
+    Args:
+        receive (callable): The ASGI receive awaitable
+
+    Returns:
+        bytes: The body of the request
+    """
+    body = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+    return b''.join(body)
+
+
+def environ_from_scope(scope, body=b''):
+    """Convert an ASGI http connection scope into a WSGI environ.
+
+    Args:
+        scope (dict): The ASGI connection scope
+        body (bytes): The body of the request
+
+    Returns:
+        dict: A WSGI compatible environ
+    """
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/{0}'.format(scope.get('http_version', '1.1')),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'asgi.scope': scope
+    }
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'] = client[0]
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').lower()
+        value = value.decode('latin-1')
+        key = SPECIAL_HEADERS.get(name)
+        if not key:
+            key = 'HTTP_{0}'.format(name.upper().replace('-', '_'))
+        if key in environ and key.startswith('HTTP_'):
+            value = '{0},{1}'.format(environ[key], value)
+        environ[key] = value
+    return environ
+
+
+def encode_headers(headers):
+    """Encode a list of WSGI header tuples for an ASGI response.
+
+    Args:
+        headers (list): A list of (name, value) tuples
+
+    Returns:
+        list: A list of encoded [name, value] pairs
+    """
+    return [[name.lower().encode('latin-1'), str(value).encode('latin-1')]
+            for name, value in headers]
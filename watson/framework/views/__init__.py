@@ -3,17 +3,18 @@ from watson.common import imports
 
 
 class Model(object):
-    format = None
-    template = None
-    data = None
-    renderer_args = None
+    __slots__ = (
+        'format', 'template', 'data', 'renderer_args', 'stream', 'offload')
 
     def __init__(
-            self, data=None, template=None, format=None, renderer_args=None):
+            self, data=None, template=None, format=None, renderer_args=None,
+            stream=False, offload=None):
         self.template = template
         self.data = data if data else data
         self.format = format
         self.renderer_args = renderer_args if renderer_args else {}
+        self.stream = stream
+        self.offload = offload
 
     def __repr__(self):
         return (
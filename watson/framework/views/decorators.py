@@ -3,7 +3,8 @@ from watson.framework import views, controllers
 from watson.http import messages
 
 
-def view(template=None, format=None, renderer_args=None):
+def view(template=None, format=None, renderer_args=None, stream=None,
+         offload=None):
     """Return the view model in a specific format and with a specific template.
 
     This will not work if the response returned from the controller is of
@@ -14,6 +15,9 @@ def view(template=None, format=None, renderer_args=None):
         template (string): the template to use
         format (string): the format to output as
         renderer_args (mixed): args to be passed to the renderer
+        stream (bool): whether or not the rendered template should be streamed
+        offload (bool): whether or not the template may be rendered in a
+                        separate process (see the jinja2 offload config)
 
     Returns:
         The view model in the specific format
@@ -43,6 +47,10 @@ def view(template=None, format=None, renderer_args=None):
                     response.template = template
                 if renderer_args:
                     response.renderer_args = renderer_args
+                if stream is not None:
+                    response.stream = stream
+                if offload is not None:
+                    response.offload = offload
             return response
         return wrapper
     return decorator
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import importlib
 import os
+import pickle
 import types
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
 import jinja2
 from jinja2.exceptions import TemplateNotFound
 from watson.common import datastructures
@@ -14,8 +17,75 @@ def template_to_posix_path(template, sep=None):
     return template.replace(sep, '/')
 
 
+def create_loader(config, debug=False):
+    """Create the loader for the configured paths and packages.
+
+    The framework templates take precedence over the user templates when in
+    debug mode.
+    """
+    user_path_loaders = [jinja2.FileSystemLoader(path)
+                         for path in config.get('paths')]
+    user_package_loaders = [jinja2.PackageLoader(*package)
+                            for package in config.get('packages')]
+    user_loaders = user_package_loaders + user_path_loaders
+    system_loaders = [jinja2.PackageLoader(*package)
+                      for package in config.get('framework_packages')]
+    if debug:
+        loaders = system_loaders + user_loaders
+    else:
+        loaders = user_loaders + system_loaders
+    return jinja2.ChoiceLoader(loaders)
+
+
+# The environment of a rendering process, see Renderer.offload
+_process_env = None
+
+
+def _init_process(config, debug):
+    """Create the environment of a rendering process.
+
+    Only the filters and globals that are plain functions are registered, as
+    those retrieved from the container depend on the application.
+    """
+    global _process_env
+    kwargs = dict(config.get('environment', {}))
+    kwargs['loader'] = create_loader(config, debug)
+    _process_env = jinja2.Environment(**kwargs)
+    for _type in ('filters', 'globals'):
+        env_type = getattr(_process_env, _type)
+        for module in config[_type]:
+            mod = importlib.import_module(module)
+            dic = datastructures.module_to_dict(mod, ignore_starts_with='__')
+            for name, definition in dic.items():
+                if isinstance(definition, types.FunctionType):
+                    env_type[name] = definition
+
+
+def _warm_process():
+    return os.getpid()
+
+
+def _render_in_process(template, payload):
+    data = pickle.loads(payload)
+    return _process_env.get_template(template).render(context={}, **data)
+
+
 class Renderer(abc.Renderer):
+
+    """Renders view models via Jinja2.
+
+    CPU heavy templates can be rendered within a pool of processes instead of
+    the thread handling the request (see the offload config). The view model
+    data is pickled and sent to a process holding an equivalent environment,
+    and the rendered string is returned. Templates are offloaded when listed
+    in the offload templates, or when the offload attribute of the view model
+    is True, and the pickled data is at least the threshold in bytes.
+
+    Offloaded templates are rendered without the request context, and only
+    have access to the filters and globals that are plain functions.
+    """
     _env = None
+    _pool = None
     _debug_mode = False
     _choice_loader = None
     _fully_loaded = False
@@ -47,6 +117,8 @@ class Renderer(abc.Renderer):
         super(Renderer, self).__init__(config)
         self._debug_mode = application.config['debug']['enabled']
         self.register_loaders(application)
+        if self.offload_config.get('enabled'):
+            self.start_pool()
 
     def register_filters_globals(self, application):
         _types = ('filters', 'globals')
@@ -65,39 +137,130 @@ class Renderer(abc.Renderer):
         self._fully_loaded = True
 
     def register_loaders(self, application=None):
-        user_path_loaders = [jinja2.FileSystemLoader(path)
-                             for path in self.config.get('paths')]
-        user_package_loaders = [jinja2.PackageLoader(*package)
-                                for package in self.config.get('packages')]
-        user_loaders = user_package_loaders + user_path_loaders
-        system_loaders = [jinja2.PackageLoader(*package)
-                          for package in self.config.get('framework_packages')]
-        if self._debug_mode:
-            loaders = system_loaders + user_loaders
-        else:
-            loaders = user_loaders + system_loaders
+        loader = create_loader(self.config, self._debug_mode)
         kwargs = self.config.get('environment', {})
-        loader = jinja2.ChoiceLoader(loaders)
         kwargs['loader'] = loader
         self._choice_loader = loader
         self._env = jinja2.Environment(**kwargs)
         self._env.application = application
 
-    def render(self, template, data, context=None):
+    @property
+    def offload_config(self):
+        return self.config.get('offload') or {}
+
+    @property
+    def pool(self):
+        """The pool of processes that templates are offloaded to.
+        """
+        if not self._pool:
+            self.start_pool()
+        return self._pool
+
+    def start_pool(self):
+        """Create the pool of processes that templates are offloaded to.
+
+        Each of the processes are started and their environments created
+        before the pool is used, rather than by the first offloaded renders.
+        """
+        # the loader is recreated from the paths and packages
+        config = dict(self.config)
+        config.pop('offload', None)
+        config['environment'] = {
+            key: value for key, value
+            in self.config.get('environment', {}).items()
+            if key != 'loader'}
+        workers = self.offload_config.get('workers') or os.cpu_count()
+        self._pool = futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_process,
+            initargs=(config, self._debug_mode))
+        futures.wait([self._pool.submit(_warm_process)
+                      for _ in range(workers)])
+
+    def shutdown(self):
+        """Shutdown the pool of processes, if it has been created.
+        """
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+
+    def should_offload(self, template, offload=None):
+        """Determine whether or not a template may be rendered in the pool.
+
+        Args:
+            template (string): The name of the template, without the extension
+            offload (bool): The offload attribute of the view model, None to
+                            defer to the configured templates.
+        """
+        config = self.offload_config
+        if not config.get('enabled') or offload is False:
+            return False
+        if offload:
+            return True
+        return template_to_posix_path(template) in config.get('templates', ())
+
+    def offload(self, template, data):
+        """Render a template within the pool of processes.
+
+        Returns:
+            string: The rendered template, or None if the data is smaller than
+                    the threshold or cannot be pickled.
+        """
+        try:
+            payload = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+        if len(payload) < self.offload_config.get('threshold', 0):
+            return None
+        try:
+            return self.pool.submit(
+                _render_in_process, template, payload).result()
+        except BrokenProcessPool:
+            # a process died, the pool is recreated on the next offload
+            self._pool = None
+            return None
+
+    def render(self, template, data, context=None, stream=False,
+               offload=None):
+        """Render a template with the data.
+
+        If stream is True, a buffered iterator of the rendered chunks is
+        returned (via Template.generate) instead of the complete string. The
+        number of chunks buffered can be set via the stream_buffer config.
+
+        If the template should be offloaded (see should_offload) it is
+        rendered within the pool of processes, falling back to rendering it
+        in the current thread when the data is below the threshold.
+        """
+        if not stream and self.should_offload(template, offload):
+            output = self.offload(self.template_path(template), data)
+            if output is not None:
+                return output
         if not self._fully_loaded:
             self.register_filters_globals(self._env.application)
         try:
-            if '.' not in template:
-                template = '{0}.{1}'.format(template, self.config['extension'])
-            template = self._env.get_template(template_to_posix_path(template))
+            template = self._env.get_template(self.template_path(template))
         except TemplateNotFound as exc:
             message = '{} not found in {}'.format(
                 str(exc), ', '.join(self.searched_paths))
             raise TemplateNotFound(message) from exc
+        if stream:
+            template_stream = template.stream(context=context or {}, **data)
+            template_stream.enable_buffering(self.config.get('stream_buffer', 5))
+            return template_stream
         return template.render(context=context or {}, **data)
 
+    def template_path(self, template):
+        """Convert a template name into the path the loader expects.
+        """
+        if '.' not in template:
+            template = '{0}.{1}'.format(template, self.config['extension'])
+        return template_to_posix_path(template)
+
     def __call__(self, view_model, context=None, **kwargs):
         return self.render(
             view_model.template,
             data=view_model.data,
-            context=context)
+            context=context,
+            stream=view_model.stream,
+            offload=view_model.offload)